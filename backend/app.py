@@ -1,5 +1,6 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_file
 from werkzeug.utils import secure_filename
+from werkzeug.security import safe_join
 import mysql.connector
 import bcrypt
 import os
@@ -7,14 +8,39 @@ import tensorflow as tf
 from tensorflow.keras.models import load_model as keras_load_model
 import numpy as np
 import time
-from PIL import Image
 import io
 from flask_cors import CORS
 from datetime import datetime
 import json
 import hashlib
+import mimetypes
 import secrets
+from urllib.parse import quote
+import zipfile
+import glob
+import threading
+import re
+import atexit
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from disease_info import get_disease_info
+from disease_catalog import DiseaseCatalog
+from cache import TTLCache
+from response_cache import ResponseCache
+from http_cache import make_etag, body_etag, conditional, not_modified, matches
+from compression import compress_response, brotli_available
+from image_store import ImageStore, content_hash, detect_extension
+from image_derivatives import DerivativeCache, FORMATS as DERIVATIVE_FORMATS, WIDTHS as DERIVATIVE_WIDTHS, snap_width
+from db_pool import ConnectionPool, PoolTimeout
+from history_writer import HistoryWriter, IdAllocator, HISTORY_COLUMNS
+from stats import (
+    FEEDBACK_STATS_SQL, NEWS_STATS_SQL, USERS_STATS_SQL, DETECTION_TOTALS_SQL, DETECTION_DAYS_SQL,
+    summarize_feedback, summarize_news, summarize_users, summarize_detections, daily_trend
+)
+import stats_counters
+from pagination import encode_cursor, decode_cursor, parse_datetime, parse_limit, keyset_condition
+from preprocessing import letterbox, allocate_batch, get_resample, PreprocessPool, PoolSaturated
+from inference import MicroBatcher, BatcherSaturated, TFLiteRunner, build_serving_fn, measure_latency
 from dotenv import load_dotenv
 import google.generativeai as genai
 
@@ -27,16 +53,122 @@ if '*' in ALLOWED_ORIGINS or os.getenv('FLASK_ENV') == 'development':
 else:
     CORS(app, resources={r"/*": {"origins": ALLOWED_ORIGINS}})
 
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload
+PREDICT_MAX_BYTES = 16 * 1024 * 1024  # 16MB max upload per gambar
 
 # Load environment variables
 load_dotenv()
 
+# Batas /api/predict/batch (jumlah gambar & total ukuran upload)
+BATCH_PREDICT_MAX_IMAGES = int(os.getenv('BATCH_PREDICT_MAX_IMAGES', '50'))
+BATCH_PREDICT_MAX_BYTES = int(float(os.getenv('BATCH_PREDICT_MAX_MB', '64')) * 1024 * 1024)
+app.config['MAX_CONTENT_LENGTH'] = max(PREDICT_MAX_BYTES, BATCH_PREDICT_MAX_BYTES)
+
+# Kompresi gzip/brotli untuk response JSON besar (lihat compression.py)
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', '1') == '1'
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4'))
+if COMPRESSION_ENABLED and not brotli_available():
+    print("[Compression] Paket brotli/brotlicffi tidak terpasang, response hanya dikompres gzip")
+
+@app.after_request
+def compress_large_responses(response):
+    if not COMPRESSION_ENABLED:
+        return response
+    return compress_response(
+        response, request.accept_encodings,
+        min_size=COMPRESSION_MIN_SIZE,
+        gzip_level=COMPRESSION_GZIP_LEVEL,
+        brotli_quality=COMPRESSION_BROTLI_QUALITY
+    )
+
 # Upload folder configuration
 UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
+# Content-addressed store: uploads/ab/cd/<sha256>.<ext>, upload identik hanya disimpan sekali
+IMAGE_STORE = ImageStore(UPLOAD_FOLDER)
+
+# Serving /api/uploads:
+# - python: send_file (ETag, Last-Modified, Range) oleh worker Flask
+# - x-accel: header X-Accel-Redirect, nginx yang mengirim file dari location internal UPLOAD_ACCEL_PREFIX
+# - x-sendfile: header X-Sendfile (Apache mod_xsendfile / lighttpd)
+UPLOAD_SERVE_MODE = os.getenv('UPLOAD_SERVE_MODE', 'python').lower()
+UPLOAD_ACCEL_PREFIX = os.getenv('UPLOAD_ACCEL_PREFIX', '/protected-uploads/')
+# File content-addressed tidak pernah berubah -> cache 1 tahun, immutable.
+# Nama file lama (flat) tetap di-cache tapi lebih pendek dan direvalidasi.
+UPLOAD_MAX_AGE = int(os.getenv('UPLOAD_MAX_AGE', str(365 * 24 * 3600)))
+LEGACY_UPLOAD_MAX_AGE = int(os.getenv('LEGACY_UPLOAD_MAX_AGE', str(24 * 3600)))
+CONTENT_ADDRESSED_UPLOAD = re.compile(r'^[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})\.[a-z0-9]+$')
+
+# Thumbnail / WebP on-demand: /api/uploads/<path>?w=256&fmt=webp (lihat image_derivatives.py)
+DERIVATIVE_CACHE = DerivativeCache(
+    os.getenv('DERIVATIVE_CACHE_DIR', os.path.join(os.path.dirname(__file__), 'derivatives')),
+    max_bytes=int(os.getenv('DERIVATIVE_CACHE_MAX_MB', '512')) * 1024 * 1024
+)
+DERIVATIVE_ACCEL_PREFIX = os.getenv('DERIVATIVE_ACCEL_PREFIX', '/protected-derivatives/')
+# Lebar thumbnail untuk image_url di /api/detection-history (kartu riwayat)
+HISTORY_THUMB_WIDTH = int(os.getenv('HISTORY_THUMB_WIDTH', '480'))
+
+# Penulisan file upload dijalankan di background agar tidak menunda inference
+UPLOAD_WRITER = ThreadPoolExecutor(max_workers=int(os.getenv('UPLOAD_WRITER_THREADS', '2')),
+                                   thread_name_prefix='upload-writer')
+
+# Decode + letterbox dijalankan di pool terbatas (PIL melepas GIL) untuk semua endpoint predict.
+# Jika antrean penuh, request dibalas 503 + Retry-After agar latency tidak membengkak
+PREPROCESS_POOL = PreprocessPool(
+    max_workers=int(os.getenv('PREPROCESS_WORKERS', str(os.cpu_count() or 1))),
+    # minimal BATCH_PREDICT_MAX_IMAGES supaya satu request batch penuh selalu bisa diterima
+    max_pending=max(int(os.getenv('PREPROCESS_MAX_PENDING', '64')), BATCH_PREDICT_MAX_IMAGES)
+)
+PREPROCESS_RETRY_AFTER = int(os.getenv('PREPROCESS_RETRY_AFTER', '2'))
+
+def busy_response():
+    """Respons 503 saat antrean preprocessing / inference penuh"""
+    return jsonify({"error": "Server sedang sibuk, silakan coba lagi"}), 503, \
+        {"Retry-After": str(PREPROCESS_RETRY_AFTER)}
+
+def _write_upload(relative_path, data):
+    """Tulis bytes asli upload ke image store"""
+    try:
+        IMAGE_STORE.put(data, relative_path)
+    except Exception as e:
+        print(f"[Upload] Gagal menyimpan {relative_path}: {e}")
+
+# Upload yang masih ditulis di background: relative_path -> Future (lihat wait_pending_upload)
+PENDING_UPLOADS = {}
+PENDING_UPLOADS_LOCK = threading.Lock()
+
+def save_upload_async(data, filename=''):
+    """
+    Simpan upload di background thread (byte-identik).
+    Return (relative_path, sha256 hex); jika file dengan isi sama sudah ada, tidak ditulis ulang.
+    """
+    digest = content_hash(data)
+    relative_path = IMAGE_STORE.relative_path(digest, detect_extension(data, filename))
+    with PENDING_UPLOADS_LOCK:
+        if relative_path in PENDING_UPLOADS or IMAGE_STORE.exists(relative_path):
+            return relative_path, digest
+        future = UPLOAD_WRITER.submit(_write_upload, relative_path, data)
+        PENDING_UPLOADS[relative_path] = future
+    future.add_done_callback(lambda _: _forget_pending_upload(relative_path))
+    return relative_path, digest
+
+def _forget_pending_upload(relative_path):
+    with PENDING_UPLOADS_LOCK:
+        PENDING_UPLOADS.pop(relative_path, None)
+
+def wait_pending_upload(relative_path, timeout=10.0):
+    """Tunggu penulisan background relative_path (image_url sudah dikirim sebelum file ada di disk)"""
+    with PENDING_UPLOADS_LOCK:
+        future = PENDING_UPLOADS.get(relative_path)
+    if future is not None:
+        try:
+            future.result(timeout=timeout)
+        except Exception as e:
+            print(f"[Upload] Menunggu {relative_path} gagal: {e}")
+
 # Load ML model at startup
 # --- INTEGRATION: Load the model (supports both CNN and MobileNetV2) ---
 MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'models', 'citrus_cnn_v1.h5')
@@ -45,6 +177,91 @@ MODEL_TYPE = None  # Will be auto-detected: 'cnn' or 'mobilenetv2'
 CLASS_NAMES = ['Black spot', 'Canker', 'Greening', 'Healthy', 'Melanose']
 IMAGE_SIZE = 256  # Match the training size
 
+# Preprocessing: metode resample (lanczos | bicubic | bilinear | box | nearest) dan JPEG draft decoding
+PREPROCESS_RESAMPLE = os.getenv('PREPROCESS_RESAMPLE', 'lanczos').lower()
+get_resample(PREPROCESS_RESAMPLE)  # validasi config saat startup
+PREPROCESS_JPEG_DRAFT = os.getenv('PREPROCESS_JPEG_DRAFT', '1') == '1'
+
+# Micro-batching untuk /api/predict (request yang datang bersamaan digabung jadi satu batch)
+# BATCH_WINDOW_MS: berapa lama menunggu request lain sebelum batch dijalankan
+BATCH_ENABLED = os.getenv('BATCH_ENABLED', '1') == '1'
+BATCH_MAX_SIZE = int(os.getenv('BATCH_MAX_SIZE', '16'))
+BATCH_WINDOW_MS = float(os.getenv('BATCH_WINDOW_MS', '10'))
+BATCH_MAX_QUEUE = int(os.getenv('BATCH_MAX_QUEUE', '256'))
+PREDICT_BATCHER = None
+
+# Serving function ter-compile (tf.function, opsional XLA) menggantikan MODEL.predict per request
+INFERENCE_COMPILED = os.getenv('INFERENCE_COMPILED', '1') == '1'
+INFERENCE_XLA = os.getenv('INFERENCE_XLA', '0') == '1'
+SERVING_FN = None
+INFERENCE_LATENCY = {}  # Hasil benchmark startup: predict vs compiled (ms per call, batch 1)
+
+# Backend inference: 'keras' (H5, default) atau 'tflite' (hasil scripts/convert_tflite.py)
+INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'keras').lower()
+TFLITE_MODEL_PATH = os.getenv(
+    'TFLITE_MODEL_PATH',
+    os.path.join(os.path.dirname(__file__), '..', 'models', 'citrus_cnn_v1_int8.tflite')
+)
+TFLITE_THREADS = int(os.getenv('TFLITE_THREADS', str(os.cpu_count() or 1)))
+TFLITE_RUNNER = None
+
+# Cache hasil prediksi: key = sha256(bytes gambar) + versi model
+# Versi model berubah setiap model di-load ulang, sehingga cache lama otomatis tidak terpakai
+PREDICTION_CACHE = TTLCache(
+    maxsize=int(os.getenv('PREDICTION_CACHE_SIZE', '2048')),
+    ttl_seconds=float(os.getenv('PREDICTION_CACHE_TTL', '3600'))
+)
+MODEL_VERSION = None
+
+# Cache response endpoint publik (news, feedback publik), diinvalidasi oleh write path.
+# RESPONSE_CACHE_DIR (opsional, mis. /dev/shm/plantvision-cache) dibagi antar worker di satu host
+RESPONSE_CACHE = ResponseCache(
+    maxsize=int(os.getenv('RESPONSE_CACHE_SIZE', '512')),
+    ttl_seconds=float(os.getenv('RESPONSE_CACHE_TTL', '60')),
+    shared_dir=os.getenv('RESPONSE_CACHE_DIR') or None
+)
+# Hanya kombinasi parameter "wajar" yang di-cache supaya jumlah key tetap kecil
+RESPONSE_CACHE_MAX_LIMIT = 100
+NEWS_CATEGORIES = ('teknologi', 'budidaya', 'pasar', 'penelitian')
+
+def cached_response(namespace, key):
+    """
+    Return (response atau None, generation). generation diteruskan ke store_response.
+    Response hit sudah ber-ETag (hash body) dan menjadi 304 jika If-None-Match cocok.
+    """
+    generation = RESPONSE_CACHE.generation(namespace)
+    body = RESPONSE_CACHE.get(namespace, key, generation) if key is not None else None
+    if body is None:
+        return None, generation
+    response = app.response_class(body, mimetype='application/json')
+    response.headers['X-Cache'] = 'HIT'
+    return conditional(response, body_etag(body), request), generation
+
+def store_response(namespace, key, generation, payload):
+    """jsonify(payload) + ETag, simpan body-nya di RESPONSE_CACHE (key None = tidak di-cache)"""
+    response = jsonify(payload)
+    body = response.get_data()
+    if key is not None:
+        RESPONSE_CACHE.set(namespace, key, body, generation)
+        response.headers['X-Cache'] = 'MISS'
+    return conditional(response, body_etag(body), request)
+
+# Warm-up setelah model di-load: semua ukuran batch yang dipakai serving path + beberapa gambar asli.
+# /api/ready baru 200 setelah warm-up selesai (untuk load balancer)
+WARMUP_ENABLED = os.getenv('WARMUP_ENABLED', '1') == '1'
+WARMUP_ASYNC = os.getenv('WARMUP_ASYNC', '1') == '1'
+WARMUP_SAMPLES = int(os.getenv('WARMUP_SAMPLES', '5'))
+WARMUP_BATCH_SIZES = os.getenv('WARMUP_BATCH_SIZES')  # contoh: "1,4,8,16"; default 1..BATCH_MAX_SIZE
+WARMUP_DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'plantvision_dataset', 'val')
+MODEL_READY = threading.Event()
+WARMUP_STATUS = {"state": "pending"}
+
+def compute_model_version(path):
+    """Identitas model = backend + path + mtime + ukuran file"""
+    stat = os.stat(path)
+    raw = f"{INFERENCE_BACKEND}:{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:12]
+
 def detect_model_type(model):
     """Auto-detect if model is MobileNetV2-based or custom CNN"""
     try:
@@ -56,18 +273,144 @@ def detect_model_type(model):
     except:
         return 'cnn'
 
+def predict_batch(batch):
+    """Forward pass untuk batch (N, IMAGE_SIZE, IMAGE_SIZE, 3) -> probabilitas (N, num_classes)"""
+    if TFLITE_RUNNER is not None:
+        return TFLITE_RUNNER.predict(batch)
+    if SERVING_FN is not None:
+        return SERVING_FN(tf.constant(batch, dtype=tf.float32)).numpy()
+    return MODEL.predict(batch, verbose=0)
+
+def build_compiled_inference():
+    """Compile serving function dan catat perbandingan latency-nya dengan MODEL.predict"""
+    global SERVING_FN, INFERENCE_LATENCY
+    try:
+        serving_fn = build_serving_fn(MODEL, IMAGE_SIZE, jit_compile=INFERENCE_XLA)
+        sample = np.zeros((1, IMAGE_SIZE, IMAGE_SIZE, 3), dtype=np.float32)
+        predict_ms = measure_latency(lambda b: MODEL.predict(b, verbose=0), sample)
+        compiled_ms = measure_latency(lambda b: serving_fn(tf.constant(b)).numpy(), sample)
+        SERVING_FN = serving_fn
+        INFERENCE_LATENCY = {
+            "predict_ms": round(predict_ms, 2),
+            "compiled_ms": round(compiled_ms, 2),
+            "speedup": round(predict_ms / compiled_ms, 2) if compiled_ms else None,
+            "xla": INFERENCE_XLA
+        }
+        print(f"[Inference] Compiled serving fn: {compiled_ms:.2f} ms vs predict {predict_ms:.2f} ms (XLA={INFERENCE_XLA})")
+    except Exception as e:
+        SERVING_FN = None
+        print(f"[Inference] Gagal compile serving function, fallback ke MODEL.predict: {e}")
+
+def is_model_loaded():
+    return MODEL is not None or TFLITE_RUNNER is not None
+
+def run_inference(img_array):
+    """Prediksi satu gambar (IMAGE_SIZE, IMAGE_SIZE, 3), lewat micro-batcher jika aktif"""
+    if PREDICT_BATCHER is not None:
+        return PREDICT_BATCHER.submit(img_array)
+    return predict_batch(np.expand_dims(img_array, axis=0))[0]
+
+def get_warmup_batch_sizes():
+    if WARMUP_BATCH_SIZES:
+        return sorted({int(x) for x in WARMUP_BATCH_SIZES.split(',') if x.strip()})
+    return list(range(1, max(1, BATCH_MAX_SIZE) + 1))
+
+def load_warmup_samples():
+    """Ambil beberapa gambar asli dari data/plantvision_dataset/val (bergiliran per kelas)"""
+    per_class = [sorted(glob.glob(os.path.join(WARMUP_DATA_DIR, class_name, '*')))
+                 for class_name in CLASS_NAMES]
+    paths = []
+    depth = max((len(files) for files in per_class), default=0)
+    for index in range(depth):
+        for files in per_class:
+            if index < len(files) and len(paths) < WARMUP_SAMPLES:
+                paths.append(files[index])
+    samples = []
+    for path in paths:
+        try:
+            samples.append(letterbox(path, IMAGE_SIZE, resample=PREPROCESS_RESAMPLE, draft=PREPROCESS_JPEG_DRAFT))
+        except Exception as e:
+            print(f"[Warmup] Lewati sampel {path}: {e}")
+    return samples
+
+def warm_up_model():
+    """Jalankan forward pass untuk setiap ukuran batch + sampel asli, lalu set MODEL_READY"""
+    global WARMUP_STATUS
+    start_time = time.time()
+    batch_sizes = get_warmup_batch_sizes()
+    WARMUP_STATUS = {"state": "running", "batch_sizes": batch_sizes}
+    try:
+        # 1. Tensor nol untuk setiap ukuran batch (graph/XLA/TFLite dialokasikan per shape)
+        for batch_size in batch_sizes:
+            predict_batch(np.zeros((batch_size, IMAGE_SIZE, IMAGE_SIZE, 3), dtype=np.float32))
+
+        # 2. Sampel asli lewat serving path yang sama dengan request (termasuk micro-batcher)
+        samples = load_warmup_samples()
+        for img_array in samples:
+            run_inference(img_array)
+
+        duration_ms = (time.time() - start_time) * 1000
+        WARMUP_STATUS = {
+            "state": "done",
+            "batch_sizes": batch_sizes,
+            "samples": len(samples),
+            "duration_ms": round(duration_ms, 1)
+        }
+        MODEL_READY.set()
+        print(f"[Warmup] Selesai dalam {duration_ms:.0f} ms ({len(batch_sizes)} ukuran batch, {len(samples)} sampel)")
+    except Exception as e:
+        WARMUP_STATUS = {"state": "failed", "error": str(e)}
+        print(f"[Warmup] Gagal: {e}")
+
+def start_warmup():
+    if not WARMUP_ENABLED:
+        WARMUP_STATUS.update({"state": "skipped"})
+        MODEL_READY.set()
+        return
+    if WARMUP_ASYNC:
+        threading.Thread(target=warm_up_model, name='model-warmup', daemon=True).start()
+    else:
+        warm_up_model()
+
 def load_model_at_startup():
-    """Load Keras H5 model from disk and detect architecture"""
-    global MODEL, MODEL_TYPE
+    """Load model (Keras H5 atau TFLite sesuai INFERENCE_BACKEND) dan siapkan serving path"""
+    global MODEL, MODEL_TYPE, TFLITE_RUNNER, PREDICT_BATCHER, MODEL_VERSION
     try:
-        if os.path.exists(MODEL_PATH):
+        if INFERENCE_BACKEND == 'tflite':
+            if not os.path.exists(TFLITE_MODEL_PATH):
+                print(f"Warning: TFLite model not found at {TFLITE_MODEL_PATH}")
+                return
+            print(f"Loading TFLite model from {TFLITE_MODEL_PATH}")
+            TFLITE_RUNNER = TFLiteRunner(TFLITE_MODEL_PATH, num_threads=TFLITE_THREADS)
+            MODEL_TYPE = 'tflite'
+            print(f"TFLite model loaded! threads={TFLITE_THREADS}, input dtype={TFLITE_RUNNER.input_dtype.__name__}")
+        elif os.path.exists(MODEL_PATH):
             print(f"Loading model from {MODEL_PATH}")
             MODEL = keras_load_model(MODEL_PATH)
             MODEL_TYPE = detect_model_type(MODEL)
             print(f"Model loaded successfully! Architecture: {MODEL_TYPE.upper()}")
             print(f"Model input shape: {MODEL.input_shape}")
+            if INFERENCE_COMPILED:
+                build_compiled_inference()
         else:
             print(f"Warning: Model not found at {MODEL_PATH}")
+            return
+
+        MODEL_VERSION = compute_model_version(TFLITE_MODEL_PATH if TFLITE_RUNNER is not None else MODEL_PATH)
+        PREDICTION_CACHE.clear()
+        print(f"[Model] Version: {MODEL_VERSION}")
+
+        if BATCH_ENABLED and PREDICT_BATCHER is None:
+            PREDICT_BATCHER = MicroBatcher(
+                predict_batch,
+                max_batch_size=BATCH_MAX_SIZE,
+                max_wait_ms=BATCH_WINDOW_MS,
+                max_queue_size=BATCH_MAX_QUEUE
+            )
+            print(f"[Batching] Aktif: max_batch={BATCH_MAX_SIZE}, window={BATCH_WINDOW_MS}ms")
+
+        MODEL_READY.clear()
+        start_warmup()
     except Exception as e:
         print(f"Error loading model: {e}")
 
@@ -95,20 +438,148 @@ DB_NAME = os.getenv('DB_NAME', 'plantvision_db')
 
 print(f"[Backend] Connecting to MySQL DB='{DB_NAME}' on {DB_HOST}:{DB_PORT} as {DB_USER}")
 
+# Connection pool: koneksi dipakai ulang antar request (lihat db_pool.py)
+DB_POOL = ConnectionPool(
+    lambda: mysql.connector.connect(
+        host=DB_HOST,
+        port=DB_PORT,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        database=DB_NAME
+    ),
+    size=int(os.getenv('DB_POOL_SIZE', '5')),
+    max_overflow=int(os.getenv('DB_POOL_MAX_OVERFLOW', '10')),
+    recycle=float(os.getenv('DB_POOL_RECYCLE', '1800')),
+    max_lifetime=float(os.getenv('DB_POOL_MAX_LIFETIME', '3600')),
+    pre_ping=os.getenv('DB_POOL_PRE_PING', '1') == '1',
+    pre_ping_after=float(os.getenv('DB_POOL_PRE_PING_AFTER', '5')),
+    timeout=float(os.getenv('DB_POOL_TIMEOUT', '10'))
+)
+
 def get_db_connection():
-    """Fungsi helper untuk membuat koneksi database"""
+    """
+    Fungsi helper untuk mengambil koneksi database dari pool.
+    conn.close() mengembalikan koneksi ke pool. Return None jika gagal.
+    """
     try:
-        conn = mysql.connector.connect(
-            host=DB_HOST,
-            port=DB_PORT,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            database=DB_NAME
-        )
-        return conn
+        return DB_POOL.connection()
     except mysql.connector.Error as e:
         print(f"Error connecting to MySQL: {e}")
         return None
+    except PoolTimeout as e:
+        print(f"[DB Pool] {e}")
+        return None
+
+def insert_history_fallback(cursor, row):
+    """FALLBACK: Jika DetectionHistory menolak baris, simpan ke DaunJeruk+Diagnosa"""
+    cursor.execute("INSERT INTO DaunJeruk (user_id, citra) VALUES (%s, %s)", (row['user_id'], row['image_path']))
+    daun_id = cursor.lastrowid
+    hasil_text = f"{row['disease_name']} ({float(row['confidence']):.1f}%)"
+    cursor.execute("INSERT INTO Diagnosa (daun_id, hasil_deteksi) VALUES (%s, %s)", (daun_id, hasil_text))
+    print(f"[Fallback] Saved to DaunJeruk+Diagnosa")
+
+def record_stats(cursor, entity, new=None, old=None, created=None):
+    """
+    Perbarui StatsCounters (stats_counters.py) di transaksi yang sama dengan write-nya.
+    new saja = baris baru, old saja = baris dihapus, keduanya = dimensi baris berubah.
+    Tabel StatsCounters yang belum dibuat (errno 1146) tidak menggagalkan write;
+    error lain diteruskan supaya counter dan data di-rollback bersama.
+    """
+    changes = []
+    if old is not None:
+        changes.append((old, -1, created))
+    if new is not None:
+        changes.append((new, 1, created))
+    apply_stats_changes(cursor, entity, changes)
+
+def record_detection_stats(cursor, rows):
+    """
+    Hook HistoryWriter.after_insert: counter per disease_name/severity per hari deteksi,
+    plus counter tulis per user (validator ETag /api/detection-history)
+    """
+    apply_stats_changes(cursor, 'detection', [(row, 1, row['detection_date']) for row in rows])
+    writes = {}
+    for row in rows:
+        writes[row['user_id']] = writes.get(row['user_id'], 0) + 1
+    try:
+        stats_counters.bump_writes(cursor, HISTORY_WRITES, writes)
+    except mysql.connector.Error as e:
+        if e.errno != 1146:
+            raise
+
+def apply_stats_changes(cursor, entity, changes):
+    try:
+        stats_counters.bump_many(cursor, entity, changes)
+    except mysql.connector.Error as e:
+        if e.errno != 1146:
+            raise
+
+def read_stats_rows(cursor, entity, stats_sql, table):
+    """
+    Rows untuk stats.summarize_*: dari StatsCounters (beberapa baris, tidak tergantung
+    ukuran tabel). Jika tabel belum ada atau counter entity belum pernah dibangun
+    (scripts/reconcile_stats.py), agregasi langsung tabel sumbernya.
+    """
+    rows = read_rebuilt_counters(cursor, entity)
+    if rows is not None:
+        return rows
+    cursor.execute(stats_sql.format(table=table))
+    return cursor.fetchall()
+
+def read_rebuilt_counters(cursor, entity):
+    """Counter 'all' entity, atau None jika StatsCounters belum ada / belum di-rebuild"""
+    try:
+        return stats_counters.read_rebuilt_all_time(cursor, entity)
+    except mysql.connector.Error as e:
+        if e.errno != 1146:
+            raise
+        return None
+
+# Katalog DiseaseInfo ber-versi: DetectionHistory hanya menyimpan disease_info_id.
+# Versi saat ini didaftarkan di worker HistoryWriter; request hanya membaca id dari memori
+DISEASE_CATALOG = DiseaseCatalog(get_db_connection)
+DISEASE_INFO_ID_INDEX = HISTORY_COLUMNS.index('disease_info_id')
+DISEASE_NAME_INDEX = HISTORY_COLUMNS.index('disease_name')
+
+def resolve_disease_info_ids(rows):
+    """Hook HistoryWriter.before_write: lengkapi disease_info_id baris yang di-submit sebelum katalog terdaftar"""
+    pending = [row for row in rows if row[DISEASE_INFO_ID_INDEX] is None]
+    if not pending or not DISEASE_CATALOG.ensure_registered():
+        return
+    for row in pending:
+        row[DISEASE_INFO_ID_INDEX] = DISEASE_CATALOG.current_id(row[DISEASE_NAME_INDEX])
+
+# Write-behind DetectionHistory: /api/predict tidak menunggu INSERT (lihat history_writer.py)
+# history_id dialokasikan di muka dari tabel IdSequence (db/create_id_sequence.sql)
+HISTORY_WRITER = HistoryWriter(
+    get_db_connection,
+    spool_path=os.getenv('HISTORY_SPOOL_PATH', os.path.join(os.path.dirname(__file__), 'spool', 'detection_history.jsonl')),
+    id_allocator=IdAllocator(get_db_connection, block_size=int(os.getenv('HISTORY_ID_BLOCK_SIZE', '100'))),
+    before_write=resolve_disease_info_ids,
+    fallback=insert_history_fallback,
+    after_insert=record_detection_stats,
+    flush_interval_ms=float(os.getenv('HISTORY_FLUSH_MS', '200')),
+    max_batch_size=int(os.getenv('HISTORY_MAX_BATCH', '100')),
+    max_retries=int(os.getenv('HISTORY_MAX_RETRIES', '3'))
+)
+atexit.register(HISTORY_WRITER.stop)
+# Daftarkan katalog di background saat startup (jika gagal, dicoba lagi oleh writer saat ada baris)
+threading.Thread(target=DISEASE_CATALOG.ensure_registered, name='disease-catalog', daemon=True).start()
+
+@contextmanager
+def db_connection():
+    """
+    Context manager koneksi dari pool:
+        with db_connection() as conn:
+            if conn is None: ...  # koneksi gagal
+    Koneksi selalu dikembalikan ke pool (rollback dulu jika terjadi exception).
+    """
+    conn = get_db_connection()
+    if conn is None:
+        yield None
+        return
+    with conn:
+        yield conn
 
 def generate_unique_username(base: str, cursor) -> str:
     """Generate username unik berdasarkan base (tanpa domain). Tambah angka jika bentrok."""
@@ -131,8 +602,6 @@ def register_user():
     API untuk mendaftarkan pengguna baru (Petani).
     Menerima data JSON: nama, email, username, phone, password.
     """
-    conn = None
-    cursor = None
     try:
         # 1. Ambil data JSON dari request
         data = request.json
@@ -156,36 +625,37 @@ def register_user():
         hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
         # 3. Dapatkan koneksi database
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-            
-        cursor = conn.cursor()
-
-        # 4. Buat username unik (frontend tidak menyediakan eksplisit username)
-        email_local_part = (email.split('@')[0]) if '@' in email else email
-        username = generate_unique_username(email_local_part, cursor)
-
-        # 5. Eksekusi query SQL termasuk accept_terms
-        query = "INSERT INTO User (nama, email, username, phone, password, role, status_akun, accept_terms) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"
-        values = (nama, email, username, phone or None, hashed_password, 'user', 'aktif', 1)
-
-        cursor.execute(query, values)
-        conn.commit()
-
-        # 5. Kirim respons sukses
-        user_id = cursor.lastrowid
-        return jsonify({
-            "message": f"Registrasi sukses untuk user: {username}",
-            "user_id": user_id,
-            "nama": nama,
-            "email": email,
-            "username": username,
-            "phone": phone,
-            "accept_terms": True,
-            "status_akun": "aktif",
-            "role": "user"
-        }), 201
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor()
+
+            # 4. Buat username unik (frontend tidak menyediakan eksplisit username)
+            email_local_part = (email.split('@')[0]) if '@' in email else email
+            username = generate_unique_username(email_local_part, cursor)
+
+            # 5. Eksekusi query SQL termasuk accept_terms
+            query = "INSERT INTO User (nama, email, username, phone, password, role, status_akun, accept_terms) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"
+            values = (nama, email, username, phone or None, hashed_password, 'user', 'aktif', 1)
+
+            cursor.execute(query, values)
+            record_stats(cursor, 'user', {'role': 'user', 'status_akun': 'aktif'})
+            conn.commit()
+
+            # 5. Kirim respons sukses
+            user_id = cursor.lastrowid
+            return jsonify({
+                "message": f"Registrasi sukses untuk user: {username}",
+                "user_id": user_id,
+                "nama": nama,
+                "email": email,
+                "username": username,
+                "phone": phone,
+                "accept_terms": True,
+                "status_akun": "aktif",
+                "role": "user"
+            }), 201
 
     except mysql.connector.Error as err:
         # Tangani error spesifik (misal: duplicate entry)
@@ -195,12 +665,6 @@ def register_user():
         return jsonify({"error": str(err)}), 500
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        # 6. Pastikan koneksi dan kursor ditutup
-        if cursor:
-            cursor.close()
-        if conn and conn.is_connected():
-            conn.close()
 
 
 # --- API LOGIN (F-01) ---
@@ -210,8 +674,6 @@ def login_user():
     API untuk login pengguna.
     Menerima data JSON: username, password.
     """
-    conn = None
-    cursor = None
     try:
         # 1. Ambil data JSON dari request
         data = request.json
@@ -225,81 +687,100 @@ def login_user():
             return jsonify({"error": "Username/email dan password diperlukan"}), 400
 
         # 2. Dapatkan koneksi database
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-            
-        # Gunakan dictionary=True agar hasil query bisa diakses berdasarkan nama kolom
-        cursor = conn.cursor(dictionary=True) 
-
-        # 3. Cari user baik dengan email maupun username (lebih toleran)
-        username_or_email = username_or_email.strip()
-        query = "SELECT * FROM User WHERE email = %s OR username = %s"
-        cursor.execute(query, (username_or_email, username_or_email))
-        user = cursor.fetchone() # Ambil satu data user
-        try:
-            print(f"[Login] DB='{DB_NAME}', found={bool(user)} for '{username_or_email}'")
-        except Exception:
-            pass
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            # Gunakan dictionary=True agar hasil query bisa diakses berdasarkan nama kolom
+            cursor = conn.cursor(dictionary=True)
+
+            # 3. Cari user baik dengan email maupun username (lebih toleran)
+            username_or_email = username_or_email.strip()
+            query = "SELECT * FROM User WHERE email = %s OR username = %s"
+            cursor.execute(query, (username_or_email, username_or_email))
+            user = cursor.fetchone() # Ambil satu data user
+            try:
+                print(f"[Login] DB='{DB_NAME}', found={bool(user)} for '{username_or_email}'")
+            except Exception:
+                pass
 
-        # 4. Jika user tidak ditemukan
-        if not user:
-            return jsonify({"error": "Username atau password salah"}), 401 # 401 Unauthorized
+            # 4. Jika user tidak ditemukan
+            if not user:
+                return jsonify({"error": "Username atau password salah"}), 401 # 401 Unauthorized
 
-        # 5. Bandingkan password
-        try:
-            # Debug: Print tipe data password dari database
-            # Ambil password hash (sudah disimpan sebagai string ASCII)
-            # Type assertion untuk Pylance - cursor dengan dictionary=True mengembalikan dict
-            user_data: dict = user  # type: ignore
-            stored_hash = str(user_data['password'])
-            password_match = bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
-            print(f"Password match: {password_match}")
-
-            if password_match:
-                # Password cocok!
-                user_id_val = user_data.get('user_id') or user_data.get('id')
-                status_val = user_data.get('status_akun') or user_data.get('status') or 'aktif'
-                return jsonify({
-                    "message": f"Login sukses. Selamat datang, {user_data['nama']}!",
-                    "user_id": user_id_val,
-                    "nama": user_data['nama'],
-                    "email": user_data['email'],
-                    "username": user_data['username'],
-                    "phone": user_data['phone'],
-                    "role": user_data['role'],
-                    "status": status_val
-                }), 200
+            # 5. Bandingkan password
+            try:
+                # Debug: Print tipe data password dari database
+                # Ambil password hash (sudah disimpan sebagai string ASCII)
+                # Type assertion untuk Pylance - cursor dengan dictionary=True mengembalikan dict
+                user_data: dict = user  # type: ignore
+                stored_hash = str(user_data['password'])
+                password_match = bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
+                print(f"Password match: {password_match}")
+
+                if password_match:
+                    # Password cocok!
+                    user_id_val = user_data.get('user_id') or user_data.get('id')
+                    status_val = user_data.get('status_akun') or user_data.get('status') or 'aktif'
+                    return jsonify({
+                        "message": f"Login sukses. Selamat datang, {user_data['nama']}!",
+                        "user_id": user_id_val,
+                        "nama": user_data['nama'],
+                        "email": user_data['email'],
+                        "username": user_data['username'],
+                        "phone": user_data['phone'],
+                        "role": user_data['role'],
+                        "status": status_val
+                    }), 200
+                else:
+                    return jsonify({"error": "Username atau password salah"}), 401
+            except Exception as e:
+                print(f"Error detail saat verifikasi password: {str(e)}")
+                return jsonify({"error": f"Terjadi kesalahan saat verifikasi: {str(e)}"}), 500
             else:
+                # Password salah
                 return jsonify({"error": "Username atau password salah"}), 401
-        except Exception as e:
-            print(f"Error detail saat verifikasi password: {str(e)}")
-            return jsonify({"error": f"Terjadi kesalahan saat verifikasi: {str(e)}"}), 500
-        else:
-            # Password salah
-            return jsonify({"error": "Username atau password salah"}), 401
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        # 6. Pastikan koneksi dan kursor ditutup
-        if cursor:
-            cursor.close()
-        if conn and conn.is_connected():
-            conn.close()
 
 
 
 # --- API PREDIKSI (F-08) ---
 # Disease info sudah diimport dari disease_info.py (lebih lengkap)
 
+def preprocess_image(image_bytes, out=None):
+    """
+    Decode bytes gambar lalu SMART RESIZE (letterbox) ke (IMAGE_SIZE, IMAGE_SIZE, 3) float32.
+    Tanpa pembagian 255 (MobileNetV2 ada preprocess internal). Lihat preprocessing.py.
+    """
+    return letterbox(image_bytes, IMAGE_SIZE, resample=PREPROCESS_RESAMPLE,
+                     draft=PREPROCESS_JPEG_DRAFT, out=out)
+
+def get_severity(top_prob):
+    """Tentukan severity berdasarkan confidence"""
+    if top_prob >= 0.9:
+        return "tinggi"
+    elif top_prob >= 0.7:
+        return "sedang"
+    return "rendah"
+
+def build_history_values(user_id, image_path, top_class, top_prob):
+    """
+    Nilai baris DetectionHistory untuk HISTORY_WRITER.submit (teks penyakit lewat disease_info_id).
+    disease_info_id dibaca dari memori; jika katalog belum terdaftar (None) dilengkapi oleh writer.
+    """
+    return (
+        user_id, image_path, top_class, top_prob * 100, get_severity(top_prob),
+        DISEASE_CATALOG.current_id(top_class),
+        datetime.now()  # waktu deteksi, bukan waktu baris ditulis oleh writer
+    )
+
 @app.route('/api/predict', methods=['POST'])
 def predict_disease():
-    if MODEL is None:
+    if not is_model_loaded():
         return jsonify({"error": "Model AI belum siap"}), 500
 
-    conn = None
-    cursor = None
     try:
         if 'image' not in request.files:
             return jsonify({"error": "Tidak ada gambar"}), 400
@@ -310,39 +791,33 @@ def predict_disease():
         if file.filename == '':
             return jsonify({"error": "Nama file kosong"}), 400
 
-        # 1. Simpan File
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = secure_filename(f"{timestamp}_{file.filename}")
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        # 1. Baca file ke memori; penyimpanan ke disk jalan di background (byte-identik)
+        # filename = path relatif di image store (ab/cd/<sha256>.<ext>)
+        image_bytes = file.read()
+        if len(image_bytes) > PREDICT_MAX_BYTES:
+            return jsonify({"error": "Ukuran gambar melebihi 16MB"}), 413
+        filename, image_hash = save_upload_async(image_bytes, secure_filename(file.filename))
 
-        # 2. PREPROCESSING: SMART RESIZE (PENTING!)
+        # Cek cache dulu: gambar yang sama (retry / double tap) tidak perlu diprediksi ulang
         start_time = time.time()
-        img = Image.open(filepath).convert('RGB')
-        
-        # Buat kanvas hitam persegi sesuai ukuran model
-        target_size = (IMAGE_SIZE, IMAGE_SIZE)
-        new_img = Image.new("RGB", target_size, (0, 0, 0))
-        
-        # Resize gambar asli agar muat di kanvas tanpa distorsi (gepeng)
-        img.thumbnail(target_size, Image.Resampling.LANCZOS)
-        
-        # Tempel gambar asli di tengah-tengah kanvas hitam
-        left = (target_size[0] - img.size[0]) // 2
-        top = (target_size[1] - img.size[1]) // 2
-        new_img.paste(img, (left, top))
-        
-        # Konversi ke Array
-        img_array = np.array(new_img).astype(np.float32) 
-        
-        # HAPUS PEMBAGIAN 255.0 (MobileNetV2 ada preprocess internal)
-        # img_array = img_array / 255.0  <-- JANGAN DILAKUKAN
-        
-        # Tambah dimensi batch
-        img_array = np.expand_dims(img_array, axis=0)
+        cache_key = f"{MODEL_VERSION}:{image_hash}"
+        predictions = PREDICTION_CACHE.get(cache_key)
+        cached = predictions is not None
+
+        if not cached:
+            # 2. PREPROCESSING: SMART RESIZE (PENTING!) di preprocessing pool
+            try:
+                img_array = PREPROCESS_POOL.submit(preprocess_image, image_bytes).result()
+            except PoolSaturated:
+                return busy_response()
+
+            # 3. Prediksi (dimensi batch ditambahkan oleh micro-batcher)
+            try:
+                predictions = run_inference(img_array)
+            except BatcherSaturated:
+                return busy_response()
+            PREDICTION_CACHE.set(cache_key, predictions)
 
-        # 3. Prediksi
-        predictions = MODEL.predict(img_array, verbose=0)[0]
         inference_time = (time.time() - start_time) * 1000
         
         # Ambil hasil tertinggi
@@ -362,60 +837,14 @@ def predict_disease():
             print(f"Error getting disease info: {e}")
             disease_info = {}
 
-        # 5. Simpan ke Database (REFACTORED: Prioritas DetectionHistory)
+        # 5. Simpan ke DetectionHistory (write-behind, fallback DaunJeruk+Diagnosa di writer)
         history_id = None
         if user_id:
-            conn = get_db_connection()
-            if conn:
-                cursor = conn.cursor()
-                
-                # NEW: Simpan ke DetectionHistory dengan data lengkap
-                try:
-                    # Tentukan severity berdasarkan confidence
-                    if top_prob >= 0.9:
-                        severity = "tinggi"
-                    elif top_prob >= 0.7:
-                        severity = "sedang"
-                    else:
-                        severity = "rendah"
-                    
-                    # Ekstrak data dari disease_info
-                    description = disease_info.get('description', '')
-                    symptoms = json.dumps(disease_info.get('symptoms', []))
-                    treatment = json.dumps(disease_info.get('treatment', []))
-                    prevention = json.dumps(disease_info.get('prevention', []))
-                    
-                    sql_history = """
-                        INSERT INTO DetectionHistory 
-                        (user_id, image_path, disease_name, confidence, severity, 
-                         description, symptoms, treatment, prevention)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """
-                    cursor.execute(sql_history, (
-                        user_id, filename, top_class, top_prob * 100, severity,
-                        description, symptoms, treatment, prevention
-                    ))
-                    history_id = cursor.lastrowid
-                    print(f"[DetectionHistory] Saved ID: {history_id}")
-                    
-                except Exception as e:
-                    print(f"[DetectionHistory] Error: {e}")
-                    # FALLBACK: Jika DetectionHistory gagal, simpan ke DaunJeruk+Diagnosa
-                    try:
-                        sql_daun = "INSERT INTO DaunJeruk (user_id, citra) VALUES (%s, %s)"
-                        cursor.execute(sql_daun, (user_id, filename))
-                        daun_id = cursor.lastrowid
-                        
-                        hasil_text = f"{top_class} ({top_prob*100:.1f}%)"
-                        sql_diag = "INSERT INTO Diagnosa (daun_id, hasil_deteksi) VALUES (%s, %s)"
-                        cursor.execute(sql_diag, (daun_id, hasil_text))
-                        
-                        print(f"[Fallback] Saved to DaunJeruk+Diagnosa")
-                    except Exception as fallback_err:
-                        print(f"[Fallback] Error: {fallback_err}")
-                
-                conn.commit()
-                
+            history_id = HISTORY_WRITER.submit(build_history_values(
+                user_id, filename, top_class, top_prob
+            ))
+            print(f"[DetectionHistory] Queued ID: {history_id}")
+
         # 6. Response
         return jsonify({
             "class": top_class,
@@ -423,91 +852,396 @@ def predict_disease():
             "inference_time": f"{inference_time:.2f} ms",
             "image_url": f"/api/uploads/{filename}",
             "disease_info": disease_info,
-            "history_id": history_id
+            "history_id": history_id,
+            "cached": cached
         }), 200
 
     except Exception as e:
         print(f"Error Predict: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cursor: cursor.close()
-        if conn: conn.close()
+
+
+# --- API PREDIKSI BATCH ---
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif', '.tif', '.tiff')
+
+def collect_batch_uploads():
+    """
+    Kumpulkan (nama_file, bytes) dari field 'image' (boleh berulang) dan/atau 'archive' (zip).
+    Raise ValueError jika melebihi BATCH_PREDICT_MAX_IMAGES / BATCH_PREDICT_MAX_BYTES.
+    """
+    uploads = []
+    total_bytes = 0
+
+    def add(name, data):
+        nonlocal total_bytes
+        total_bytes += len(data)
+        if len(uploads) >= BATCH_PREDICT_MAX_IMAGES:
+            raise ValueError(f"Maksimal {BATCH_PREDICT_MAX_IMAGES} gambar per request")
+        if total_bytes > BATCH_PREDICT_MAX_BYTES:
+            raise ValueError(f"Total ukuran gambar melebihi {BATCH_PREDICT_MAX_BYTES // (1024 * 1024)}MB")
+        uploads.append((name, data))
+
+    for file in request.files.getlist('image'):
+        if file.filename:
+            add(secure_filename(file.filename), file.read())
+
+    archive = request.files.get('archive')
+    if archive and archive.filename:
+        with zipfile.ZipFile(io.BytesIO(archive.read())) as zf:
+            for info in zf.infolist():
+                if info.is_dir() or not info.filename.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                # Cek ukuran asli sebelum extract (hindari zip bomb)
+                if total_bytes + info.file_size > BATCH_PREDICT_MAX_BYTES:
+                    raise ValueError(f"Total ukuran gambar melebihi {BATCH_PREDICT_MAX_BYTES // (1024 * 1024)}MB")
+                add(secure_filename(os.path.basename(info.filename)), zf.read(info))
+
+    return uploads
+
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_disease_batch():
+    """
+    API prediksi banyak gambar dalam satu request
+    Form: image (boleh lebih dari satu) dan/atau archive (zip), user_id (optional)
+    Returns: {total, succeeded, failed, results[]}; tiap item sama dengan respons /api/predict
+    """
+    if not is_model_loaded():
+        return jsonify({"error": "Model AI belum siap"}), 500
+
+    try:
+        user_id = request.form.get('user_id')
+        try:
+            uploads = collect_batch_uploads()
+        except zipfile.BadZipFile:
+            return jsonify({"error": "File archive bukan zip yang valid"}), 400
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 413
+
+        if not uploads:
+            return jsonify({"error": "Tidak ada gambar"}), 400
+
+        # 1. Simpan file (background) dan cek cache per gambar
+        start_time = time.time()
+        items = []
+        for name, data in uploads:
+            filename, image_hash = save_upload_async(data, name)
+            cache_key = f"{MODEL_VERSION}:{image_hash}"
+            predictions = PREDICTION_CACHE.get(cache_key)
+            items.append({
+                "name": name,
+                "filename": filename,
+                "cache_key": cache_key,
+                "predictions": predictions,
+                "cached": predictions is not None,
+                "error": None
+            })
+
+        # 2. Preprocessing paralel untuk gambar yang belum ada di cache,
+        #    setiap worker menulis langsung ke barisnya di buffer batch
+        to_process = [(item, data) for (_, data), item in zip(uploads, items) if not item["cached"]]
+        buffer = allocate_batch(len(to_process), IMAGE_SIZE)
+        try:
+            futures = PREPROCESS_POOL.submit_many(
+                preprocess_image, [(data, buffer[i]) for i, (_, data) in enumerate(to_process)]
+            )
+        except PoolSaturated:
+            return busy_response()
+        ready = []
+        for i, ((item, _), future) in enumerate(zip(to_process, futures)):
+            try:
+                future.result()
+                ready.append(i)
+            except Exception as e:
+                item["error"] = f"Gambar tidak valid: {e}"
+        if len(ready) < len(to_process):
+            buffer = buffer[ready]  # buang baris gambar yang gagal
+        ready_items = [to_process[i][0] for i in ready]
+
+        # 3. Inference per chunk BATCH_MAX_SIZE (langsung, tanpa antre di micro-batcher)
+        for start in range(0, len(ready_items), BATCH_MAX_SIZE):
+            outputs = predict_batch(buffer[start:start + BATCH_MAX_SIZE])
+            for item, predictions in zip(ready_items[start:start + BATCH_MAX_SIZE], outputs):
+                item["predictions"] = np.asarray(predictions)
+                PREDICTION_CACHE.set(item["cache_key"], item["predictions"])
+
+        inference_time = (time.time() - start_time) * 1000
+
+        # 4. Susun hasil per gambar
+        results = []
+        history_values = []
+        for item in items:
+            if item["predictions"] is None:
+                results.append({"filename": item["name"], "error": item["error"] or "Gagal memproses gambar"})
+                continue
+
+            predictions = item["predictions"]
+            top_index = int(np.argmax(predictions))
+            top_class = CLASS_NAMES[top_index]
+            top_prob = float(predictions[top_index])
+            try:
+                disease_info = get_disease_info(top_class)
+            except Exception as e:
+                print(f"Error getting disease info: {e}")
+                disease_info = {}
+
+            result = {
+                "filename": item["name"],
+                "class": top_class,
+                "confidence": f"{top_prob*100:.1f}%",
+                "inference_time": f"{inference_time / len(items):.2f} ms",
+                "image_url": f"/api/uploads/{item['filename']}",
+                "disease_info": disease_info,
+                "history_id": None,
+                "cached": item["cached"]
+            }
+            results.append(result)
+            if user_id:
+                history_values.append((result, build_history_values(
+                    user_id, item["filename"], top_class, top_prob
+                )))
+
+        # 5. Antrekan semua DetectionHistory ke write-behind (ditulis sebagai multi-row INSERT)
+        if history_values:
+            history_ids = HISTORY_WRITER.submit_many([values for _, values in history_values])
+            for (result, _), history_id in zip(history_values, history_ids):
+                result["history_id"] = history_id
+            print(f"[DetectionHistory] Batch queued {len(history_values)} rows")
+
+        succeeded = sum(1 for r in results if "error" not in r)
+        return jsonify({
+            "total": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "inference_time": f"{inference_time:.2f} ms",
+            "results": results
+        }), 200
+
+    except Exception as e:
+        print(f"Error Predict Batch: {e}")
+        return jsonify({"error": str(e)}), 500
 
 
 # --- API DETECTION HISTORY ---
+def legacy_history_info(row_data):
+    """Teks penyakit untuk baris tanpa disease_info_id (belum dimigrasi / katalog tidak tersedia)"""
+    if row_data['description'] is None and row_data['symptoms'] is None:
+        return get_disease_info(row_data['disease_name'])
+    return {
+        "description": row_data['description'],
+        "symptoms": json.loads(row_data['symptoms']) if row_data['symptoms'] else [],
+        "treatment": json.loads(row_data['treatment']) if row_data['treatment'] else [],
+        "prevention": json.loads(row_data['prevention']) if row_data['prevention'] else []
+    }
+
+HISTORY_PAGE_DEFAULT = 50
+HISTORY_PAGE_MAX = 200
+HISTORY_WRITES = 'history_writes'
+
+def read_history_writes(cursor, user_id):
+    """Jumlah baris DetectionHistory yang ditulis HistoryWriter untuk user, None jika StatsCounters belum ada"""
+    try:
+        return stats_counters.read_writes(cursor, HISTORY_WRITES, user_id)
+    except mysql.connector.Error as e:
+        if e.errno != 1146:
+            raise
+        return None
+
 @app.route('/api/detection-history/<int:user_id>', methods=['GET'])
 def get_detection_history(user_id):
     """
-    API untuk mendapatkan histori deteksi berdasarkan user_id
-    Returns: List of detection history sorted by date (newest first)
+    API untuk mendapatkan histori deteksi berdasarkan user_id (keyset pagination)
+    Query: limit (default 50, max 200), cursor (next_cursor dari halaman sebelumnya),
+           fields=summary untuk list view tanpa description/symptoms/treatment/prevention
+    Returns: List of detection history sorted by date (newest first) + next_cursor
     """
-    conn = None
-    cursor = None
     
     try:
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor(dictionary=True)
-        
-        query = """
-            SELECT 
-                id, user_id, image_path, disease_name, confidence, severity,
-                description, symptoms, treatment, prevention, detection_date
-            FROM DetectionHistory
-            WHERE user_id = %s
-            ORDER BY detection_date DESC
-        """
-        
-        cursor.execute(query, (user_id,))
-        results = cursor.fetchall()
-        
-        # Parse JSON fields
-        history = []
-        for row in results:
-            # Type assertion for Pylance - cursor with dictionary=True returns dict
-            row_data: dict = row  # type: ignore
-            history.append({
-                "id": row_data['id'],
-                "user_id": row_data['user_id'],
-                "image_url": f"/api/uploads/{row_data['image_path']}",
-                "disease_name": row_data['disease_name'],
-                "confidence": float(row_data['confidence']),
-                "severity": row_data['severity'],
-                "description": row_data['description'],
-                "symptoms": json.loads(row_data['symptoms']) if row_data['symptoms'] else [],
-                "treatment": json.loads(row_data['treatment']) if row_data['treatment'] else [],
-                "prevention": json.loads(row_data['prevention']) if row_data['prevention'] else [],
-                "detection_date": row_data['detection_date'].isoformat() if row_data['detection_date'] else None
+        try:
+            limit = parse_limit(request.args.get('limit'), HISTORY_PAGE_DEFAULT, HISTORY_PAGE_MAX)
+            after = request.args.get('cursor')
+            if after:
+                after_date, after_id = decode_cursor(after, 2)
+                after_date, after_id = parse_datetime(after_date), int(after_id)
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+
+        fields = request.args.get('fields', 'full')
+        if fields not in ('full', 'summary'):
+            return jsonify({"error": "Parameter fields harus 'full' atau 'summary'"}), 400
+        include_text = fields == 'full'
+
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor(dictionary=True)
+
+            # ETag dari validator murah: MAX(id) = satu probe index idx_user_id (user_id, id),
+            # plus counter tulis per user (StatsCounters, dinaikkan di transaksi INSERT).
+            # Baris history tidak pernah diubah, jadi isi halaman hanya berubah jika ada baris baru.
+            # id dialokasikan per blok per worker (HistoryWriter) sehingga baris dari worker lain bisa
+            # masuk dengan id lebih kecil dari MAX(id); counter tulis tetap naik untuk baris itu.
+            # Tanpa StatsCounters tidak ada validator yang aman -> response tanpa ETag.
+            cursor.execute("SELECT MAX(id) AS max_id FROM DetectionHistory WHERE user_id = %s", (user_id,))
+            validator: dict = cursor.fetchone() or {}  # type: ignore
+            writes = read_history_writes(cursor, user_id)
+            etag = None
+            if writes is not None:
+                etag = make_etag('history', user_id, validator.get('max_id'), writes, limit, after, fields)
+                if matches(request, etag):
+                    return not_modified(etag, private=True)
+
+            # Teks penyakit diambil dari katalog DiseaseInfo (disease_info_id);
+            # kolom teks lama hanya terisi untuk baris yang belum dimigrasi.
+            # Urutan (detection_date, id) DESC dilayani index idx_user_date_id tanpa filesort.
+            columns = "id, user_id, image_path, disease_name, confidence, severity, detection_date"
+            if include_text:
+                columns += ", disease_info_id, description, symptoms, treatment, prevention"
+            query = f"SELECT {columns} FROM DetectionHistory WHERE user_id = %s"
+            params = [user_id]
+            if after:
+                query += " AND (detection_date < %s OR (detection_date = %s AND id < %s))"
+                params += [after_date, after_date, after_id]
+            query += " ORDER BY detection_date DESC, id DESC LIMIT %s"
+            params.append(limit + 1)
+
+            cursor.execute(query, params)
+            results = cursor.fetchall()
+            has_more = len(results) > limit
+            results = results[:limit]
+            catalog = DISEASE_CATALOG.expand(cursor, [row['disease_info_id'] for row in results]) if include_text else {}  # type: ignore
+
+            history = []
+            for row in results:
+                # Type assertion for Pylance - cursor with dictionary=True returns dict
+                row_data: dict = row  # type: ignore
+                record = {
+                    "id": row_data['id'],
+                    "user_id": row_data['user_id'],
+                    "image_url": upload_url(row_data['image_path'], HISTORY_THUMB_WIDTH),
+                    "image_original_url": upload_url(row_data['image_path']),
+                    "disease_name": row_data['disease_name'],
+                    "confidence": float(row_data['confidence']),
+                    "severity": row_data['severity'],
+                    "detection_date": row_data['detection_date'].isoformat() if row_data['detection_date'] else None
+                }
+                if include_text:
+                    info = catalog.get(row_data['disease_info_id'])
+                    if info is None:
+                        info = legacy_history_info(row_data)
+                    record.update({
+                        "description": info['description'],
+                        "symptoms": info['symptoms'],
+                        "treatment": info['treatment'],
+                        "prevention": info['prevention']
+                    })
+                history.append(record)
+
+            next_cursor = None
+            if has_more and results:
+                last: dict = results[-1]  # type: ignore
+                next_cursor = encode_cursor(last['detection_date'], last['id'])
+
+            response = jsonify({
+                "user_id": user_id,
+                "total": len(history),  # nama lama, dipertahankan untuk client yang sudah ada
+                "count": len(history),
+                "limit": limit,
+                "has_more": has_more,
+                "next_cursor": next_cursor,
+                "history": history
             })
-        
-        return jsonify({
-            "user_id": user_id,
-            "total": len(history),
-            "history": history
-        }), 200
-        
+            return conditional(response, etag, request, private=True) if etag else response
+
     except Exception as e:
         print(f"Error in get_detection_history: {str(e)}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cursor:
-            cursor.close()
-        if conn and conn.is_connected():
-            conn.close()
 
 
 # --- API SERVE UPLOADED IMAGES ---
-@app.route('/api/uploads/<filename>', methods=['GET'])
+def send_static_file(path, accel_path, etag, cache_control, mimetype=None):
+    """Kirim file sesuai UPLOAD_SERVE_MODE (send_file dengan ETag/Range, atau header ke proxy)"""
+    if UPLOAD_SERVE_MODE in ('x-accel', 'x-sendfile'):
+        response = app.response_class(mimetype=mimetype or mimetypes.guess_type(path)[0] or 'application/octet-stream')
+        if UPLOAD_SERVE_MODE == 'x-accel':
+            response.headers['X-Accel-Redirect'] = accel_path
+        else:
+            response.headers['X-Sendfile'] = os.path.abspath(path)
+    else:
+        response = send_file(path, mimetype=mimetype, conditional=True, etag=etag or True, max_age=None)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def upload_url(image_path, width=None, fmt='webp'):
+    """URL /api/uploads untuk image_path, opsional turunan ?w=&fmt="""
+    url = f"/api/uploads/{image_path}"
+    return f"{url}?w={snap_width(width)}&fmt={fmt}" if width else url
+
+@app.route('/api/uploads/<path:filename>', methods=['GET'])
 def serve_upload(filename):
     """
     Serve uploaded images dari folder uploads
+    filename bisa path image store (ab/cd/<sha256>.jpg) atau nama file lama (flat)
+    Path content-addressed: ETag = sha256 isi file, revalidasi dijawab 304 tanpa stat file.
+    Query ?w=<lebar>&fmt=webp|jpeg: turunan yang di-resize/re-encode (dibuat sekali, di-cache di disk).
+    Lihat UPLOAD_SERVE_MODE untuk menyerahkan pengiriman file ke nginx/Apache.
     """
-    try:
-        return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
-    except FileNotFoundError:
+    match = CONTENT_ADDRESSED_UPLOAD.match(filename)
+    digest = match.group(1) if match else None
+    if digest:
+        cache_control = f"public, max-age={UPLOAD_MAX_AGE}, immutable"
+    else:
+        cache_control = f"public, max-age={LEGACY_UPLOAD_MAX_AGE}"
+
+    width_arg = request.args.get('w')
+    fmt = request.args.get('fmt')
+    derivative = bool(width_arg or fmt)
+    if derivative:
+        fmt = (fmt or 'webp').lower()
+        if fmt == 'jpg':
+            fmt = 'jpeg'
+        if fmt not in DERIVATIVE_FORMATS:
+            return jsonify({"error": f"Parameter fmt tidak valid. Pilihan: {', '.join(DERIVATIVE_FORMATS)}"}), 400
+        try:
+            requested_width = int(width_arg) if width_arg else DERIVATIVE_WIDTHS[-1]
+        except ValueError:
+            requested_width = 0
+        # Validasi sebelum snap_width (yang membulatkan semua nilai <= 128 ke 128)
+        if requested_width <= 0:
+            return jsonify({"error": "Parameter w harus berupa angka positif"}), 400
+        width = snap_width(requested_width)
+
+    if digest and not derivative and matches(request, digest):
+        response = not_modified(digest)
+        response.headers['Cache-Control'] = cache_control
+        return response
+
+    path = safe_join(app.config['UPLOAD_FOLDER'], filename)
+    if path is not None and not os.path.isfile(path):
+        # Response predict bisa tiba sebelum writer background selesai menulis file
+        wait_pending_upload(filename)
+
+    if derivative:
+        # Key turunan dari sha256 sumber: 304 tanpa menyentuh disk
+        if digest:
+            key = DERIVATIVE_CACHE.key(path, digest, width, fmt)
+            if matches(request, key):
+                response = not_modified(key)
+                response.headers['Cache-Control'] = cache_control
+                return response
+        if path is None or not os.path.isfile(path):
+            return jsonify({"error": "Image not found"}), 404
+        try:
+            derivative_path, key = DERIVATIVE_CACHE.get_or_create(path, digest, width, fmt)
+            accel_path = DERIVATIVE_ACCEL_PREFIX.rstrip('/') + '/' + os.path.relpath(derivative_path, DERIVATIVE_CACHE.root).replace(os.sep, '/')
+            return send_static_file(derivative_path, accel_path, key, cache_control, DERIVATIVE_FORMATS[fmt][2])
+        except Exception as e:
+            # Bukan gambar / gagal decode: kirim file asli
+            print(f"[Derivative] Gagal membuat turunan {filename} (w={width}, fmt={fmt}): {e}")
+
+    if path is None or not os.path.isfile(path):
         return jsonify({"error": "Image not found"}), 404
+    return send_static_file(path, UPLOAD_ACCEL_PREFIX.rstrip('/') + '/' + quote(filename), digest, cache_control)
 
 
 # ===================================================================
@@ -527,8 +1261,6 @@ def submit_feedback_guest():
     Body: {nama, email, rating, category, message}
     Returns: {feedback_id, tracking_code, message}
     """
-    conn = None
-    cursor = None
     
     try:
         data = request.json
@@ -562,39 +1294,38 @@ def submit_feedback_guest():
         tracking_code = generate_tracking_code()
         
         # Save to database
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor()
-        
-        query = """
-            INSERT INTO Feedback 
-            (user_id, nama, email, rating, category, message, user_role, status, tracking_code)
-            VALUES (NULL, %s, %s, %s, %s, %s, 'guest', 'pending', %s)
-        """
-        values = (nama, email, rating_int, category, message, tracking_code)
-        
-        cursor.execute(query, values)
-        conn.commit()
-        feedback_id = cursor.lastrowid
-        
-        return jsonify({
-            "message": "Feedback berhasil dikirim!",
-            "feedback_id": feedback_id,
-            "tracking_code": tracking_code,
-            "info": "Simpan tracking code ini untuk mengecek status feedback Anda"
-        }), 201
-        
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor()
+
+            query = """
+                INSERT INTO Feedback
+                (user_id, nama, email, rating, category, message, user_role, status, tracking_code)
+                VALUES (NULL, %s, %s, %s, %s, %s, 'guest', 'pending', %s)
+            """
+            values = (nama, email, rating_int, category, message, tracking_code)
+
+            cursor.execute(query, values)
+            record_stats(cursor, 'feedback', {'status': 'pending', 'category': category, 'rating': rating_int})
+            conn.commit()
+            feedback_id = cursor.lastrowid
+            invalidate_feedback_caches()
+
+            return jsonify({
+                "message": "Feedback berhasil dikirim!",
+                "feedback_id": feedback_id,
+                "tracking_code": tracking_code,
+                "info": "Simpan tracking code ini untuk mengecek status feedback Anda"
+            }), 201
+
     except mysql.connector.Error as err:
         print(f"[Feedback Guest] Database error: {err}")
         return jsonify({"error": str(err)}), 500
     except Exception as e:
         print(f"[Feedback Guest] Error: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
 
 
 # --- API SUBMIT FEEDBACK (Authenticated User) ---
@@ -606,8 +1337,6 @@ def submit_feedback_user():
     Auto-fill nama & email dari database user
     Returns: {feedback_id, message}
     """
-    conn = None
-    cursor = None
     
     try:
         data = request.json
@@ -637,55 +1366,54 @@ def submit_feedback_user():
             return jsonify({"error": f"Category tidak valid"}), 400
         
         # Get user data from database
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor(dictionary=True)
-        
-        # Cek user exist dan ambil data
-        cursor.execute("SELECT user_id, nama, email, role FROM User WHERE user_id = %s", (user_id,))
-        user = cursor.fetchone()
-        
-        if not user:
-            return jsonify({"error": "User tidak ditemukan"}), 404
-        
-        user_data: dict = user  # type: ignore
-        nama = user_data['nama']
-        email = user_data['email']
-        user_role = user_data['role']
-        
-        # Generate tracking code (optional untuk user, tapi tetap dibuat)
-        tracking_code = generate_tracking_code()
-        
-        # Insert feedback
-        query = """
-            INSERT INTO Feedback 
-            (user_id, nama, email, rating, category, message, user_role, status, tracking_code)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, 'pending', %s)
-        """
-        values = (user_id, nama, email, rating_int, category, message, user_role, tracking_code)
-        
-        cursor.execute(query, values)
-        conn.commit()
-        feedback_id = cursor.lastrowid
-        
-        return jsonify({
-            "message": "Feedback berhasil dikirim!",
-            "feedback_id": feedback_id,
-            "status": "pending",
-            "created_at": datetime.now().isoformat()
-        }), 201
-        
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor(dictionary=True)
+
+            # Cek user exist dan ambil data
+            cursor.execute("SELECT user_id, nama, email, role FROM User WHERE user_id = %s", (user_id,))
+            user = cursor.fetchone()
+
+            if not user:
+                return jsonify({"error": "User tidak ditemukan"}), 404
+
+            user_data: dict = user  # type: ignore
+            nama = user_data['nama']
+            email = user_data['email']
+            user_role = user_data['role']
+
+            # Generate tracking code (optional untuk user, tapi tetap dibuat)
+            tracking_code = generate_tracking_code()
+
+            # Insert feedback
+            query = """
+                INSERT INTO Feedback
+                (user_id, nama, email, rating, category, message, user_role, status, tracking_code)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, 'pending', %s)
+            """
+            values = (user_id, nama, email, rating_int, category, message, user_role, tracking_code)
+
+            cursor.execute(query, values)
+            record_stats(cursor, 'feedback', {'status': 'pending', 'category': category, 'rating': rating_int})
+            conn.commit()
+            feedback_id = cursor.lastrowid
+            invalidate_feedback_caches()
+
+            return jsonify({
+                "message": "Feedback berhasil dikirim!",
+                "feedback_id": feedback_id,
+                "status": "pending",
+                "created_at": datetime.now().isoformat()
+            }), 201
+
     except mysql.connector.Error as err:
         print(f"[Feedback User] Database error: {err}")
         return jsonify({"error": str(err)}), 500
     except Exception as e:
         print(f"[Feedback User] Error: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
 
 
 # --- API GET MY FEEDBACKS (User) ---
@@ -695,57 +1423,52 @@ def get_my_feedbacks(user_id):
     API untuk user melihat riwayat feedback mereka
     Returns: List of feedbacks with status
     """
-    conn = None
-    cursor = None
     
     try:
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor(dictionary=True)
-        
-        query = """
-            SELECT 
-                feedback_id, nama, email, rating, category, message,
-                status, priority, created_at, updated_at, resolved_at, admin_notes
-            FROM Feedback
-            WHERE user_id = %s
-            ORDER BY created_at DESC
-        """
-        
-        cursor.execute(query, (user_id,))
-        feedbacks = cursor.fetchall()
-        
-        # Format response
-        result = []
-        for fb in feedbacks:
-            fb_data: dict = fb  # type: ignore
-            result.append({
-                "feedback_id": fb_data['feedback_id'],
-                "rating": fb_data['rating'],
-                "category": fb_data['category'],
-                "message": fb_data['message'],
-                "status": fb_data['status'],
-                "priority": fb_data['priority'],
-                "created_at": fb_data['created_at'].isoformat() if fb_data['created_at'] else None,
-                "updated_at": fb_data['updated_at'].isoformat() if fb_data['updated_at'] else None,
-                "resolved_at": fb_data['resolved_at'].isoformat() if fb_data['resolved_at'] else None,
-                "admin_notes": fb_data['admin_notes']
-            })
-        
-        return jsonify({
-            "user_id": user_id,
-            "total": len(result),
-            "feedbacks": result
-        }), 200
-        
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor(dictionary=True)
+
+            query = """
+                SELECT
+                    feedback_id, nama, email, rating, category, message,
+                    status, priority, created_at, updated_at, resolved_at, admin_notes
+                FROM Feedback
+                WHERE user_id = %s
+                ORDER BY created_at DESC
+            """
+
+            cursor.execute(query, (user_id,))
+            feedbacks = cursor.fetchall()
+
+            # Format response
+            result = []
+            for fb in feedbacks:
+                fb_data: dict = fb  # type: ignore
+                result.append({
+                    "feedback_id": fb_data['feedback_id'],
+                    "rating": fb_data['rating'],
+                    "category": fb_data['category'],
+                    "message": fb_data['message'],
+                    "status": fb_data['status'],
+                    "priority": fb_data['priority'],
+                    "created_at": fb_data['created_at'].isoformat() if fb_data['created_at'] else None,
+                    "updated_at": fb_data['updated_at'].isoformat() if fb_data['updated_at'] else None,
+                    "resolved_at": fb_data['resolved_at'].isoformat() if fb_data['resolved_at'] else None,
+                    "admin_notes": fb_data['admin_notes']
+                })
+
+            return jsonify({
+                "user_id": user_id,
+                "total": len(result),
+                "feedbacks": result
+            }), 200
+
     except Exception as e:
         print(f"[My Feedbacks] Error: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
 
 
 # --- API UPDATE FEEDBACK (User - only pending & < 24 hours) ---
@@ -756,8 +1479,6 @@ def update_feedback(feedback_id):
     Body: {user_id, rating, category, message}
     Returns: {success, message}
     """
-    conn = None
-    cursor = None
     
     try:
         data = request.json
@@ -780,63 +1501,68 @@ def update_feedback(feedback_id):
         except ValueError:
             return jsonify({"error": "Rating tidak valid"}), 400
         
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor(dictionary=True)
-        
-        # Check ownership dan status
-        cursor.execute("""
-            SELECT feedback_id, user_id, status, created_at
-            FROM Feedback
-            WHERE feedback_id = %s
-        """, (feedback_id,))
-        
-        feedback = cursor.fetchone()
-        if not feedback:
-            return jsonify({"error": "Feedback tidak ditemukan"}), 404
-        
-        fb_data: dict = feedback  # type: ignore
-        
-        # Cek ownership
-        if fb_data['user_id'] != int(user_id):
-            return jsonify({"error": "Anda tidak memiliki akses untuk mengubah feedback ini"}), 403
-        
-        # Cek status
-        if fb_data['status'] != 'pending':
-            return jsonify({"error": f"Feedback dengan status '{fb_data['status']}' tidak dapat diubah"}), 400
-        
-        # Cek 24 hours rule
-        from datetime import timedelta
-        created = fb_data['created_at']
-        now = datetime.now()
-        time_diff = now - created
-        
-        if time_diff > timedelta(hours=24):
-            return jsonify({"error": "Feedback hanya dapat diubah dalam 24 jam pertama"}), 400
-        
-        # Update feedback
-        update_query = """
-            UPDATE Feedback
-            SET rating = %s, category = %s, message = %s, updated_at = NOW()
-            WHERE feedback_id = %s
-        """
-        cursor.execute(update_query, (rating_int, category, message, feedback_id))
-        conn.commit()
-        
-        return jsonify({
-            "success": True,
-            "message": "Feedback berhasil diupdate",
-            "feedback_id": feedback_id
-        }), 200
-        
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor(dictionary=True)
+
+            # Check ownership dan status
+            cursor.execute("""
+                SELECT feedback_id, user_id, status, category, rating, created_at
+                FROM Feedback
+                WHERE feedback_id = %s
+                FOR UPDATE
+            """, (feedback_id,))
+
+            feedback = cursor.fetchone()
+            if not feedback:
+                return jsonify({"error": "Feedback tidak ditemukan"}), 404
+
+            fb_data: dict = feedback  # type: ignore
+
+            # Cek ownership
+            if fb_data['user_id'] != int(user_id):
+                return jsonify({"error": "Anda tidak memiliki akses untuk mengubah feedback ini"}), 403
+
+            # Cek status
+            if fb_data['status'] != 'pending':
+                return jsonify({"error": f"Feedback dengan status '{fb_data['status']}' tidak dapat diubah"}), 400
+
+            # Cek 24 hours rule
+            from datetime import timedelta
+            created = fb_data['created_at']
+            now = datetime.now()
+            time_diff = now - created
+
+            if time_diff > timedelta(hours=24):
+                return jsonify({"error": "Feedback hanya dapat diubah dalam 24 jam pertama"}), 400
+
+            # Update feedback
+            update_query = """
+                UPDATE Feedback
+                SET rating = %s, category = %s, message = %s, updated_at = NOW()
+                WHERE feedback_id = %s
+            """
+            cursor.execute(update_query, (rating_int, category, message, feedback_id))
+            record_stats(
+                cursor, 'feedback',
+                old={'status': 'pending', 'category': fb_data['category'], 'rating': fb_data['rating']},
+                new={'status': 'pending', 'category': category, 'rating': rating_int},
+                created=created
+            )
+            conn.commit()
+            invalidate_feedback_caches()
+
+            return jsonify({
+                "success": True,
+                "message": "Feedback berhasil diupdate",
+                "feedback_id": feedback_id
+            }), 200
+
     except Exception as e:
         print(f"[Update Feedback] Error: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
 
 
 # --- API TRACK FEEDBACK (Guest - via tracking code) ---
@@ -846,65 +1572,77 @@ def track_feedback(tracking_code):
     API untuk guest track status feedback via tracking code
     Returns: Feedback details and responses
     """
-    conn = None
-    cursor = None
     
     try:
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor(dictionary=True)
-        
-        query = """
-            SELECT 
-                feedback_id, nama, email, rating, category, message,
-                status, priority, created_at, updated_at, resolved_at
-            FROM Feedback
-            WHERE tracking_code = %s
-        """
-        
-        cursor.execute(query, (tracking_code,))
-        feedback = cursor.fetchone()
-        
-        if not feedback:
-            return jsonify({"error": "Tracking code tidak valid"}), 404
-        
-        fb_data: dict = feedback  # type: ignore
-        
-        # Get responses (non-internal only)
-        cursor.execute("""
-            SELECT response_text, created_at
-            FROM FeedbackResponse
-            WHERE feedback_id = %s AND is_internal = 0
-            ORDER BY created_at ASC
-        """, (fb_data['feedback_id'],))
-        
-        responses = []
-        for resp in cursor.fetchall():
-            resp_data: dict = resp  # type: ignore
-            responses.append({
-                "response": resp_data['response_text'],
-                "date": resp_data['created_at'].isoformat() if resp_data['created_at'] else None
-            })
-        
-        return jsonify({
-            "feedback_id": fb_data['feedback_id'],
-            "rating": fb_data['rating'],
-            "category": fb_data['category'],
-            "message": fb_data['message'],
-            "status": fb_data['status'],
-            "submitted_at": fb_data['created_at'].isoformat() if fb_data['created_at'] else None,
-            "resolved_at": fb_data['resolved_at'].isoformat() if fb_data['resolved_at'] else None,
-            "responses": responses
-        }), 200
-        
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor(dictionary=True)
+
+            # ETag dari updated_at feedback + jumlah/max id balasan publik (satu query kecil)
+            cursor.execute("""
+                SELECT f.feedback_id, f.status, f.updated_at, f.resolved_at,
+                       COUNT(r.response_id) AS responses, MAX(r.response_id) AS last_response
+                FROM Feedback f
+                LEFT JOIN FeedbackResponse r ON r.feedback_id = f.feedback_id AND r.is_internal = 0
+                WHERE f.tracking_code = %s
+                GROUP BY f.feedback_id
+            """, (tracking_code,))
+            validator = cursor.fetchone()
+            if not validator:
+                return jsonify({"error": "Tracking code tidak valid"}), 404
+            validator_data: dict = validator  # type: ignore
+            etag = make_etag('track', tracking_code, *validator_data.values())
+            if matches(request, etag):
+                return not_modified(etag, private=True)
+
+            query = """
+                SELECT
+                    feedback_id, nama, email, rating, category, message,
+                    status, priority, created_at, updated_at, resolved_at
+                FROM Feedback
+                WHERE tracking_code = %s
+            """
+
+            cursor.execute(query, (tracking_code,))
+            feedback = cursor.fetchone()
+
+            if not feedback:
+                return jsonify({"error": "Tracking code tidak valid"}), 404
+
+            fb_data: dict = feedback  # type: ignore
+
+            # Get responses (non-internal only)
+            cursor.execute("""
+                SELECT response_text, created_at
+                FROM FeedbackResponse
+                WHERE feedback_id = %s AND is_internal = 0
+                ORDER BY created_at ASC
+            """, (fb_data['feedback_id'],))
+
+            responses = []
+            for resp in cursor.fetchall():
+                resp_data: dict = resp  # type: ignore
+                responses.append({
+                    "response": resp_data['response_text'],
+                    "date": resp_data['created_at'].isoformat() if resp_data['created_at'] else None
+                })
+
+            return conditional(jsonify({
+                "feedback_id": fb_data['feedback_id'],
+                "rating": fb_data['rating'],
+                "category": fb_data['category'],
+                "message": fb_data['message'],
+                "status": fb_data['status'],
+                "submitted_at": fb_data['created_at'].isoformat() if fb_data['created_at'] else None,
+                "resolved_at": fb_data['resolved_at'].isoformat() if fb_data['resolved_at'] else None,
+                "responses": responses
+            }), etag, request, private=True)
+
     except Exception as e:
         print(f"[Track Feedback] Error: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
 
 
 # ===================================================================
@@ -913,15 +1651,13 @@ def track_feedback(tracking_code):
 
 def verify_superadmin(user_id):
     """Helper function to verify if user is superadmin"""
-    conn = None
-    cursor = None
     try:
-        conn = get_db_connection()
-        if conn is None:
-            return False
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT role FROM User WHERE user_id = %s", (user_id,))
-        user = cursor.fetchone()
+        with db_connection() as conn:
+            if conn is None:
+                return False
+            with conn.cursor(dictionary=True) as cursor:
+                cursor.execute("SELECT role FROM User WHERE user_id = %s", (user_id,))
+                user = cursor.fetchone()
         if user:
             user_data: dict = user  # type: ignore
             return user_data['role'] == 'superadmin'
@@ -929,21 +1665,45 @@ def verify_superadmin(user_id):
     except Exception as e:
         print(f"[Verify Admin] Error: {e}")
         return False
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
 
 
 # --- API GET ALL FEEDBACKS (Admin) ---
+# Total per filter (status, category) di-cache; di-invalidate setiap feedback dibuat/diubah
+FEEDBACK_COUNT_CACHE = TTLCache(maxsize=256, ttl_seconds=float(os.getenv('FEEDBACK_COUNT_TTL', '300')))
+FEEDBACK_PAGE_MAX = 100
+
+# Keyset order untuk mode cursor: (created_at, feedback_id), sejalan dengan idx_status
+FEEDBACK_CURSOR_ORDER = {
+    'date_desc': [('created_at', 'DESC'), ('feedback_id', 'DESC')],
+    'date_asc': [('created_at', 'ASC'), ('feedback_id', 'ASC')],
+}
+
+def invalidate_feedback_caches():
+    """Dipanggil setelah setiap write Feedback: count admin + response /api/feedback/public"""
+    FEEDBACK_COUNT_CACHE.clear()
+    RESPONSE_CACHE.invalidate('feedback_public')
+
+def get_feedback_total(cursor, where_sql, params, key, refresh=False):
+    """COUNT(*) Feedback untuk filter; dari cache kecuali refresh. Return (total, cached)"""
+    if not refresh:
+        total = FEEDBACK_COUNT_CACHE.get(key)
+        if total is not None:
+            return total, True
+    cursor.execute(f"SELECT COUNT(*) as total FROM Feedback {where_sql}", params)
+    total_result = cursor.fetchone()
+    total: int = total_result['total'] if total_result else 0  # type: ignore
+    FEEDBACK_COUNT_CACHE.set(key, total)
+    return total, False
+
 @app.route('/api/admin/feedbacks', methods=['GET'])
 def get_all_feedbacks():
     """
     API untuk admin melihat semua feedback dengan filtering
     Query params: ?status=pending&category=bug&sort=date_desc&page=1&limit=20
+    Mode cursor (sort date_desc/date_asc): ?cursor=<next_cursor> atau ?mode=cursor untuk halaman pertama
+    count=exact menghitung ulang total (default dari cache), count=none melewati total
     Returns: Paginated list of feedbacks
     """
-    conn = None
-    cursor = None
     
     try:
         # Get query parameters
@@ -954,99 +1714,140 @@ def get_all_feedbacks():
         status_filter = request.args.get('status', None)
         category_filter = request.args.get('category', None)
         sort_by = request.args.get('sort', 'date_desc')  # date_desc, date_asc, rating_desc, rating_asc
-        page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 20))
+        count_mode = request.args.get('count', 'cached')  # cached, exact, none
+        after = request.args.get('cursor')
+        cursor_mode = bool(after) or request.args.get('mode') == 'cursor'
+        try:
+            page = max(1, int(request.args.get('page', 1)))
+            limit = parse_limit(request.args.get('limit'), 20, FEEDBACK_PAGE_MAX)
+            if cursor_mode:
+                if sort_by not in FEEDBACK_CURSOR_ORDER:
+                    raise ValueError("Mode cursor hanya untuk sort date_desc atau date_asc")
+                if after:
+                    after_date, after_id = decode_cursor(after, 2)
+                    after_values = [parse_datetime(after_date), int(after_id)]
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
         
         offset = (page - 1) * limit
         
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor(dictionary=True)
-        
-        # Build query with filters
-        where_clauses = []
-        params = []
-        
-        if status_filter:
-            where_clauses.append("status = %s")
-            params.append(status_filter)
-        
-        if category_filter:
-            where_clauses.append("category = %s")
-            params.append(category_filter)
-        
-        where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
-        
-        # Determine sort order
-        if sort_by == 'date_desc':
-            order_sql = "ORDER BY created_at DESC"
-        elif sort_by == 'date_asc':
-            order_sql = "ORDER BY created_at ASC"
-        elif sort_by == 'rating_desc':
-            order_sql = "ORDER BY rating DESC, created_at DESC"
-        elif sort_by == 'rating_asc':
-            order_sql = "ORDER BY rating ASC, created_at DESC"
-        else:
-            order_sql = "ORDER BY created_at DESC"
-        
-        # Count total
-        count_query = f"SELECT COUNT(*) as total FROM Feedback {where_sql}"
-        cursor.execute(count_query, params)
-        total_result = cursor.fetchone()
-        total: int = total_result['total'] if total_result else 0  # type: ignore
-        
-        # Get feedbacks
-        query = f"""
-            SELECT 
-                feedback_id, user_id, nama, email, rating, category, message,
-                user_role, status, priority, created_at, updated_at, 
-                resolved_at, resolved_by, admin_notes
-            FROM Feedback
-            {where_sql}
-            {order_sql}
-            LIMIT %s OFFSET %s
-        """
-        
-        cursor.execute(query, params + [limit, offset])
-        feedbacks = cursor.fetchall()
-        
-        result = []
-        for fb in feedbacks:
-            fb_data: dict = fb  # type: ignore
-            result.append({
-                "feedback_id": fb_data['feedback_id'],
-                "user_id": fb_data['user_id'],
-                "nama": fb_data['nama'],
-                "email": fb_data['email'],
-                "rating": fb_data['rating'],
-                "category": fb_data['category'],
-                "message": fb_data['message'],
-                "user_role": fb_data['user_role'],
-                "status": fb_data['status'],
-                "priority": fb_data['priority'],
-                "created_at": fb_data['created_at'].isoformat() if fb_data['created_at'] else None,
-                "updated_at": fb_data['updated_at'].isoformat() if fb_data['updated_at'] else None,
-                "resolved_at": fb_data['resolved_at'].isoformat() if fb_data['resolved_at'] else None,
-                "resolved_by": fb_data['resolved_by'],
-                "admin_notes": fb_data['admin_notes']
-            })
-        
-        return jsonify({
-            "total": total,
-            "page": page,
-            "limit": limit,
-            "total_pages": (total + limit - 1) // limit,
-            "feedbacks": result
-        }), 200
-        
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor(dictionary=True)
+
+            # Build query with filters
+            where_clauses = []
+            params = []
+
+            if status_filter:
+                where_clauses.append("status = %s")
+                params.append(status_filter)
+
+            if category_filter:
+                where_clauses.append("category = %s")
+                params.append(category_filter)
+
+            where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+
+            # Count total (cache, hanya dihitung ulang saat diminta / setelah ada perubahan)
+            total = None
+            total_cached = False
+            if count_mode != 'none':
+                total, total_cached = get_feedback_total(
+                    cursor, where_sql, params, (status_filter, category_filter), refresh=count_mode == 'exact'
+                )
+
+            # Determine sort order
+            if cursor_mode:
+                order = FEEDBACK_CURSOR_ORDER[sort_by]
+                order_sql = "ORDER BY " + ", ".join(f"{column} {direction}" for column, direction in order)
+                page_params = []
+                if after:
+                    condition, condition_params = keyset_condition(order, after_values)
+                    where_sql = (where_sql + " AND " if where_sql else "WHERE ") + condition
+                    page_params = condition_params
+                limit_sql = "LIMIT %s"
+                page_params.append(limit + 1)
+            else:
+                if sort_by == 'date_desc':
+                    order_sql = "ORDER BY created_at DESC"
+                elif sort_by == 'date_asc':
+                    order_sql = "ORDER BY created_at ASC"
+                elif sort_by == 'rating_desc':
+                    order_sql = "ORDER BY rating DESC, created_at DESC"
+                elif sort_by == 'rating_asc':
+                    order_sql = "ORDER BY rating ASC, created_at DESC"
+                else:
+                    order_sql = "ORDER BY created_at DESC"
+                limit_sql = "LIMIT %s OFFSET %s"
+                page_params = [limit, offset]
+
+            # Get feedbacks
+            query = f"""
+                SELECT
+                    feedback_id, user_id, nama, email, rating, category, message,
+                    user_role, status, priority, created_at, updated_at,
+                    resolved_at, resolved_by, admin_notes
+                FROM Feedback
+                {where_sql}
+                {order_sql}
+                {limit_sql}
+            """
+
+            cursor.execute(query, params + page_params)
+            feedbacks = cursor.fetchall()
+            has_more = cursor_mode and len(feedbacks) > limit
+            feedbacks = feedbacks[:limit]
+
+            result = []
+            for fb in feedbacks:
+                fb_data: dict = fb  # type: ignore
+                result.append({
+                    "feedback_id": fb_data['feedback_id'],
+                    "user_id": fb_data['user_id'],
+                    "nama": fb_data['nama'],
+                    "email": fb_data['email'],
+                    "rating": fb_data['rating'],
+                    "category": fb_data['category'],
+                    "message": fb_data['message'],
+                    "user_role": fb_data['user_role'],
+                    "status": fb_data['status'],
+                    "priority": fb_data['priority'],
+                    "created_at": fb_data['created_at'].isoformat() if fb_data['created_at'] else None,
+                    "updated_at": fb_data['updated_at'].isoformat() if fb_data['updated_at'] else None,
+                    "resolved_at": fb_data['resolved_at'].isoformat() if fb_data['resolved_at'] else None,
+                    "resolved_by": fb_data['resolved_by'],
+                    "admin_notes": fb_data['admin_notes']
+                })
+
+            if cursor_mode:
+                next_cursor = None
+                if has_more and feedbacks:
+                    last: dict = feedbacks[-1]  # type: ignore
+                    next_cursor = encode_cursor(last['created_at'], last['feedback_id'])
+                return jsonify({
+                    "total": total,
+                    "total_cached": total_cached,
+                    "limit": limit,
+                    "has_more": has_more,
+                    "next_cursor": next_cursor,
+                    "feedbacks": result
+                }), 200
+
+            return jsonify({
+                "total": total,
+                "total_cached": total_cached,
+                "page": page,
+                "limit": limit,
+                "total_pages": (total + limit - 1) // limit if total is not None else None,
+                "feedbacks": result
+            }), 200
+
     except Exception as e:
         print(f"[Admin Feedbacks] Error: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
 
 
 # --- API GET FEEDBACK STATISTICS (Admin) ---
@@ -1057,62 +1858,24 @@ def get_feedback_stats():
     Query params: ?admin_id=1
     Returns: {total, pending, by_status, by_category, by_rating}
     """
-    conn = None
-    cursor = None
     
     try:
         admin_id = request.args.get('admin_id')
         if not admin_id or not verify_superadmin(admin_id):
             return jsonify({"error": "Unauthorized. Superadmin access required"}), 403
         
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor(dictionary=True)
-        
-        # Total feedbacks
-        cursor.execute("SELECT COUNT(*) as total FROM Feedback")
-        total_result = cursor.fetchone()
-        total: int = total_result['total'] if total_result else 0  # type: ignore
-        
-        # Pending feedbacks
-        cursor.execute("SELECT COUNT(*) as pending FROM Feedback WHERE status = 'pending'")
-        pending_result = cursor.fetchone()
-        pending: int = pending_result['pending'] if pending_result else 0  # type: ignore
-        
-        # By status
-        cursor.execute("SELECT status, COUNT(*) as count FROM Feedback GROUP BY status")
-        by_status = {row['status']: row['count'] for row in cursor.fetchall()}  # type: ignore
-        
-        # By category
-        cursor.execute("SELECT category, COUNT(*) as count FROM Feedback GROUP BY category")
-        by_category = {row['category']: row['count'] for row in cursor.fetchall()}  # type: ignore
-        
-        # By rating
-        cursor.execute("SELECT rating, COUNT(*) as count FROM Feedback GROUP BY rating ORDER BY rating")
-        by_rating = {row['rating']: row['count'] for row in cursor.fetchall()}  # type: ignore
-        
-        # Average rating
-        cursor.execute("SELECT AVG(rating) as avg_rating FROM Feedback")
-        avg_result = cursor.fetchone()
-        avg_rating = float(avg_result['avg_rating']) if avg_result and avg_result['avg_rating'] else 0  # type: ignore
-        
-        return jsonify({
-            "total": total,
-            "pending": pending,
-            "by_status": by_status,
-            "by_category": by_category,
-            "by_rating": by_rating,
-            "average_rating": round(avg_rating, 2)
-        }), 200
-        
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor(dictionary=True)
+
+            # Counter StatsCounters (status, category, rating), diringkas di Python (stats.py)
+            return jsonify(summarize_feedback(read_stats_rows(cursor, 'feedback', FEEDBACK_STATS_SQL, 'Feedback'))), 200
+
     except Exception as e:
         print(f"[Feedback Stats] Error: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
 
 
 # --- API CHAT AI ---
@@ -1203,8 +1966,6 @@ def update_feedback_status(feedback_id):
     Body: {admin_id, status, admin_notes (optional), priority (optional)}
     Returns: {success, message}
     """
-    conn = None
-    cursor = None
     
     try:
         data = request.json
@@ -1226,57 +1987,68 @@ def update_feedback_status(feedback_id):
         if new_status not in valid_statuses:
             return jsonify({"error": f"Status tidak valid. Pilihan: {', '.join(valid_statuses)}"}), 400
         
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor()
-        
-        # Build update query
-        update_parts = ["status = %s", "updated_at = NOW()"]
-        params = [new_status]
-        
-        if new_status in ['resolved', 'rejected']:
-            update_parts.append("resolved_at = NOW()")
-            update_parts.append("resolved_by = %s")
-            params.append(admin_id)
-        
-        if admin_notes:
-            update_parts.append("admin_notes = %s")
-            params.append(admin_notes)
-        
-        if priority:
-            valid_priorities = ['low', 'medium', 'high', 'critical']
-            if priority in valid_priorities:
-                update_parts.append("priority = %s")
-                params.append(priority)
-        
-        params.append(feedback_id)
-        
-        query = f"""
-            UPDATE Feedback
-            SET {', '.join(update_parts)}
-            WHERE feedback_id = %s
-        """
-        
-        cursor.execute(query, params)
-        conn.commit()
-        
-        if cursor.rowcount == 0:
-            return jsonify({"error": "Feedback tidak ditemukan"}), 404
-        
-        return jsonify({
-            "success": True,
-            "message": f"Feedback status berhasil diupdate menjadi '{new_status}'",
-            "feedback_id": feedback_id
-        }), 200
-        
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor()
+
+            # Nilai lama dikunci dulu supaya StatsCounters bisa dipindah dengan tepat
+            cursor.execute(
+                "SELECT status, category, rating, created_at FROM Feedback WHERE feedback_id = %s FOR UPDATE",
+                (feedback_id,)
+            )
+            current = cursor.fetchone()
+            if not current:
+                return jsonify({"error": "Feedback tidak ditemukan"}), 404
+            old_status, fb_category, fb_rating, fb_created = current
+
+            # Build update query
+            update_parts = ["status = %s", "updated_at = NOW()"]
+            params = [new_status]
+
+            if new_status in ['resolved', 'rejected']:
+                update_parts.append("resolved_at = NOW()")
+                update_parts.append("resolved_by = %s")
+                params.append(admin_id)
+
+            if admin_notes:
+                update_parts.append("admin_notes = %s")
+                params.append(admin_notes)
+
+            if priority:
+                valid_priorities = ['low', 'medium', 'high', 'critical']
+                if priority in valid_priorities:
+                    update_parts.append("priority = %s")
+                    params.append(priority)
+
+            params.append(feedback_id)
+
+            query = f"""
+                UPDATE Feedback
+                SET {', '.join(update_parts)}
+                WHERE feedback_id = %s
+            """
+
+            cursor.execute(query, params)
+            record_stats(
+                cursor, 'feedback',
+                old={'status': old_status, 'category': fb_category, 'rating': fb_rating},
+                new={'status': new_status, 'category': fb_category, 'rating': fb_rating},
+                created=fb_created
+            )
+            conn.commit()
+            invalidate_feedback_caches()
+
+            return jsonify({
+                "success": True,
+                "message": f"Feedback status berhasil diupdate menjadi '{new_status}'",
+                "feedback_id": feedback_id
+            }), 200
+
     except Exception as e:
         print(f"[Update Status] Error: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
 
 
 # --- API ADD FEEDBACK RESPONSE (Admin) ---
@@ -1287,8 +2059,6 @@ def add_feedback_response(feedback_id):
     Body: {admin_id, response_text, is_internal (boolean)}
     Returns: {response_id, message}
     """
-    conn = None
-    cursor = None
     
     try:
         data = request.json
@@ -1305,38 +2075,35 @@ def add_feedback_response(feedback_id):
         if not response_text:
             return jsonify({"error": "Response text diperlukan"}), 400
         
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor()
-        
-        # Check if feedback exists
-        cursor.execute("SELECT feedback_id FROM Feedback WHERE feedback_id = %s", (feedback_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Feedback tidak ditemukan"}), 404
-        
-        # Insert response
-        query = """
-            INSERT INTO FeedbackResponse (feedback_id, admin_id, response_text, is_internal)
-            VALUES (%s, %s, %s, %s)
-        """
-        cursor.execute(query, (feedback_id, admin_id, response_text, 1 if is_internal else 0))
-        conn.commit()
-        response_id = cursor.lastrowid
-        
-        return jsonify({
-            "success": True,
-            "message": "Response berhasil ditambahkan",
-            "response_id": response_id
-        }), 201
-        
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor()
+
+            # Check if feedback exists
+            cursor.execute("SELECT feedback_id FROM Feedback WHERE feedback_id = %s", (feedback_id,))
+            if not cursor.fetchone():
+                return jsonify({"error": "Feedback tidak ditemukan"}), 404
+
+            # Insert response
+            query = """
+                INSERT INTO FeedbackResponse (feedback_id, admin_id, response_text, is_internal)
+                VALUES (%s, %s, %s, %s)
+            """
+            cursor.execute(query, (feedback_id, admin_id, response_text, 1 if is_internal else 0))
+            conn.commit()
+            response_id = cursor.lastrowid
+
+            return jsonify({
+                "success": True,
+                "message": "Response berhasil ditambahkan",
+                "response_id": response_id
+            }), 201
+
     except Exception as e:
         print(f"[Add Response] Error: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
 
 
 # --- API GET PUBLIC FEEDBACKS (untuk display di halaman feedback) ---
@@ -1347,59 +2114,64 @@ def get_public_feedbacks():
     Query params: ?limit=10&sort=date_desc
     Returns: List of public feedbacks
     """
-    conn = None
-    cursor = None
     
     try:
         limit = int(request.args.get('limit', 10))
         sort_by = request.args.get('sort', 'date_desc')
-        
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor(dictionary=True)
-        
-        # Sort order
-        if sort_by == 'date_desc':
-            order_sql = "ORDER BY created_at DESC"
-        elif sort_by == 'date_asc':
-            order_sql = "ORDER BY created_at ASC"
-        elif sort_by == 'rating_desc':
-            order_sql = "ORDER BY rating DESC, created_at DESC"
-        else:
-            order_sql = "ORDER BY created_at DESC"
-        
-        # Query feedbacks yang resolved atau rating tinggi (untuk display publik)
-        query = f"""
-            SELECT 
-                feedback_id, nama, rating, category, message, created_at
-            FROM Feedback
-            WHERE rating >= 4
-            {order_sql}
-            LIMIT %s
-        """
-        
-        cursor.execute(query, (limit,))
-        feedbacks = cursor.fetchall()
-        
-        result = []
-        for fb in feedbacks:
-            fb_data: dict = fb  # type: ignore
-            result.append({
-                "feedback_id": fb_data['feedback_id'],
-                "nama": fb_data['nama'],
-                "rating": fb_data['rating'],
-                "category": fb_data['category'],
-                "message": fb_data['message'],
-                "created_at": fb_data['created_at'].isoformat() if fb_data['created_at'] else None
+        if sort_by not in ('date_desc', 'date_asc', 'rating_desc'):
+            sort_by = 'date_desc'
+
+        cache_key = (limit, sort_by) if limit <= RESPONSE_CACHE_MAX_LIMIT else None
+        cached, generation = cached_response('feedback_public', cache_key)
+        if cached:
+            return cached
+
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor(dictionary=True)
+
+            # Sort order
+            if sort_by == 'date_desc':
+                order_sql = "ORDER BY created_at DESC"
+            elif sort_by == 'date_asc':
+                order_sql = "ORDER BY created_at ASC"
+            elif sort_by == 'rating_desc':
+                order_sql = "ORDER BY rating DESC, created_at DESC"
+            else:
+                order_sql = "ORDER BY created_at DESC"
+
+            # Query feedbacks yang resolved atau rating tinggi (untuk display publik)
+            query = f"""
+                SELECT
+                    feedback_id, nama, rating, category, message, created_at
+                FROM Feedback
+                WHERE rating >= 4
+                {order_sql}
+                LIMIT %s
+            """
+
+            cursor.execute(query, (limit,))
+            feedbacks = cursor.fetchall()
+
+            result = []
+            for fb in feedbacks:
+                fb_data: dict = fb  # type: ignore
+                result.append({
+                    "feedback_id": fb_data['feedback_id'],
+                    "nama": fb_data['nama'],
+                    "rating": fb_data['rating'],
+                    "category": fb_data['category'],
+                    "message": fb_data['message'],
+                    "created_at": fb_data['created_at'].isoformat() if fb_data['created_at'] else None
+                })
+
+            return store_response('feedback_public', cache_key, generation, {
+                "total": len(result),
+                "feedbacks": result
             })
-        
-        return jsonify({
-            "total": len(result),
-            "feedbacks": result
-        }), 200
-        
+
     except Exception as e:
         print(f"[Public Feedbacks] Error: {e}")
         # Return empty array instead of error (graceful degradation)
@@ -1408,9 +2180,6 @@ def get_public_feedbacks():
             "feedbacks": [],
             "error": str(e)
         }), 200
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
 
 
 # --- API GET USER ROLE (for navbar sync) ---
@@ -1421,37 +2190,32 @@ def get_user_role():
     Query params: ?email=user@example.com
     Returns: {email, role}
     """
-    conn = None
-    cursor = None
     
     try:
         email = request.args.get('email')
         if not email:
             return jsonify({"error": "Email parameter required"}), 400
         
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT email, role FROM User WHERE email = %s", (email,))
-        user = cursor.fetchone()
-        
-        if not user:
-            return jsonify({"error": "User not found"}), 404
-        
-        user_data: dict = user  # type: ignore
-        return jsonify({
-            "email": user_data['email'],
-            "role": user_data['role']
-        }), 200
-        
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("SELECT email, role FROM User WHERE email = %s", (email,))
+            user = cursor.fetchone()
+
+            if not user:
+                return jsonify({"error": "User not found"}), 404
+
+            user_data: dict = user  # type: ignore
+            return jsonify({
+                "email": user_data['email'],
+                "role": user_data['role']
+            }), 200
+
     except Exception as e:
         print(f"[Get User Role] Error: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
 
 
 # ===================================================================
@@ -1464,181 +2228,282 @@ def get_users_stats():
     API untuk mendapatkan statistik user
     Returns: {total, active, by_role}
     """
-    conn = None
-    cursor = None
     
     try:
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor(dictionary=True)
-        
-        # Total users
-        cursor.execute("SELECT COUNT(*) as total FROM User")
-        total_result = cursor.fetchone()
-        total: int = total_result['total'] if total_result else 0  # type: ignore
-        
-        # Active users (status_akun = 'aktif')
-        cursor.execute("SELECT COUNT(*) as active FROM User WHERE status_akun = 'aktif'")
-        active_result = cursor.fetchone()
-        active: int = active_result['active'] if active_result else 0  # type: ignore
-        
-        # By role
-        cursor.execute("SELECT role, COUNT(*) as count FROM User GROUP BY role")
-        by_role = {row['role']: row['count'] for row in cursor.fetchall()}  # type: ignore
-        
-        return jsonify({
-            "total": total,
-            "active": active,
-            "by_role": by_role
-        }), 200
-        
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor(dictionary=True)
+
+            # Counter StatsCounters (role, status_akun), diringkas di Python (stats.py)
+            return jsonify(summarize_users(read_stats_rows(cursor, 'user', USERS_STATS_SQL, 'User'))), 200
+
     except Exception as e:
         print(f"[Users Stats] Error: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
 
 
+# Total user per filter di-cache sebentar (COUNT(*) pada tabel User besar mahal)
+USER_COUNT_CACHE = TTLCache(maxsize=512, ttl_seconds=float(os.getenv('USER_COUNT_TTL', '60')))
+USER_PAGE_MAX = 100
+USER_CURSOR_ORDER = [('u.tanggal_daftar', 'DESC'), ('u.user_id', 'DESC')]
+
+def escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def build_user_search(search, mode):
+    """
+    Return (join_sql, where_sql, params) untuk pencarian user.
+    mode 'index' (default): FULLTEXT (nama, email, username) dengan prefix per kata
+      + prefix LIKE 'x%' pada email/username (index UNIQUE), digabung dengan UNION
+      sehingga tidak ada full table scan. Lihat db/add_user_search_index.sql.
+    mode 'contains': LIKE '%x%' lama (substring di mana saja, full table scan).
+    """
+    if mode == 'contains':
+        pattern = f"%{escape_like(search)}%"
+        return "", "(u.nama LIKE %s OR u.email LIKE %s OR u.username LIKE %s)", [pattern] * 3
+
+    prefix = f"{escape_like(search)}%"
+    branches = [
+        "SELECT user_id FROM User WHERE email LIKE %s",
+        "SELECT user_id FROM User WHERE username LIKE %s",
+    ]
+    params = [prefix, prefix]
+    # Operator boolean mode (+ - * " dll) dibuang, tiap kata wajib ada sebagai prefix
+    words = re.findall(r"\w+", search)
+    if words:
+        branches.insert(0, "SELECT user_id FROM User WHERE MATCH(nama, email, username) AGAINST (%s IN BOOLEAN MODE)")
+        params.insert(0, " ".join(f"+{word}*" for word in words))
+    join_sql = f"JOIN ({' UNION '.join(branches)}) matched ON matched.user_id = u.user_id"
+    return join_sql, None, params
+
 @app.route('/api/admin/users', methods=['GET'])
 def get_all_users():
     """
     API untuk mendapatkan semua user dengan pagination dan filter
     Query params: ?page=1&limit=20&search=keyword&role=user&status=aktif
-    Returns: {total, page, limit, users[]}
+    search_mode=index (default, FULLTEXT + prefix email/username) atau contains (LIKE lama)
+    Mode cursor: ?mode=cursor / ?cursor=<next_cursor> (keyset pada tanggal_daftar, user_id)
+    count=exact menghitung ulang total (default dari cache singkat), count=none melewati total
+    Returns: {total, page, limit, users[]} atau {total, limit, has_more, next_cursor, users[]}
     """
-    conn = None
-    cursor = None
     
     try:
         # Get query parameters
-        page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 20))
         search = request.args.get('search', '').strip()
+        search_mode = request.args.get('search_mode', 'index')
         role_filter = request.args.get('role', None)
         status_filter = request.args.get('status', None)
+        count_mode = request.args.get('count', 'cached')  # cached, exact, none
+        after = request.args.get('cursor')
+        cursor_mode = bool(after) or request.args.get('mode') == 'cursor'
+        try:
+            page = max(1, int(request.args.get('page', 1)))
+            limit = parse_limit(request.args.get('limit'), 20, USER_PAGE_MAX)
+            if search_mode not in ('index', 'contains'):
+                raise ValueError("Parameter search_mode harus 'index' atau 'contains'")
+            if after:
+                after_date, after_id = decode_cursor(after, 2)
+                after_values = [parse_datetime(after_date), int(after_id)]
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
         
         offset = (page - 1) * limit
         
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor(dictionary=True)
-        
-        # Build query with filters
-        where_clauses = []
-        params = []
-        
-        if search:
-            where_clauses.append("(nama LIKE %s OR email LIKE %s OR username LIKE %s)")
-            search_pattern = f"%{search}%"
-            params.extend([search_pattern, search_pattern, search_pattern])
-        
-        if role_filter:
-            where_clauses.append("role = %s")
-            params.append(role_filter)
-        
-        if status_filter:
-            where_clauses.append("status_akun = %s")
-            params.append(status_filter)
-        
-        where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
-        
-        # Count total
-        count_query = f"SELECT COUNT(*) as total FROM User {where_sql}"
-        cursor.execute(count_query, params)
-        total_result = cursor.fetchone()
-        total: int = total_result['total'] if total_result else 0  # type: ignore
-        
-        # Get users
-        query = f"""
-            SELECT 
-                user_id, nama, email, username, phone, role, status_akun, 
-                tanggal_daftar as created_at
-            FROM User
-            {where_sql}
-            ORDER BY tanggal_daftar DESC
-            LIMIT %s OFFSET %s
-        """
-        
-        cursor.execute(query, params + [limit, offset])
-        users = cursor.fetchall()
-        
-        # Format response
-        result = []
-        for user in users:
-            user_data: dict = user  # type: ignore
-            result.append({
-                "user_id": user_data['user_id'],
-                "nama": user_data['nama'],
-                "email": user_data['email'],
-                "username": user_data['username'],
-                "phone": user_data['phone'],
-                "role": user_data['role'],
-                "status": user_data['status_akun'],
-                "created_at": user_data['created_at'].isoformat() if user_data['created_at'] else None
-            })
-        
-        return jsonify({
-            "total": total,
-            "page": page,
-            "limit": limit,
-            "total_pages": (total + limit - 1) // limit,
-            "users": result
-        }), 200
-        
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor(dictionary=True)
+
+            # Build query with filters
+            join_sql = ""
+            where_clauses = []
+            params = []
+
+            if search:
+                join_sql, search_where, params = build_user_search(search, search_mode)
+                if search_where:
+                    where_clauses.append(search_where)
+
+            if role_filter:
+                where_clauses.append("u.role = %s")
+                params.append(role_filter)
+
+            if status_filter:
+                where_clauses.append("u.status_akun = %s")
+                params.append(status_filter)
+
+            where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+
+            # Count total (cache singkat per filter)
+            total = None
+            total_cached = False
+            if count_mode != 'none':
+                count_key = (search, search_mode, role_filter, status_filter)
+                if count_mode != 'exact':
+                    total = USER_COUNT_CACHE.get(count_key)
+                    total_cached = total is not None
+                if total is None:
+                    cursor.execute(f"SELECT COUNT(*) as total FROM User u {join_sql} {where_sql}", params)
+                    total_result = cursor.fetchone()
+                    total = total_result['total'] if total_result else 0  # type: ignore
+                    USER_COUNT_CACHE.set(count_key, total)
+
+            if cursor_mode:
+                page_params = []
+                if after:
+                    condition, page_params = keyset_condition(USER_CURSOR_ORDER, after_values)
+                    where_sql = (where_sql + " AND " if where_sql else "WHERE ") + condition
+                limit_sql = "LIMIT %s"
+                page_params.append(limit + 1)
+            else:
+                limit_sql = "LIMIT %s OFFSET %s"
+                page_params = [limit, offset]
+
+            # Get users
+            query = f"""
+                SELECT
+                    u.user_id, u.nama, u.email, u.username, u.phone, u.role, u.status_akun,
+                    u.tanggal_daftar as created_at
+                FROM User u
+                {join_sql}
+                {where_sql}
+                ORDER BY u.tanggal_daftar DESC, u.user_id DESC
+                {limit_sql}
+            """
+
+            cursor.execute(query, params + page_params)
+            users = cursor.fetchall()
+            has_more = cursor_mode and len(users) > limit
+            users = users[:limit]
+
+            # Format response
+            result = []
+            for user in users:
+                user_data: dict = user  # type: ignore
+                result.append({
+                    "user_id": user_data['user_id'],
+                    "nama": user_data['nama'],
+                    "email": user_data['email'],
+                    "username": user_data['username'],
+                    "phone": user_data['phone'],
+                    "role": user_data['role'],
+                    "status": user_data['status_akun'],
+                    "created_at": user_data['created_at'].isoformat() if user_data['created_at'] else None
+                })
+
+            if cursor_mode:
+                next_cursor = None
+                if has_more and users:
+                    last: dict = users[-1]  # type: ignore
+                    next_cursor = encode_cursor(last['created_at'], last['user_id'])
+                return jsonify({
+                    "total": total,
+                    "total_cached": total_cached,
+                    "limit": limit,
+                    "has_more": has_more,
+                    "next_cursor": next_cursor,
+                    "users": result
+                }), 200
+
+            return jsonify({
+                "total": total,
+                "total_cached": total_cached,
+                "page": page,
+                "limit": limit,
+                "total_pages": (total + limit - 1) // limit if total is not None else None,
+                "users": result
+            }), 200
+
     except Exception as e:
         print(f"[Get Users] Error: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
 
 
+# Jendela tren harian default (tanpa parameter start/end)
+DETECTION_TREND_DAYS = int(os.getenv('DETECTION_TREND_DAYS', '30'))
+
+def parse_day(value, name):
+    """Query param tanggal 'YYYY-MM-DD' -> date; raise ValueError jika tidak valid"""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f"Parameter {name} harus berformat YYYY-MM-DD")
+
 @app.route('/api/admin/detections/stats', methods=['GET'])
 def get_detections_stats():
     """
-    API untuk mendapatkan statistik deteksi
-    Returns: {total, by_disease, recent_count}
+    API untuk mendapatkan statistik deteksi (DetectionHistory)
+    Query params: ?start=YYYY-MM-DD&end=YYYY-MM-DD (opsional)
+    Returns: {total, recent_count, by_disease, by_severity, range, daily}
+    Tanpa start/end: total/by_disease/by_severity sepanjang waktu, daily = DETECTION_TREND_DAYS hari terakhir.
+    Dengan start/end: semua angka untuk rentang tersebut.
+    Dibaca dari rollup per hari per penyakit di StatsCounters; agregasi
+    DetectionHistory (idx_date_disease) jika rollup belum pernah di-rebuild.
     """
-    conn = None
-    cursor = None
     
     try:
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor(dictionary=True)
-        
-        # Total detections
-        cursor.execute("SELECT COUNT(*) as total FROM Diagnosa")
-        total_result = cursor.fetchone()
-        total: int = total_result['total'] if total_result else 0  # type: ignore
-        
-        # Recent count (last 7 days)
-        cursor.execute("""
-            SELECT COUNT(*) as recent_count
-            FROM Diagnosa
-            WHERE created_at >= DATE_SUB(NOW(), INTERVAL 7 DAY)
-        """)
-        recent_result = cursor.fetchone()
-        recent_count: int = recent_result['recent_count'] if recent_result else 0  # type: ignore
-        
-        return jsonify({
-            "total": total,
-            "recent_count": recent_count
-        }), 200
-        
+        from datetime import timedelta
+        today = datetime.now().date()
+        start_arg = request.args.get('start')
+        end_arg = request.args.get('end')
+        try:
+            end_day = parse_day(end_arg, 'end') if end_arg else today
+            start_day = parse_day(start_arg, 'start') if start_arg else end_day - timedelta(days=DETECTION_TREND_DAYS - 1)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if start_day > end_day:
+            return jsonify({"error": "Parameter start harus sebelum end"}), 400
+        ranged = bool(start_arg or end_arg)
+
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor(dictionary=True)
+
+            # Rollup hanya dipakai setelah di-rebuild (reconcile_stats.py), lihat read_stats_rows
+            all_time_rows = read_rebuilt_counters(cursor, 'detection')
+            use_counters = all_time_rows is not None
+
+            def read_days(first_day, last_day):
+                if use_counters:
+                    return stats_counters.read_days(cursor, 'detection', first_day, last_day)
+                cursor.execute(DETECTION_DAYS_SQL.format(table='DetectionHistory'), (first_day, last_day + timedelta(days=1)))
+                return cursor.fetchall()
+
+            day_rows = read_days(start_day, end_day)
+
+            if ranged:
+                totals = day_rows
+            elif use_counters:
+                totals = all_time_rows
+            else:
+                cursor.execute(DETECTION_TOTALS_SQL.format(table='DetectionHistory'))
+                totals = cursor.fetchall()
+
+            # Recent count (7 hari terakhir), pakai ulang day_rows jika rentangnya mencakup
+            week_start = today - timedelta(days=6)
+            covered = start_day <= week_start and end_day >= today
+            recent_rows = day_rows if covered else read_days(week_start, today)
+            recent_count = sum(
+                int(row['count']) for row in recent_rows
+                if week_start.isoformat() <= str(row['day'])[:10] <= today.isoformat()
+            )
+
+            result = summarize_detections(totals)
+            result.update({
+                "recent_count": recent_count,
+                "range": {"start": start_day.isoformat(), "end": end_day.isoformat()},
+                "daily": daily_trend(day_rows, start_day, end_day)
+            })
+            return jsonify(result), 200
+
     except Exception as e:
         print(f"[Detections Stats] Error: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
 
 
 # ===================================================================
@@ -1651,112 +2516,112 @@ def get_news_stats():
     API untuk mendapatkan statistik berita
     Returns: {total, published, draft, by_category}
     """
-    conn = None
-    cursor = None
     
     try:
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor(dictionary=True)
-        
-        # Total news
-        cursor.execute("SELECT COUNT(*) as total FROM News")
-        total_result = cursor.fetchone()
-        total: int = total_result['total'] if total_result else 0  # type: ignore
-        
-        # Published news
-        cursor.execute("SELECT COUNT(*) as published FROM News WHERE is_published = 1")
-        published_result = cursor.fetchone()
-        published: int = published_result['published'] if published_result else 0  # type: ignore
-        
-        # Draft news
-        cursor.execute("SELECT COUNT(*) as draft FROM News WHERE is_published = 0")
-        draft_result = cursor.fetchone()
-        draft: int = draft_result['draft'] if draft_result else 0  # type: ignore
-        
-        # By category
-        cursor.execute("SELECT category, COUNT(*) as count FROM News GROUP BY category")
-        by_category = {row['category']: row['count'] for row in cursor.fetchall()}  # type: ignore
-        
-        return jsonify({
-            "total": total,
-            "published": published,
-            "draft": draft,
-            "by_category": by_category
-        }), 200
-        
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor(dictionary=True)
+
+            # Counter StatsCounters (is_published, category), diringkas di Python (stats.py)
+            return jsonify(summarize_news(read_stats_rows(cursor, 'news', NEWS_STATS_SQL, 'News'))), 200
+
     except Exception as e:
         print(f"[News Stats] Error: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
 
 
+# Kolom list berita (tanpa content); fields=full menambahkan n.content
+NEWS_LIST_COLUMNS = (
+    "n.news_id, n.title, n.excerpt, n.category, n.image_url, n.external_url, n.author, "
+    "n.read_time, n.is_published, n.created_by, n.created_at, n.updated_at"
+)
+
 @app.route('/api/news', methods=['GET'])
 def get_all_news():
     """
     API untuk mendapatkan semua berita dengan filter
-    Query params: ?category=teknologi&limit=20&published_only=true
+    Query params: ?category=teknologi&limit=20&published_only=true&fields=summary
+    fields=summary: tanpa content (isi lengkap lewat GET /api/news/<id>), default full
     Returns: {total, news[]}
     """
-    conn = None
-    cursor = None
     
     try:
         category = request.args.get('category')  # teknologi, budidaya, pasar, penelitian
         limit = int(request.args.get('limit', 20))
         published_only = request.args.get('published_only', 'true').lower() == 'true'
-        
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor(dictionary=True)
-        
-        # Build query
-        query = "SELECT * FROM News WHERE 1=1"
-        params = []
-        
-        if published_only:
-            query += " AND is_published = 1"
-        
-        if category:
-            query += " AND category = %s"
-            params.append(category)
-        
-        query += " ORDER BY created_at DESC LIMIT %s"
-        params.append(limit)
-        
-        cursor.execute(query, params)
-        news_list = cursor.fetchall()
-        
-        result = []
-        for news in news_list:
-            news_data: dict = news  # type: ignore
-            result.append({
-                "news_id": news_data['news_id'],
-                "title": news_data['title'],
-                "excerpt": news_data['excerpt'],
-                "content": news_data['content'],
-                "category": news_data['category'],
-                "image_url": news_data['image_url'],
-                "external_url": news_data['external_url'],
-                "author": news_data['author'],
-                "read_time": news_data['read_time'],
-                "is_published": news_data['is_published'],
-                "created_by": news_data['created_by'],
-                "created_at": news_data['created_at'].isoformat() if news_data['created_at'] else None,
-                "updated_at": news_data['updated_at'].isoformat() if news_data['updated_at'] else None
+        fields = request.args.get('fields', 'full')
+        if fields not in ('full', 'summary'):
+            return jsonify({"error": "Parameter fields harus 'full' atau 'summary'"}), 400
+        include_content = fields == 'full'
+
+        # Landing page: dijawab dari cache tanpa menyentuh MySQL
+        cacheable = (category is None or category in NEWS_CATEGORIES) and limit <= RESPONSE_CACHE_MAX_LIMIT
+        cache_key = ('list', category, limit, published_only, fields) if cacheable else None
+        cached, generation = cached_response('news', cache_key)
+        if cached:
+            return cached
+
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor(dictionary=True)
+
+            # Deferred join: halaman news_id dipilih dari index (is_published, [category,] created_at)
+            # tanpa membaca baris, lalu hanya baris halaman itu yang diambil kolomnya.
+            # Mode summary tidak pernah membaca kolom content.
+            page_query = "SELECT news_id FROM News WHERE 1=1"
+            params = []
+
+            if published_only:
+                page_query += " AND is_published = 1"
+
+            if category:
+                page_query += " AND category = %s"
+                params.append(category)
+
+            page_query += " ORDER BY created_at DESC LIMIT %s"
+            params.append(limit)
+
+            columns = NEWS_LIST_COLUMNS + (", n.content" if include_content else "")
+            query = f"""
+                SELECT {columns}
+                FROM ({page_query}) AS page
+                JOIN News n ON n.news_id = page.news_id
+                ORDER BY n.created_at DESC
+            """
+
+            cursor.execute(query, params)
+            news_list = cursor.fetchall()
+
+            result = []
+            for news in news_list:
+                news_data: dict = news  # type: ignore
+                item = {
+                    "news_id": news_data['news_id'],
+                    "title": news_data['title'],
+                    "excerpt": news_data['excerpt'],
+                    "category": news_data['category'],
+                    "image_url": news_data['image_url'],
+                    "external_url": news_data['external_url'],
+                    "author": news_data['author'],
+                    "read_time": news_data['read_time'],
+                    "is_published": news_data['is_published'],
+                    "created_by": news_data['created_by'],
+                    "created_at": news_data['created_at'].isoformat() if news_data['created_at'] else None,
+                    "updated_at": news_data['updated_at'].isoformat() if news_data['updated_at'] else None
+                }
+                if include_content:
+                    item["content"] = news_data['content']
+                result.append(item)
+
+            return store_response('news', cache_key, generation, {
+                "total": len(result),
+                "news": result
             })
-        
-        return jsonify({
-            "total": len(result),
-            "news": result
-        }), 200
-        
+
     except Exception as e:
         print(f"[Get News] Error: {e}")
         return jsonify({
@@ -1764,9 +2629,6 @@ def get_all_news():
             "news": [],
             "error": str(e)
         }), 200
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
 
 
 @app.route('/api/news/<int:news_id>', methods=['GET'])
@@ -1775,46 +2637,56 @@ def get_news_detail(news_id):
     API untuk mendapatkan detail berita berdasarkan ID
     Returns: Single news object
     """
-    conn = None
-    cursor = None
     
     try:
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM News WHERE news_id = %s", (news_id,))
-        news = cursor.fetchone()
-        
-        if not news:
-            return jsonify({"error": "Berita tidak ditemukan"}), 404
-        
-        news_data: dict = news  # type: ignore
-        return jsonify({
-            "news_id": news_data['news_id'],
-            "title": news_data['title'],
-            "excerpt": news_data['excerpt'],
-            "content": news_data['content'],
-            "category": news_data['category'],
-            "image_url": news_data['image_url'],
-            "external_url": news_data['external_url'],
-            "author": news_data['author'],
-            "read_time": news_data['read_time'],
-            "is_published": news_data['is_published'],
-            "created_by": news_data['created_by'],
-            "created_at": news_data['created_at'].isoformat() if news_data['created_at'] else None,
-            "updated_at": news_data['updated_at'].isoformat() if news_data['updated_at'] else None
-        }), 200
+        cache_key = ('detail', news_id)
+        cached, generation = cached_response('news', cache_key)
+        if cached:
+            return cached
         
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("SELECT * FROM News WHERE news_id = %s", (news_id,))
+            news = cursor.fetchone()
+
+            if not news:
+                return jsonify({"error": "Berita tidak ditemukan"}), 404
+
+            news_data: dict = news  # type: ignore
+            return store_response('news', cache_key, generation, {
+                "news_id": news_data['news_id'],
+                "title": news_data['title'],
+                "excerpt": news_data['excerpt'],
+                "content": news_data['content'],
+                "category": news_data['category'],
+                "image_url": news_data['image_url'],
+                "external_url": news_data['external_url'],
+                "author": news_data['author'],
+                "read_time": news_data['read_time'],
+                "is_published": news_data['is_published'],
+                "created_by": news_data['created_by'],
+                "created_at": news_data['created_at'].isoformat() if news_data['created_at'] else None,
+                "updated_at": news_data['updated_at'].isoformat() if news_data['updated_at'] else None
+            })
+
     except Exception as e:
         print(f"[Get News Detail] Error: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
 
 
+def parse_is_published(value):
+    """Normalisasi is_published (bool, 0/1, "true"/"false", "0"/"1") ke 0/1; ValueError jika lain"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int) and value in (0, 1):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ('0', '1', 'true', 'false'):
+        return 1 if value.strip().lower() in ('1', 'true') else 0
+    raise ValueError("is_published harus 0/1 atau true/false")
+
 @app.route('/api/news', methods=['POST'])
 def create_news():
     """
@@ -1822,8 +2694,6 @@ def create_news():
     Body: {title, excerpt, content, category, image_url, external_url, author, read_time, created_by (admin user_id)}
     Returns: {news_id, message}
     """
-    conn = None
-    cursor = None
     
     try:
         data = request.json
@@ -1840,46 +2710,50 @@ def create_news():
         if not verify_superadmin(created_by):
             return jsonify({"error": "Unauthorized. Hanya superadmin yang dapat membuat berita"}), 403
         
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor()
-        
-        query = """
-            INSERT INTO News (title, excerpt, content, category, image_url, external_url, 
-                            author, read_time, is_published, created_by)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        values = (
-            data['title'],
-            data.get('excerpt', ''),
-            data['content'],
-            data['category'],
-            data.get('image_url', ''),
-            data.get('external_url', ''),
-            data.get('author', 'Admin'),
-            data.get('read_time', '5 menit'),
-            data.get('is_published', 1),
-            created_by
-        )
-        
-        cursor.execute(query, values)
-        conn.commit()
-        news_id = cursor.lastrowid
-        
-        return jsonify({
-            "success": True,
-            "message": "Berita berhasil dibuat",
-            "news_id": news_id
-        }), 201
-        
+        try:
+            is_published = parse_is_published(data.get('is_published', 1))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor()
+
+            query = """
+                INSERT INTO News (title, excerpt, content, category, image_url, external_url,
+                                author, read_time, is_published, created_by)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """
+            values = (
+                data['title'],
+                data.get('excerpt', ''),
+                data['content'],
+                data['category'],
+                data.get('image_url', ''),
+                data.get('external_url', ''),
+                data.get('author', 'Admin'),
+                data.get('read_time', '5 menit'),
+                is_published,
+                created_by
+            )
+
+            cursor.execute(query, values)
+            news_id = cursor.lastrowid
+            record_stats(cursor, 'news', {'is_published': is_published, 'category': data['category']})
+            conn.commit()
+            RESPONSE_CACHE.invalidate('news')
+
+            return jsonify({
+                "success": True,
+                "message": "Berita berhasil dibuat",
+                "news_id": news_id
+            }), 201
+
     except Exception as e:
         print(f"[Create News] Error: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
 
 
 @app.route('/api/news/<int:news_id>', methods=['PUT'])
@@ -1889,8 +2763,6 @@ def update_news(news_id):
     Body: {title?, excerpt?, content?, category?, image_url?, external_url?, author?, read_time?, is_published?, admin_id}
     Returns: {message}
     """
-    conn = None
-    cursor = None
     
     try:
         data = request.json
@@ -1901,49 +2773,63 @@ def update_news(news_id):
         if not admin_id or not verify_superadmin(admin_id):
             return jsonify({"error": "Unauthorized. Hanya superadmin yang dapat update berita"}), 403
         
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor()
-        
-        # Check if news exists
-        cursor.execute("SELECT news_id FROM News WHERE news_id = %s", (news_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Berita tidak ditemukan"}), 404
-        
-        # Build update query dynamically
-        update_fields = []
-        values = []
-        
-        updatable_fields = ['title', 'excerpt', 'content', 'category', 'image_url', 
-                          'external_url', 'author', 'read_time', 'is_published']
-        
-        for field in updatable_fields:
-            if field in data:
-                update_fields.append(f"{field} = %s")
-                values.append(data[field])
-        
-        if not update_fields:
-            return jsonify({"error": "Tidak ada field yang diupdate"}), 400
-        
-        values.append(news_id)
-        query = f"UPDATE News SET {', '.join(update_fields)} WHERE news_id = %s"
-        
-        cursor.execute(query, values)
-        conn.commit()
-        
-        return jsonify({
-            "success": True,
-            "message": "Berita berhasil diupdate"
-        }), 200
-        
+        if 'is_published' in data:
+            try:
+                data['is_published'] = parse_is_published(data['is_published'])
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor()
+
+            # Check if news exists (dikunci, nilai lama dipakai untuk StatsCounters)
+            cursor.execute(
+                "SELECT is_published, category, created_at FROM News WHERE news_id = %s FOR UPDATE", (news_id,)
+            )
+            current = cursor.fetchone()
+            if not current:
+                return jsonify({"error": "Berita tidak ditemukan"}), 404
+            old_published, old_category, news_created = current
+
+            # Build update query dynamically
+            update_fields = []
+            values = []
+
+            updatable_fields = ['title', 'excerpt', 'content', 'category', 'image_url',
+                              'external_url', 'author', 'read_time', 'is_published']
+
+            for field in updatable_fields:
+                if field in data:
+                    update_fields.append(f"{field} = %s")
+                    values.append(data[field])
+
+            if not update_fields:
+                return jsonify({"error": "Tidak ada field yang diupdate"}), 400
+
+            values.append(news_id)
+            query = f"UPDATE News SET {', '.join(update_fields)} WHERE news_id = %s"
+
+            cursor.execute(query, values)
+            record_stats(
+                cursor, 'news',
+                old={'is_published': old_published, 'category': old_category},
+                new={'is_published': data.get('is_published', old_published), 'category': data.get('category', old_category)},
+                created=news_created
+            )
+            conn.commit()
+            RESPONSE_CACHE.invalidate('news')
+
+            return jsonify({
+                "success": True,
+                "message": "Berita berhasil diupdate"
+            }), 200
+
     except Exception as e:
         print(f"[Update News] Error: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
 
 
 @app.route('/api/news/<int:news_id>', methods=['DELETE'])
@@ -1953,8 +2839,6 @@ def delete_news(news_id):
     Body: {admin_id}
     Returns: {message}
     """
-    conn = None
-    cursor = None
     
     try:
         data = request.json
@@ -1965,31 +2849,34 @@ def delete_news(news_id):
         if not admin_id or not verify_superadmin(admin_id):
             return jsonify({"error": "Unauthorized. Hanya superadmin yang dapat delete berita"}), 403
         
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor()
-        
-        # Check if news exists
-        cursor.execute("SELECT news_id FROM News WHERE news_id = %s", (news_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Berita tidak ditemukan"}), 404
-        
-        cursor.execute("DELETE FROM News WHERE news_id = %s", (news_id,))
-        conn.commit()
-        
-        return jsonify({
-            "success": True,
-            "message": "Berita berhasil dihapus"
-        }), 200
-        
+        with db_connection() as conn:
+            if conn is None:
+                return jsonify({"error": "Koneksi database gagal"}), 500
+
+            cursor = conn.cursor()
+
+            # Check if news exists (dikunci, nilainya dipakai untuk StatsCounters)
+            cursor.execute(
+                "SELECT is_published, category, created_at FROM News WHERE news_id = %s FOR UPDATE", (news_id,)
+            )
+            current = cursor.fetchone()
+            if not current:
+                return jsonify({"error": "Berita tidak ditemukan"}), 404
+            old_published, old_category, news_created = current
+
+            cursor.execute("DELETE FROM News WHERE news_id = %s", (news_id,))
+            record_stats(cursor, 'news', old={'is_published': old_published, 'category': old_category}, created=news_created)
+            conn.commit()
+            RESPONSE_CACHE.invalidate('news')
+
+            return jsonify({
+                "success": True,
+                "message": "Berita berhasil dihapus"
+            }), 200
+
     except Exception as e:
         print(f"[Delete News] Error: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cursor: cursor.close()
-        if conn and conn.is_connected(): conn.close()
 
 
 # --- Chat AI menggunakan Google Gemini REST API ---
@@ -2001,24 +2888,49 @@ def delete_news(news_id):
 def health_check():
     """Health check endpoint untuk monitoring deployment"""
     try:
-        # Test database connection
-        conn = get_db_connection()
-        if conn:
-            conn.close()
-            db_status = "connected"
-        else:
-            db_status = "disconnected"
+        # Test database connection (koneksi dari pool, di-ping saat checkout jika sudah lama idle)
+        with db_connection() as conn:
+            db_status = "connected" if conn else "disconnected"
     except:
         db_status = "error"
     
     return jsonify({
         "status": "healthy",
         "database": db_status,
-        "model_loaded": MODEL is not None,
+        "db_pool": DB_POOL.stats(),
+        "history_writer": HISTORY_WRITER.stats(),
+        "disease_catalog": DISEASE_CATALOG.stats(),
+        "model_loaded": is_model_loaded(),
+        "batching": PREDICT_BATCHER.stats() if PREDICT_BATCHER else {"enabled": False},
+        "prediction_cache": PREDICTION_CACHE.stats(),
+        "derivative_cache": DERIVATIVE_CACHE.stats(),
+        "response_cache": RESPONSE_CACHE.stats(),
+        "preprocess_pool": PREPROCESS_POOL.stats(),
+        "model_version": MODEL_VERSION,
+        "warmup": WARMUP_STATUS,
+        "inference": {
+            "backend": INFERENCE_BACKEND,
+            "compiled": SERVING_FN is not None,
+            "latency": INFERENCE_LATENCY
+        },
         "timestamp": datetime.now().isoformat()
     }), 200
 
 
+# --- Readiness Endpoint (untuk load balancer) ---
+@app.route('/api/ready', methods=['GET'])
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """200 hanya jika model sudah di-load dan warm-up selesai, selain itu 503"""
+    ready = is_model_loaded() and MODEL_READY.is_set()
+    return jsonify({
+        "ready": ready,
+        "model_loaded": is_model_loaded(),
+        "warmup": WARMUP_STATUS,
+        "timestamp": datetime.now().isoformat()
+    }), 200 if ready else 503
+
+
 # --- Menjalankan Aplikasi ---
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
@@ -0,0 +1,85 @@
+"""
+Kompresi response (gzip / brotli) lewat hook after_request
+Body JSON/teks di atas min_size dikompres sesuai Accept-Encoding client
+(brotli jika paket `brotli` / `brotlicffi` terpasang dan diterima client, selain itu gzip).
+Yang tidak disentuh: file yang di-stream (send_file / uploads), gambar dan tipe
+lain yang sudah terkompresi, response yang sudah punya Content-Encoding, dan
+response tanpa body (304, 204, 206).
+
+ETag response terkompresi diberi akhiran -gzip / -br (tetap strong, beda per
+encoding); http_cache.matches() menerima ketiga variannya.
+"""
+
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli  # API sama, untuk PyPy / platform tanpa wheel brotli
+    except ImportError:  # brotli opsional: tanpa paket ini hanya gzip
+        brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/javascript', 'image/svg+xml', 'text/')
+ENCODING_SUFFIXES = {'br': '-br', 'gzip': '-gzip'}
+
+
+def brotli_available():
+    return brotli is not None
+
+
+def is_compressible(mimetype):
+    return bool(mimetype) and any(mimetype.startswith(kind) for kind in COMPRESSIBLE_TYPES)
+
+
+def choose_encoding(accept_encodings):
+    """werkzeug Accept (request.accept_encodings) -> 'br' | 'gzip' | None"""
+    candidates = []
+    if brotli is not None and accept_encodings.quality('br') > 0:
+        candidates.append((accept_encodings.quality('br'), 1, 'br'))
+    if accept_encodings.quality('gzip') > 0:
+        candidates.append((accept_encodings.quality('gzip'), 0, 'gzip'))
+    if not candidates:
+        return None
+    # Kualitas tertinggi menang; jika sama, brotli (lebih kecil) didahulukan
+    return max(candidates)[2]
+
+
+def _add_vary(response):
+    vary = {value.strip().lower() for value in response.headers.get('Vary', '').split(',') if value.strip()}
+    if 'accept-encoding' not in vary:
+        response.headers.add('Vary', 'Accept-Encoding')
+
+
+def compress_response(response, accept_encodings, min_size=1024, gzip_level=6, brotli_quality=4):
+    """Kompres body response in-place jika layak; return response"""
+    if response.direct_passthrough or response.is_streamed:
+        return response
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return response
+    if not is_compressible(response.mimetype) or 'Content-Encoding' in response.headers:
+        return response
+    if 'X-Accel-Redirect' in response.headers or 'X-Sendfile' in response.headers:
+        return response
+
+    _add_vary(response)
+    data = response.get_data()
+    if len(data) < min_size:
+        return response
+    encoding = choose_encoding(accept_encodings)
+    if encoding is None:
+        return response
+
+    if encoding == 'br':
+        compressed = brotli.compress(data, quality=brotli_quality)
+    else:
+        compressed = gzip.compress(data, compresslevel=gzip_level, mtime=0)
+    if len(compressed) >= len(data):
+        return response
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(etag + ENCODING_SUFFIXES[encoding], weak=weak)
+    return response
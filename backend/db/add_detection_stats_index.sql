@@ -0,0 +1,23 @@
+-- ===================================================================
+-- MIGRATION: INDEX STATISTIK DETEKSI (DetectionHistory)
+-- ===================================================================
+-- GET /api/admin/detections/stats membaca rollup per hari per penyakit dari
+-- StatsCounters (entity 'detection', lihat create_stats_counters.sql).
+-- Jika counter belum dibangun, endpoint meng-agregasi DetectionHistory per
+-- rentang tanggal; index ini membuat query tersebut (dan rebuild counter oleh
+-- scripts/reconcile_stats.py) menjadi range scan index-only tanpa membaca baris.
+-- ===================================================================
+
+USE plantvision_db;
+
+ALTER TABLE DetectionHistory
+    ADD INDEX idx_date_disease (detection_date, disease_name, severity);
+
+-- Isi rollup deteksi dari data yang sudah ada:
+--   python scripts/reconcile_stats.py --entity detection
+
+-- Cek: harus memakai idx_date_disease dengan "Using index"
+EXPLAIN SELECT disease_name, severity, DATE(detection_date) AS day, COUNT(*) AS count
+FROM DetectionHistory
+WHERE detection_date >= CURDATE() - INTERVAL 30 DAY AND detection_date < CURDATE() + INTERVAL 1 DAY
+GROUP BY disease_name, severity, DATE(detection_date);
@@ -0,0 +1,27 @@
+-- ===================================================================
+-- MIGRATION: INDEX KEYSET PAGINATION FEEDBACK (ADMIN)
+-- ===================================================================
+-- GET /api/admin/feedbacks?mode=cursor mengurutkan (created_at, feedback_id)
+-- dan melanjutkan dari cursor, bukan LIMIT/OFFSET.
+-- - idx_status diperluas dengan feedback_id supaya tie-breaker tidak butuh filesort
+-- - idx_category diperluas dengan (created_at, feedback_id) untuk filter kategori
+-- - idx_created untuk listing tanpa filter
+-- Index lama dihapus karena sudah tercakup sebagai prefix.
+-- ===================================================================
+
+USE plantvision_db;
+
+ALTER TABLE Feedback
+    ADD INDEX idx_status_created_id (status, created_at DESC, feedback_id DESC),
+    ADD INDEX idx_category_created_id (category, created_at DESC, feedback_id DESC),
+    ADD INDEX idx_created_id (created_at DESC, feedback_id DESC);
+
+ALTER TABLE Feedback
+    DROP INDEX idx_status,
+    DROP INDEX idx_category;
+
+-- Cek: harus memakai idx_status_created_id tanpa "Using filesort"
+EXPLAIN SELECT feedback_id FROM Feedback
+WHERE status = 'pending'
+ORDER BY created_at DESC, feedback_id DESC
+LIMIT 21;
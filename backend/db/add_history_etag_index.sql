@@ -0,0 +1,17 @@
+-- ===================================================================
+-- MIGRATION: INDEX VALIDATOR ETAG DETECTION HISTORY
+-- ===================================================================
+-- GET /api/detection-history/<user_id> menghitung ETag dari
+-- SELECT MAX(id) ... WHERE user_id = ? sebelum query isi halaman.
+-- Di idx_user_date_id kolom id ada di posisi ketiga, jadi MAX(id) tetap
+-- membaca seluruh riwayat user. Dengan (user_id, id) MAX(id) cukup satu
+-- probe index ("Select tables optimized away"), berapa pun jumlah riwayatnya.
+-- ===================================================================
+
+USE plantvision_db;
+
+ALTER TABLE DetectionHistory
+    ADD INDEX idx_user_id (user_id, id);
+
+-- Cek: Extra harus "Select tables optimized away"
+EXPLAIN SELECT MAX(id) FROM DetectionHistory WHERE user_id = 1;
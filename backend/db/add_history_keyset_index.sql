@@ -0,0 +1,24 @@
+-- ===================================================================
+-- MIGRATION: INDEX KEYSET PAGINATION DETECTION HISTORY
+-- ===================================================================
+-- GET /api/detection-history/<user_id> mengurutkan ORDER BY
+-- detection_date DESC, id DESC dan melanjutkan dari cursor (detection_date, id).
+-- idx_user_date hanya berisi (user_id, detection_date DESC); id (primary key)
+-- ikut tersimpan ASC sehingga urutan id DESC tetap butuh filesort.
+-- Index baru memuat id secara eksplisit dengan arah yang sama, lalu
+-- idx_user_date dihapus karena sudah tercakup (prefix user_id tetap ada untuk FK).
+-- ===================================================================
+
+USE plantvision_db;
+
+ALTER TABLE DetectionHistory
+    ADD INDEX idx_user_date_id (user_id, detection_date DESC, id DESC);
+
+ALTER TABLE DetectionHistory
+    DROP INDEX idx_user_date;
+
+-- Cek: harus memakai idx_user_date_id tanpa "Using filesort"
+EXPLAIN SELECT id FROM DetectionHistory
+WHERE user_id = 1
+ORDER BY detection_date DESC, id DESC
+LIMIT 51;
@@ -0,0 +1,27 @@
+-- ===================================================================
+-- MIGRATION: INDEX LIST BERITA (GET /api/news)
+-- ===================================================================
+-- List berita memilih halaman news_id lebih dulu (deferred join), lalu hanya
+-- mengambil kolom untuk baris halaman itu; fields=summary tidak membaca content.
+-- - idx_published (is_published, created_at DESC) sudah ada di setup_news.sql dan
+--   meng-cover subquery halaman tanpa filter kategori (news_id ikut sebagai primary key)
+-- - idx_category diperluas dengan (is_published, created_at) untuk filter kategori
+-- - idx_created untuk list admin (published_only=false)
+-- Kolom excerpt/image_url bertipe TEXT sehingga tidak bisa masuk index; yang
+-- di-cover adalah pemilihan + urutan halaman, bukan kolom list-nya.
+-- ===================================================================
+
+USE plantvision_db;
+
+ALTER TABLE News
+    ADD INDEX idx_category_published_created (category, is_published, created_at DESC),
+    ADD INDEX idx_created (created_at DESC);
+
+ALTER TABLE News
+    DROP INDEX idx_category;
+
+-- Cek: subquery harus "Using index" pada idx_published tanpa "Using filesort"
+EXPLAIN SELECT news_id FROM News
+WHERE is_published = 1
+ORDER BY created_at DESC
+LIMIT 20;
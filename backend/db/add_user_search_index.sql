@@ -0,0 +1,30 @@
+-- ===================================================================
+-- MIGRATION: INDEX PENCARIAN & PAGINATION USER (ADMIN)
+-- ===================================================================
+-- GET /api/admin/users?search=... (search_mode=index, default):
+-- - MATCH(nama, email, username) AGAINST ('+kata*' IN BOOLEAN MODE) -> ft_user_search
+-- - email LIKE 'x%' / username LIKE 'x%' -> index UNIQUE email & username yang sudah ada
+-- Ketiganya digabung dengan UNION, jadi tidak ada LIKE '%x%' yang memaksa full scan.
+-- Keyset pagination ORDER BY tanggal_daftar DESC, user_id DESC -> idx_tanggal_daftar_id
+--
+-- Catatan: kata < innodb_ft_min_token_size (default 3) tidak masuk index FULLTEXT;
+-- pencarian sependek itu tetap tertangani oleh prefix email/username.
+-- ===================================================================
+
+USE plantvision_db;
+
+ALTER TABLE User
+    ADD FULLTEXT INDEX ft_user_search (nama, email, username);
+
+ALTER TABLE User
+    ADD INDEX idx_tanggal_daftar_id (tanggal_daftar DESC, user_id DESC);
+
+-- Cek rencana query pencarian
+EXPLAIN SELECT u.user_id FROM User u
+JOIN (
+    SELECT user_id FROM User WHERE MATCH(nama, email, username) AGAINST ('+budi*' IN BOOLEAN MODE)
+    UNION SELECT user_id FROM User WHERE email LIKE 'budi%'
+    UNION SELECT user_id FROM User WHERE username LIKE 'budi%'
+) matched ON matched.user_id = u.user_id
+ORDER BY u.tanggal_daftar DESC, u.user_id DESC
+LIMIT 21;
@@ -0,0 +1,22 @@
+-- ===================================================================
+-- MIGRATION: TABEL IdSequence (pre-allocated DetectionHistory id)
+-- ===================================================================
+-- /api/predict menulis DetectionHistory secara write-behind (history_writer.py).
+-- Supaya response tetap membawa history_id, backend mereservasi blok id
+-- dari tabel ini (UPDATE ... LAST_INSERT_ID) lalu meng-insert dengan id eksplisit.
+-- Tanpa tabel ini, insert tetap jalan tapi history_id di response = null.
+-- ===================================================================
+
+USE plantvision_db;
+
+CREATE TABLE IF NOT EXISTS IdSequence (
+    name VARCHAR(64) PRIMARY KEY,
+    next_id BIGINT NOT NULL
+) ENGINE=InnoDB;
+
+-- Mulai setelah id DetectionHistory terbesar yang sudah ada
+INSERT INTO IdSequence (name, next_id)
+SELECT 'DetectionHistory', COALESCE(MAX(id), 0) + 1 FROM DetectionHistory
+ON DUPLICATE KEY UPDATE next_id = GREATEST(IdSequence.next_id, VALUES(next_id));
+
+SELECT * FROM IdSequence;
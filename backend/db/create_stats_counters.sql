@@ -0,0 +1,24 @@
+-- ===================================================================
+-- MIGRATION: TABEL StatsCounters (counter dashboard inkremental)
+-- ===================================================================
+-- Endpoint /api/admin/*/stats membaca counter di tabel ini (stats_counters.py),
+-- bukan meng-agregasi seluruh Feedback/News/User/DetectionHistory.
+-- Write path di app.py menaikkan/menurunkan counter di transaksi yang sama.
+-- Setelah tabel dibuat, isi awal counter dengan:
+--   python scripts/reconcile_stats.py
+-- Sampai reconcile_stats.py menulis penanda 'rebuilt' untuk suatu entity, endpoint
+-- tetap meng-agregasi tabel sumber (counter yang terisi sebelumnya belum lengkap).
+-- ===================================================================
+
+USE plantvision_db;
+
+CREATE TABLE IF NOT EXISTS StatsCounters (
+    entity VARCHAR(32) NOT NULL,
+    dimension VARCHAR(255) NOT NULL,
+    bucket VARCHAR(10) NOT NULL,          -- 'all', 'YYYY-MM-DD', atau penanda 'rebuilt'
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (entity, dimension, bucket),
+    INDEX idx_entity_bucket (entity, bucket)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+SELECT entity, COUNT(*) AS counter_rows FROM StatsCounters GROUP BY entity;
@@ -20,10 +20,29 @@ CREATE TABLE User (
     status_akun VARCHAR(20) DEFAULT 'active',
     accept_terms TINYINT(1) DEFAULT 0,
     tanggal_daftar TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FULLTEXT INDEX ft_user_search (nama, email, username),
+    INDEX idx_tanggal_daftar_id (tanggal_daftar DESC, user_id DESC)
+);
+
+-- Versioned disease text (disease_info.py), referenced by DetectionHistory.disease_info_id
+DROP TABLE IF EXISTS DiseaseInfo;
+CREATE TABLE DiseaseInfo (
+    info_id INT AUTO_INCREMENT PRIMARY KEY,
+    class_name VARCHAR(100) NOT NULL,
+    content_version CHAR(16) NOT NULL,
+    disease VARCHAR(150),
+    severity VARCHAR(20),
+    description TEXT,
+    symptoms TEXT,
+    treatment TEXT,
+    prevention TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_class_version (class_name, content_version)
 );
 
 -- Create the DetectionHistory table for storing ML detection results
+-- description/symptoms/treatment/prevention are legacy columns (NULL for new rows)
 CREATE TABLE DetectionHistory (
     id INT AUTO_INCREMENT PRIMARY KEY,
     user_id INT NOT NULL,
@@ -31,11 +50,33 @@ CREATE TABLE DetectionHistory (
     disease_name VARCHAR(100) NOT NULL,
     confidence DECIMAL(5, 2) NOT NULL,
     severity VARCHAR(20) NOT NULL,
+    disease_info_id INT NULL,
     description TEXT,
     symptoms TEXT,
     treatment TEXT,
     prevention TEXT,
     detection_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES User(user_id) ON DELETE CASCADE,
-    INDEX idx_user_date (user_id, detection_date DESC)
-);
\ No newline at end of file
+    FOREIGN KEY (disease_info_id) REFERENCES DiseaseInfo(info_id),
+    INDEX idx_user_date_id (user_id, detection_date DESC, id DESC),
+    INDEX idx_user_id (user_id, id),
+    INDEX idx_date_disease (detection_date, disease_name, severity)
+);
+
+-- Sequence untuk pre-allocated DetectionHistory id (lihat create_id_sequence.sql)
+CREATE TABLE IF NOT EXISTS IdSequence (
+    name VARCHAR(64) PRIMARY KEY,
+    next_id BIGINT NOT NULL
+);
+INSERT INTO IdSequence (name, next_id) VALUES ('DetectionHistory', 1)
+ON DUPLICATE KEY UPDATE next_id = next_id;
+
+-- Counter statistik dashboard (stats_counters.py), dijaga oleh write path
+CREATE TABLE IF NOT EXISTS StatsCounters (
+    entity VARCHAR(32) NOT NULL,
+    dimension VARCHAR(255) NOT NULL,
+    bucket VARCHAR(10) NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (entity, dimension, bucket),
+    INDEX idx_entity_bucket (entity, bucket)
+);
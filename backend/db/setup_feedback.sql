@@ -47,8 +47,9 @@ CREATE TABLE Feedback (
     
     -- Indexes untuk performance
     INDEX idx_user_feedback (user_id, created_at DESC),
-    INDEX idx_status (status, created_at DESC),
-    INDEX idx_category (category),
+    INDEX idx_status_created_id (status, created_at DESC, feedback_id DESC),
+    INDEX idx_category_created_id (category, created_at DESC, feedback_id DESC),
+    INDEX idx_created_id (created_at DESC, feedback_id DESC),
     INDEX idx_email (email),
     INDEX idx_tracking (tracking_code)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -42,8 +42,9 @@ CREATE TABLE News (
     FOREIGN KEY (created_by) REFERENCES User(user_id) ON DELETE SET NULL,
     
     -- Indexes untuk performance
-    INDEX idx_category (category),
+    INDEX idx_category_published_created (category, is_published, created_at DESC),
     INDEX idx_published (is_published, created_at DESC),
+    INDEX idx_created (created_at DESC),
     INDEX idx_created_by (created_by)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
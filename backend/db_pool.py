@@ -0,0 +1,219 @@
+"""
+Connection pool MySQL untuk app.py
+Koneksi dipakai ulang antar request supaya tidak ada TCP + auth handshake
+per request dan jumlah koneksi ke MySQL tetap terbatas (size + max_overflow).
+
+- size          : koneksi yang tetap dibuka saat idle
+- max_overflow  : koneksi tambahan saat lonjakan, ditutup lagi setelah dipakai
+- recycle       : koneksi idle lebih lama dari ini (detik) ditutup & dibuat ulang
+- max_lifetime  : koneksi yang umurnya (sejak dibuat) lebih dari ini (detik) tidak dipakai ulang
+- pre_ping      : ping koneksi idle sebelum dipakai (hanya jika idle > pre_ping_after detik)
+- timeout       : lama menunggu koneksi bebas sebelum PoolTimeout
+"""
+
+import threading
+import time
+
+
+class PoolTimeout(Exception):
+    """Tidak ada koneksi bebas dalam batas waktu"""
+
+
+class PooledConnection:
+    """
+    Pembungkus koneksi: semua atribut diteruskan ke koneksi asli,
+    tetapi close() mengembalikan koneksi ke pool (bukan menutupnya).
+    Cursor yang dibuat lewat cursor() ikut ditutup saat close().
+    Bisa dipakai sebagai context manager.
+    """
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._cursors = []
+
+    def __getattr__(self, name):
+        raw = self.__dict__.get('_raw')
+        if raw is None:
+            raise AttributeError(f"Koneksi sudah dikembalikan ke pool ({name})")
+        return getattr(raw, name)
+
+    def is_connected(self):
+        # Tidak ping ke server: kesehatan koneksi sudah dicek saat checkout (pre_ping)
+        return self._raw is not None
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._raw.cursor(*args, **kwargs)
+        self._cursors.append(cursor)
+        return cursor
+
+    def close(self):
+        if self._raw is not None:
+            for cursor in self._cursors:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+            self._cursors = []
+            raw, self._raw = self._raw, None
+            self._pool._checkin(raw, self._created_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._raw is not None and exc_type is not None:
+            try:
+                self._raw.rollback()
+            except Exception:
+                pass
+        self.close()
+        return False
+
+
+class ConnectionPool:
+    def __init__(self, connect, size=5, max_overflow=10, recycle=1800, max_lifetime=3600, pre_ping=True,
+                 pre_ping_after=5.0, timeout=10.0):
+        self._connect = connect
+        self.size = max(1, int(size))
+        self.max_overflow = max(0, int(max_overflow))
+        self.recycle = float(recycle)
+        self.max_lifetime = float(max_lifetime)
+        self.pre_ping = pre_ping
+        self.pre_ping_after = float(pre_ping_after)
+        self.timeout = float(timeout)
+
+        self._idle = []  # stack of (raw, created_at, last_used) -> koneksi paling baru dipakai lebih dulu
+        self._open = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            "checkouts": 0,
+            "created": 0,
+            "recycled": 0,
+            "ping_failures": 0,
+            "timeouts": 0,
+            "wait_ms_total": 0.0,
+        }
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _expired(self, created_at, now):
+        return self.max_lifetime > 0 and now - created_at > self.max_lifetime
+
+    def _checkout_idle(self):
+        """
+        Ambil koneksi idle (dipanggil dengan _cond dipegang): return (raw, created_at, perlu_ping)
+        atau None. Ping dilakukan caller di luar lock supaya koneksi lambat tidak menahan pool.
+        """
+        now = time.monotonic()
+        while self._idle:
+            raw, created_at, last_used = self._idle.pop()
+            idle_for = now - last_used
+            if (self.recycle > 0 and idle_for > self.recycle) or self._expired(created_at, now):
+                self._discard(raw)
+                self._open -= 1
+                self._stats["recycled"] += 1
+                continue
+            return raw, created_at, self.pre_ping and idle_for > self.pre_ping_after
+        return None
+
+    def _ping(self, raw):
+        """Ping di luar lock; koneksi mati ditutup dan slotnya dilepas"""
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            self._discard(raw)
+            with self._cond:
+                self._open -= 1
+                self._stats["ping_failures"] += 1
+                self._cond.notify()
+            return False
+
+    def connection(self):
+        """Checkout satu PooledConnection; raise PoolTimeout jika pool penuh terlalu lama"""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        while True:
+            with self._cond:
+                while True:
+                    found = self._checkout_idle()
+                    if found:
+                        raw, created_at, needs_ping = found
+                        break
+                    if self._open < self.size + self.max_overflow:
+                        # Reservasi slot dulu, koneksi dibuat di luar lock
+                        self._open += 1
+                        raw, needs_ping = None, False
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(f"Tidak ada koneksi database bebas dalam {self.timeout:g} detik")
+                    self._cond.wait(remaining)
+
+            if needs_ping and not self._ping(raw):
+                continue
+            break
+
+        with self._cond:
+            self._stats["checkouts"] += 1
+            self._stats["wait_ms_total"] += (time.monotonic() - start) * 1000
+
+        if raw is None:
+            try:
+                raw = self._connect()
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+            created_at = time.monotonic()
+            with self._cond:
+                self._stats["created"] += 1
+
+        return PooledConnection(self, raw, created_at)
+
+    def _checkin(self, raw, created_at):
+        # Bersihkan transaksi yang belum di-commit supaya tidak terbawa ke request berikutnya
+        try:
+            if getattr(raw, 'in_transaction', False):
+                raw.rollback()
+        except Exception:
+            with self._cond:
+                self._discard(raw)
+                self._open -= 1
+                self._cond.notify()
+            return
+
+        with self._cond:
+            if self._expired(created_at, time.monotonic()):
+                self._discard(raw)
+                self._open -= 1
+                self._stats["recycled"] += 1
+            elif len(self._idle) >= self.size:
+                # Koneksi overflow -> tutup
+                self._discard(raw)
+                self._open -= 1
+            else:
+                self._idle.append((raw, created_at, time.monotonic()))
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+            })
+        checkouts = stats["checkouts"]
+        stats["avg_wait_ms"] = round(stats.pop("wait_ms_total") / checkouts, 3) if checkouts else 0
+        return stats
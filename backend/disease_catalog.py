@@ -0,0 +1,144 @@
+"""
+Katalog DiseaseInfo ber-versi
+DetectionHistory tidak lagi menyalin description/symptoms/treatment/prevention
+ke setiap baris; baris hanya menyimpan disease_info_id yang menunjuk ke tabel
+DiseaseInfo (satu baris per class_name + content_version).
+
+content_version = hash isi DISEASE_INFO untuk class tersebut, jadi mengubah
+teks di disease_info.py otomatis membuat versi baru dan riwayat lama tetap
+menampilkan teks saat deteksi dilakukan.
+
+Isi satu info_id tidak pernah berubah, sehingga hasil expand() di-cache di
+memori dan JSON-nya hanya di-decode sekali per versi (bukan per baris riwayat).
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+from disease_info import DISEASE_INFO
+
+CATALOG_FIELDS = ('disease', 'severity', 'description', 'symptoms', 'treatment', 'prevention')
+LIST_FIELDS = ('symptoms', 'treatment', 'prevention')
+
+SQL_UPSERT_DISEASE_INFO = """
+    INSERT INTO DiseaseInfo
+    (class_name, content_version, disease, severity, description, symptoms, treatment, prevention)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE info_id = LAST_INSERT_ID(info_id)
+"""
+
+
+def content_version(info):
+    """Hash pendek (16 hex) dari isi info, stabil terhadap urutan key"""
+    payload = json.dumps({field: info.get(field) for field in CATALOG_FIELDS},
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def upsert_disease_info(cursor, class_name, info):
+    """Insert versi info (jika belum ada) dan return info_id-nya"""
+    cursor.execute(SQL_UPSERT_DISEASE_INFO, (
+        class_name,
+        content_version(info),
+        info.get('disease'),
+        info.get('severity'),
+        info.get('description'),
+        *(json.dumps(info.get(field) or []) for field in LIST_FIELDS)
+    ))
+    return cursor.lastrowid
+
+
+class DiseaseCatalog:
+    """
+    current_id(class_name): info_id versi DISEASE_INFO saat ini dari memori (tanpa query)
+    ensure_registered(): daftarkan versi saat ini ke DB (startup / worker thread, dengan backoff)
+    expand(info_ids): {info_id: info dict} dari cache memori, sisanya satu query IN (...)
+    """
+
+    def __init__(self, get_connection, retry_backoff=1.0, max_retry_backoff=60.0):
+        self._get_connection = get_connection
+        self.retry_backoff = float(retry_backoff)
+        self.max_retry_backoff = max(self.retry_backoff, float(max_retry_backoff))
+        self._lock = threading.Lock()
+        self._current_ids = {}
+        self._by_id = {}
+        self._retry_at = 0.0
+        self._backoff = self.retry_backoff
+
+    def register_current(self):
+        """Daftarkan semua class di DISEASE_INFO; return False jika database tidak tersedia"""
+        conn = self._get_connection()
+        if conn is None:
+            return False
+        try:
+            cursor = conn.cursor()
+            try:
+                ids = {name: upsert_disease_info(cursor, name, info) for name, info in DISEASE_INFO.items()}
+                conn.commit()
+            finally:
+                cursor.close()
+        finally:
+            conn.close()
+        with self._lock:
+            self._current_ids.update(ids)
+            for name, info_id in ids.items():
+                self._by_id[info_id] = dict(DISEASE_INFO[name])
+        return True
+
+    def ensure_registered(self):
+        """
+        True jika semua class DISEASE_INFO sudah punya info_id. Jika belum, coba daftarkan;
+        setelah gagal, percobaan berikutnya ditunda (backoff eksponensial).
+        Jangan dipanggil dari request thread (bisa menunggu koneksi database).
+        """
+        with self._lock:
+            if len(self._current_ids) >= len(DISEASE_INFO):
+                return True
+            if time.monotonic() < self._retry_at:
+                return False
+        try:
+            registered = self.register_current()
+        except Exception as e:
+            print(f"[DiseaseCatalog] Gagal mendaftarkan DiseaseInfo: {e}")
+            registered = False
+        with self._lock:
+            if registered:
+                self._backoff = self.retry_backoff
+            else:
+                self._retry_at = time.monotonic() + self._backoff
+                self._backoff = min(self._backoff * 2, self.max_retry_backoff)
+        return registered
+
+    def current_id(self, class_name):
+        """info_id untuk class_name, atau None (class tidak dikenal / belum terdaftar)"""
+        with self._lock:
+            return self._current_ids.get(class_name)
+
+    def expand(self, cursor, info_ids):
+        """Return {info_id: info dict}; versi yang belum di-cache diambil lewat cursor"""
+        wanted = {info_id for info_id in info_ids if info_id is not None}
+        with self._lock:
+            missing = [info_id for info_id in wanted if info_id not in self._by_id]
+        if missing:
+            placeholders = ', '.join(['%s'] * len(missing))
+            cursor.execute(f"""
+                SELECT info_id, disease, severity, description, symptoms, treatment, prevention
+                FROM DiseaseInfo WHERE info_id IN ({placeholders})
+            """, missing)
+            loaded = {}
+            for row in cursor.fetchall():
+                row_data: dict = row  # type: ignore
+                info = {field: row_data[field] for field in ('disease', 'severity', 'description')}
+                for field in LIST_FIELDS:
+                    info[field] = json.loads(row_data[field]) if row_data[field] else []
+                loaded[row_data['info_id']] = info
+            with self._lock:
+                self._by_id.update(loaded)
+        with self._lock:
+            return {info_id: self._by_id[info_id] for info_id in wanted if info_id in self._by_id}
+
+    def stats(self):
+        with self._lock:
+            return {"registered_classes": len(self._current_ids), "cached_versions": len(self._by_id)}
@@ -0,0 +1,639 @@
+"""
+Write-behind untuk DetectionHistory
+/api/predict tidak lagi menunggu INSERT + commit: record dimasukkan ke antrean,
+worker thread menulisnya dalam multi-row INSERT setiap flush_interval.
+
+- IdAllocator: id DetectionHistory dialokasikan di muka per blok dari tabel
+  IdSequence (db/create_id_sequence.sql), jadi response langsung membawa history_id.
+  Blok cadangan direservasi worker thread sebelum blok aktif habis; request hanya
+  mereservasi sinkron jika blok benar-benar habis. Jika database sedang gagal,
+  history_id = None dan worker memberi id dari blok berikutnya sebelum INSERT.
+  Baris tidak pernah di-insert tanpa id selama IdSequence tersedia (tidak dicampur
+  dengan AUTO_INCREMENT).
+- Error sementara (koneksi putus, deadlock, lock wait) di-retry dengan backoff.
+- Error permanen pada satu baris (mis. user_id tidak ada) tidak menggagalkan
+  baris lain: batch diulang per baris, baris yang gagal diteruskan ke fallback.
+- Jika database tetap tidak bisa dihubungi, record ditulis ke spool JSONL di
+  disk dan dikirim ulang saat database kembali / saat aplikasi start lagi.
+  INSERT baru memakai INSERT biasa (id bentrok langsung error); hanya replay spool dan
+  retry setelah error (commit mungkin sudah masuk) memakai ON DUPLICATE KEY UPDATE.
+- Spool per proses (<nama>.<pid>.jsonl) dengan file .lock yang dikunci selama proses
+  hidup. Spool milik proses yang sudah mati (lock bisa diambil) diadopsi proses lain.
+  Baris spool yang rusak dipindah ke <spool>.bad, tidak menghentikan worker.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+from queue import Queue, Empty, Full
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Teks penyakit tidak disalin per baris, cukup referensi ke DiseaseInfo (disease_catalog.py)
+HISTORY_COLUMNS = (
+    'id', 'user_id', 'image_path', 'disease_name', 'confidence', 'severity',
+    'disease_info_id', 'detection_date'
+)
+
+SQL_INSERT_HISTORY_ROWS = f"""
+    INSERT INTO DetectionHistory ({', '.join(HISTORY_COLUMNS)})
+    VALUES ({', '.join(['%s'] * len(HISTORY_COLUMNS))})
+"""
+
+# Replay: baris yang id-nya sudah ada (sudah tertulis sebelum crash) dilewati
+SQL_REPLAY_HISTORY_ROWS = SQL_INSERT_HISTORY_ROWS + "    ON DUPLICATE KEY UPDATE id = id\n"
+
+# Koneksi putus / server mati / terlalu banyak koneksi / lock wait timeout / deadlock
+TRANSIENT_ERRNOS = {-1, 1040, 1205, 1213, 2003, 2006, 2013, 2055}
+DUPLICATE_KEY_ERRNO = 1062
+
+
+def is_transient(exc):
+    """Error tanpa errno (mis. PoolTimeout) atau errno koneksi/lock dianggap sementara"""
+    errno = getattr(exc, 'errno', None)
+    return errno is None or errno in TRANSIENT_ERRNOS
+
+
+class DatabaseUnavailable(Exception):
+    """get_connection() tidak menghasilkan koneksi"""
+
+
+def try_lock(path):
+    """Kunci eksklusif non-blocking pada file path; return file (tutup untuk melepas) atau None"""
+    f = open(path, 'a+')
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return f
+    except OSError:
+        f.close()
+        return None
+
+
+class IdAllocator:
+    """
+    Alokasi id DetectionHistory per blok (block_size) dari tabel IdSequence.
+    next_id berikutnya selalu dinaikkan melewati MAX(id) supaya tidak bentrok
+    dengan baris yang di-insert script lama lewat AUTO_INCREMENT.
+
+    refill() dipanggil worker thread: blok cadangan direservasi saat sisa blok
+    aktif < block_size/4, dan jika database gagal, percobaan berikutnya ditunda
+    (backoff eksponensial). next_id() membaca blok di memori; hanya jika blok
+    benar-benar habis, blok berikutnya direservasi sinkron (satu thread saja,
+    thread lain menunggu hasilnya). Selama backoff, next_id() return None tanpa
+    akses database.
+    """
+
+    SQL_RESERVE = """
+        UPDATE IdSequence
+        SET next_id = LAST_INSERT_ID(
+            GREATEST(next_id, (SELECT COALESCE(MAX(id), 0) + 1 FROM DetectionHistory)) + %s
+        )
+        WHERE name = %s
+    """
+
+    def __init__(self, get_connection, name='DetectionHistory', block_size=100,
+                 retry_backoff=1.0, max_retry_backoff=60.0):
+        self._get_connection = get_connection
+        self.name = name
+        self.block_size = max(1, int(block_size))
+        self.retry_backoff = max(0.1, float(retry_backoff))
+        self.max_retry_backoff = max(self.retry_backoff, float(max_retry_backoff))
+        self._lock = threading.Lock()
+        self._reserve_lock = threading.Lock()  # hanya satu reservasi berjalan
+        self._next = 0
+        self._end = 0  # eksklusif
+        self._spare = None  # blok berikutnya (start, end) yang sudah direservasi
+        self._disabled = False
+        self._retry_at = 0.0
+        self._backoff = self.retry_backoff
+        self.blocks_reserved = 0
+        self.exhausted = 0
+
+    @property
+    def disabled(self):
+        """True jika IdSequence tidak ada: semua baris memakai AUTO_INCREMENT"""
+        return self._disabled
+
+    def remaining(self):
+        with self._lock:
+            spare = self._spare[1] - self._spare[0] if self._spare else 0
+            return self._end - self._next + spare
+
+    def _reserve_block(self):
+        conn = self._get_connection()
+        if conn is None:
+            raise DatabaseUnavailable("Koneksi database gagal")
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(self.SQL_RESERVE, (self.block_size, self.name))
+                if cursor.rowcount == 0:
+                    conn.rollback()
+                    return None
+                cursor.execute("SELECT LAST_INSERT_ID()")
+                end = int(cursor.fetchone()[0])
+                conn.commit()
+            finally:
+                cursor.close()
+        finally:
+            conn.close()
+        return end - self.block_size, end
+
+    def _needs_block(self):
+        return self._spare is None and self._end - self._next < max(1, self.block_size // 4)
+
+    def refill(self):
+        """
+        Reservasi blok cadangan jika perlu (di luar _lock, diserialkan _reserve_lock).
+        Return False jika reservasi gagal / ditunda / IdSequence tidak tersedia.
+        """
+        with self._reserve_lock:
+            with self._lock:
+                if self._disabled:
+                    return False
+                if not self._needs_block():
+                    return True
+                if time.monotonic() < self._retry_at:
+                    return False
+
+            try:
+                block = self._reserve_block()
+            except Exception as e:
+                with self._lock:
+                    print(f"[HistoryWriter] Gagal reservasi id (coba lagi dalam {self._backoff:g} detik): {e}")
+                    self._retry_at = time.monotonic() + self._backoff
+                    self._backoff = min(self._backoff * 2, self.max_retry_backoff)
+                return False
+
+            with self._lock:
+                if block is None:
+                    print(f"[HistoryWriter] IdSequence '{self.name}' tidak ada, history_id memakai AUTO_INCREMENT")
+                    self._disabled = True
+                    return False
+                self._backoff = self.retry_backoff
+                self.blocks_reserved += 1
+                if self._next < self._end:
+                    self._spare = block
+                else:
+                    self._next, self._end = block
+                return True
+
+    def _take(self):
+        with self._lock:
+            if self._next >= self._end and self._spare is not None:
+                (self._next, self._end), self._spare = self._spare, None
+            if self._next < self._end:
+                value = self._next
+                self._next += 1
+                return value
+            return None
+
+    def next_id(self, reserve=True):
+        """
+        Id berikutnya. Jika blok habis dan reserve=True, blok baru direservasi sinkron.
+        Return None jika IdSequence tidak tersedia atau database sedang gagal (backoff).
+        """
+        value = self._take()
+        if value is None and reserve and self.refill():
+            value = self._take()
+        if value is None and not self._disabled:
+            with self._lock:
+                self.exhausted += 1
+        return value
+
+
+class HistoryWriter:
+    """
+    Antrean write-behind DetectionHistory.
+    submit(values) -> history_id; values sesuai HISTORY_COLUMNS tanpa 'id'. history_id None
+    hanya jika database sedang gagal (id diberikan worker sebelum INSERT) atau IdSequence
+    tidak ada (AUTO_INCREMENT).
+    before_write(rows) dipanggil di worker thread sebelum rows (list per baris) ditulis,
+    boleh mengubah nilai baris dan mengakses database (mis. melengkapi disease_info_id).
+    fallback(cursor, row) dipanggil untuk baris yang ditolak permanen oleh DetectionHistory.
+    after_insert(cursor, rows) dipanggil sebelum commit dengan baris (dict) yang benar-benar
+    baru masuk DetectionHistory (baris replay yang sudah ada tidak ikut), mis. untuk counter.
+    Stat "written" hanya menghitung baris yang benar-benar baru; baris replay yang sudah
+    ada dihitung di "duplicates".
+    """
+
+    def __init__(self, get_connection, spool_path, id_allocator=None, before_write=None, fallback=None,
+                 after_insert=None, flush_interval_ms=200.0, max_batch_size=100, max_queue_size=10000,
+                 max_retries=3, retry_backoff=0.5, spool_retry_seconds=30.0):
+        self._get_connection = get_connection
+        # spool_path = nama dasar; file yang ditulis proses ini: <root>.<pid><ext>
+        self._spool_root, self._spool_ext = os.path.splitext(spool_path)
+        self.spool_path = f"{self._spool_root}.{os.getpid()}{self._spool_ext}"
+        self.id_allocator = id_allocator
+        self.before_write = before_write
+        self.fallback = fallback
+        self.after_insert = after_insert
+        self.flush_interval_ms = max(0.0, float(flush_interval_ms))
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_queue_size = max(1, int(max_queue_size))
+        self.max_retries = max(0, int(max_retries))
+        self.retry_backoff = max(0.0, float(retry_backoff))
+        self.spool_retry_seconds = max(1.0, float(spool_retry_seconds))
+
+        self._queue = Queue(maxsize=self.max_queue_size)
+        self._lock = threading.Lock()
+        self._spool_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._next_spool_replay = 0.0
+        self._next_adopt = 0.0
+        self._spool_owner = None
+        self._stats = {
+            "submitted": 0,
+            "written": 0,
+            "duplicates": 0,
+            "batches": 0,
+            "retries": 0,
+            "fallback": 0,
+            "dropped": 0,
+            "spooled": 0,
+            "replayed": 0,
+            "bad_spool_lines": 0,
+            "adopted": 0,
+            "errors": 0,
+        }
+
+        self._worker = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._worker.start()
+
+    # --- API ---
+    def submit(self, values):
+        """Antrekan satu baris DetectionHistory, return history_id yang sudah dialokasikan (lihat next_id)"""
+        history_id = self.id_allocator.next_id() if self.id_allocator else None
+        row = [history_id] + list(values)
+        with self._lock:
+            self._stats["submitted"] += 1
+        try:
+            self._queue.put_nowait(row)
+        except Full:
+            # Antrean penuh (database lambat/mati lama) -> langsung ke spool
+            self._spool([row])
+        return history_id
+
+    def submit_many(self, values_list):
+        return [self.submit(values) for values in values_list]
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def spool_size(self):
+        try:
+            return os.path.getsize(self.spool_path)
+        except OSError:
+            return 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({
+            "queue_depth": self.queue_depth(),
+            "spool_bytes": self.spool_size(),
+            "flush_interval_ms": self.flush_interval_ms,
+            "max_batch_size": self.max_batch_size,
+            "ids_remaining": self.id_allocator.remaining() if self.id_allocator else None,
+        })
+        return stats
+
+    def stop(self, timeout=10.0):
+        """Hentikan worker dan flush sisa antrean (ke database, atau ke spool jika gagal)"""
+        self._stopped.set()
+        self._worker.join(timeout=timeout)
+        leftover = self._drain_all()
+        if leftover:
+            self._spool(leftover)
+
+    # --- Worker ---
+    def _collect(self):
+        """Ambil baris pertama (blocking), lalu kumpulkan sampai penuh atau interval habis."""
+        try:
+            first = self._queue.get(timeout=0.5)
+        except Empty:
+            return []
+
+        batch = [first]
+        deadline = time.perf_counter() + self.flush_interval_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except Empty:
+                break
+        return batch
+
+    def _drain_all(self):
+        rows = []
+        while True:
+            try:
+                rows.append(self._queue.get_nowait())
+            except Empty:
+                return rows
+
+    def _run(self):
+        self._guard(self._refill_ids)
+        self._guard(self._replay_spool)
+        while not self._stopped.is_set():
+            batch = []
+            try:
+                batch = self._collect()
+                if batch:
+                    written = self._write_with_retry(batch)
+                    rows, batch = batch, []
+                    if written:
+                        self._replay_spool()
+                    else:
+                        self._spool(rows)
+                elif time.monotonic() >= self._next_spool_replay:
+                    self._replay_spool()
+            except Exception as e:
+                # Worker tidak boleh mati: batch yang belum tertulis diamankan ke spool
+                self._log_error("loop", e)
+                if batch:
+                    self._spool(batch)
+                time.sleep(min(1.0, self.spool_retry_seconds))
+
+            # Isi ulang blok id di background supaya request tidak pernah menunggu reservasi
+            self._guard(self._refill_ids)
+
+        # Flush terakhir saat stop()
+        leftover = self._drain_all()
+        if leftover and not self._write_with_retry(leftover, retries=0):
+            self._spool(leftover)
+
+    def _refill_ids(self):
+        if self.id_allocator:
+            self.id_allocator.refill()
+
+    def _guard(self, fn, *args):
+        try:
+            fn(*args)
+        except Exception as e:
+            self._log_error(getattr(fn, '__name__', 'hook'), e)
+
+    def _log_error(self, where, exc):
+        with self._lock:
+            self._stats["errors"] += 1
+        print(f"[HistoryWriter] Error di {where}: {exc!r}")
+
+    def _assign_ids(self, rows):
+        """Beri id ke baris yang belum punya (submit saat blok habis); False jika id belum tersedia"""
+        if self.id_allocator is None or self.id_allocator.disabled:
+            return True
+        for row in rows:
+            if row[0] is None:
+                row[0] = self.id_allocator.next_id()
+                if row[0] is None:
+                    return self.id_allocator.disabled
+        return True
+
+    def _write_with_retry(self, rows, retries=None, replay=False):
+        """
+        Tulis rows; return False jika database tetap tidak tersedia setelah retry.
+        replay=True untuk baris dari spool (boleh sudah ada di DetectionHistory).
+        """
+        retries = self.max_retries if retries is None else retries
+        if not self._assign_ids(rows):
+            print(f"[HistoryWriter] Id belum tersedia untuk {len(rows)} baris")
+            return False
+        if self.before_write is not None:
+            self._guard(self.before_write, rows)
+        for attempt in range(retries + 1):
+            try:
+                self._write(rows, replay)
+                return True
+            except Exception as e:
+                if not is_transient(e):
+                    # Error permanen dari batch -> tulis per baris supaya baris lain tetap masuk
+                    try:
+                        self._write_rows_individually(rows, replay)
+                        return True
+                    except Exception as row_err:
+                        e = row_err
+                # Commit yang terputus bisa saja sudah masuk -> percobaan berikutnya sebagai replay
+                replay = True
+                if attempt < retries:
+                    with self._lock:
+                        self._stats["retries"] += 1
+                    print(f"[HistoryWriter] Retry {attempt + 1}/{retries}: {e}")
+                    time.sleep(self.retry_backoff * (2 ** attempt))
+                else:
+                    print(f"[HistoryWriter] Database tidak tersedia: {e}")
+        return False
+
+    def _connect(self):
+        conn = self._get_connection()
+        if conn is None:
+            raise DatabaseUnavailable("Koneksi database gagal")
+        return conn
+
+    def _write(self, rows, replay=False):
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            try:
+                new_rows = self._new_rows(cursor, rows) if replay else rows
+                cursor.executemany(SQL_REPLAY_HISTORY_ROWS if replay else SQL_INSERT_HISTORY_ROWS, rows)
+                self._after_insert(cursor, new_rows)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        finally:
+            conn.close()
+        with self._lock:
+            self._stats["written"] += len(new_rows)
+            self._stats["duplicates"] += len(rows) - len(new_rows)
+            self._stats["batches"] += 1
+
+    def _new_rows(self, cursor, rows):
+        """Baris replay yang id-nya belum ada di DetectionHistory"""
+        ids = [row[0] for row in rows if row[0] is not None]
+        if not ids:
+            return rows
+        cursor.execute(
+            f"SELECT id FROM DetectionHistory WHERE id IN ({', '.join(['%s'] * len(ids))})", ids
+        )
+        existing = {found[0] for found in cursor.fetchall()}
+        return [row for row in rows if row[0] not in existing]
+
+    def _after_insert(self, cursor, rows):
+        if self.after_insert is not None and rows:
+            self.after_insert(cursor, [dict(zip(HISTORY_COLUMNS, row)) for row in rows])
+
+    def _write_rows_individually(self, rows, replay=False):
+        """
+        Baris yang gagal permanen diteruskan ke fallback (atau dibuang dengan log).
+        Id bentrok pada INSERT baru berarti alokasi id bermasalah: dicatat sebagai error,
+        tidak diteruskan ke fallback.
+        """
+        conn = self._connect()
+        written = duplicates = fallback = dropped = 0
+        try:
+            cursor = conn.cursor()
+            try:
+                for row in rows:
+                    try:
+                        new_rows = self._new_rows(cursor, [row]) if replay else [row]
+                        cursor.execute(SQL_REPLAY_HISTORY_ROWS if replay else SQL_INSERT_HISTORY_ROWS, row)
+                        self._after_insert(cursor, new_rows)
+                        written += len(new_rows)
+                        duplicates += 1 - len(new_rows)
+                        continue
+                    except Exception as e:
+                        if is_transient(e):
+                            raise
+                        if getattr(e, 'errno', None) == DUPLICATE_KEY_ERRNO:
+                            self._log_error(f"insert (id={row[0]} sudah dipakai)", e)
+                            dropped += 1
+                            continue
+                        print(f"[HistoryWriter] Baris ditolak DetectionHistory (id={row[0]}): {e}")
+                    try:
+                        if self.fallback is None:
+                            raise RuntimeError("tidak ada fallback")
+                        self.fallback(cursor, dict(zip(HISTORY_COLUMNS, row)))
+                        fallback += 1
+                    except Exception as e:
+                        if is_transient(e):
+                            raise
+                        print(f"[HistoryWriter] Baris dibuang (id={row[0]}): {e}")
+                        dropped += 1
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        finally:
+            conn.close()
+        with self._lock:
+            self._stats["written"] += written
+            self._stats["duplicates"] += duplicates
+            self._stats["fallback"] += fallback
+            self._stats["dropped"] += dropped
+            self._stats["batches"] += 1
+
+    # --- Spool ---
+    def _spool(self, rows):
+        """Append rows ke spool JSONL (fsync) supaya tidak hilang saat restart"""
+        try:
+            self._append_lines(self.spool_path, [json.dumps(row, default=str) for row in rows])
+        except OSError as e:
+            # Disk penuh / tidak bisa ditulis: baris hilang, tapi request & worker tetap jalan
+            with self._lock:
+                self._stats["dropped"] += len(rows)
+            print(f"[HistoryWriter] Gagal menulis spool, {len(rows)} baris dibuang: {e}")
+            return
+        with self._lock:
+            self._stats["spooled"] += len(rows)
+        self._next_spool_replay = time.monotonic() + self.spool_retry_seconds
+        print(f"[HistoryWriter] {len(rows)} baris disimpan ke spool {self.spool_path}")
+
+    def _append_lines(self, path, lines):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._spool_lock:
+            if self._spool_owner is None and path == self.spool_path:
+                # Lock dipegang selama proses hidup: spool ini bukan yatim bagi proses lain
+                self._spool_owner = try_lock(self.spool_path + '.lock')
+            with open(path, 'a', encoding='utf-8') as f:
+                for line in lines:
+                    f.write(line + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _parse_spool(self, path):
+        """Baca baris spool; baris rusak (JSON terpotong, jumlah kolom salah) dipindah ke .bad"""
+        rows, bad = [], []
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                    if not isinstance(row, list) or len(row) != len(HISTORY_COLUMNS):
+                        raise ValueError(f"{len(row) if isinstance(row, list) else type(row).__name__} kolom")
+                    rows.append(row)
+                except ValueError as e:
+                    bad.append(line.rstrip('\n'))
+                    print(f"[HistoryWriter] Baris spool rusak dipindah ke .bad: {e}")
+        if bad:
+            self._append_lines(self.spool_path + '.bad', bad)
+            with self._lock:
+                self._stats["bad_spool_lines"] += len(bad)
+        return rows
+
+    def _replay_spool(self):
+        """Kirim ulang isi spool; file di-rename dulu supaya submit baru tidak tercampur"""
+        if time.monotonic() >= self._next_adopt:
+            self._next_adopt = time.monotonic() + self.spool_retry_seconds
+            self._adopt_orphans()
+        replaying = self.spool_path + '.replaying'
+        with self._spool_lock:
+            if not os.path.exists(replaying):
+                if not os.path.exists(self.spool_path):
+                    return
+                os.replace(self.spool_path, replaying)
+
+        rows = self._parse_spool(replaying)
+        for start in range(0, len(rows), self.max_batch_size):
+            chunk = rows[start:start + self.max_batch_size]
+            if not self._write_with_retry(chunk, retries=0, replay=True):
+                # Masih gagal -> sisanya kembali ke spool, coba lagi nanti
+                self._spool(rows[start:])
+                break
+            with self._lock:
+                self._stats["replayed"] += len(chunk)
+        os.remove(replaying)
+
+    def _adopt_orphans(self):
+        """
+        Pindahkan spool proses lain yang sudah mati (atau spool lama tanpa pid) ke spool
+        proses ini. Spool proses yang masih hidup dilewati karena lock-nya masih dipegang.
+        """
+        own = {self.spool_path, self.spool_path + '.replaying'}
+        candidates = glob.glob(f"{glob.escape(self._spool_root)}*{self._spool_ext}")
+        candidates += glob.glob(f"{glob.escape(self._spool_root)}*{self._spool_ext}.replaying")
+        for path in sorted(set(candidates) - own):
+            base = path[:-len('.replaying')] if path.endswith('.replaying') else path
+            lock_path = base + '.lock'
+            try:
+                lock = try_lock(lock_path)
+            except OSError:
+                continue
+            if lock is None:
+                continue
+            try:
+                if not os.path.exists(path):
+                    continue
+                rows = self._parse_spool(path)
+                if rows:
+                    self._append_lines(self.spool_path, [json.dumps(row, default=str) for row in rows])
+                os.remove(path)
+                with self._lock:
+                    self._stats["adopted"] += len(rows)
+                print(f"[HistoryWriter] {len(rows)} baris diadopsi dari spool {path}")
+            finally:
+                lock.close()
+            if not os.path.exists(base) and not os.path.exists(base + '.replaying'):
+                try:
+                    os.remove(lock_path)
+                except OSError:
+                    pass
@@ -0,0 +1,55 @@
+"""
+Helper HTTP caching: ETag kuat + conditional GET (If-None-Match -> 304)
+- Endpoint yang body-nya sudah ada (mis. dari RESPONSE_CACHE) memakai hash body.
+- Endpoint lain menghitung ETag dari validator murah (count/max id/updated_at)
+  lewat make_etag() sebelum query isi, sehingga 304 tidak perlu membangun response.
+Semua response ber-ETag diberi Cache-Control no-cache: browser menyimpan, tapi
+selalu revalidasi dulu (cocok untuk polling).
+"""
+
+import hashlib
+
+from flask import Response
+
+from compression import ENCODING_SUFFIXES
+
+# Naikkan jika format response berubah tanpa perubahan data (ETag lama jadi tidak valid)
+ETAG_VERSION = '2'
+
+
+def make_etag(*parts):
+    """ETag dari nilai validator (tanpa tanda kutip, lihat Response.set_etag)"""
+    raw = repr((ETAG_VERSION,) + parts).encode('utf-8')
+    return hashlib.sha1(raw).hexdigest()
+
+
+def body_etag(body):
+    """ETag dari isi body response (bytes)"""
+    return hashlib.sha1(body).hexdigest()
+
+
+def _cache_control(private):
+    return 'private, no-cache' if private else 'no-cache'
+
+
+def conditional(response, etag, request, private=False):
+    """Pasang ETag + Cache-Control; jadi 304 tanpa body jika If-None-Match cocok"""
+    if matches(request, etag):
+        return not_modified(etag, private)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = _cache_control(private)
+    return response
+
+
+def not_modified(etag, private=False):
+    """Response 304 langsung (validator cocok, isi tidak perlu di-query)"""
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = _cache_control(private)
+    return response
+
+
+def matches(request, etag):
+    """True jika If-None-Match request memuat etag, varian terkompresinya (compression.py), atau '*'"""
+    tags = request.if_none_match
+    return tags.contains(etag) or any(tags.contains(etag + suffix) for suffix in ENCODING_SUFFIXES.values())
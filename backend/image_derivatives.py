@@ -0,0 +1,171 @@
+"""
+Turunan gambar upload (thumbnail / WebP) yang dibuat saat pertama diminta
+GET /api/uploads/<path>?w=256&fmt=webp -> resize (tanpa upscale) + re-encode dengan PIL,
+hasilnya disimpan di cache disk dan dipakai ulang untuk request berikutnya.
+
+- Lebar dibulatkan ke atas ke salah satu WIDTHS supaya jumlah varian per file terbatas.
+- Key cache = sumber (sha256 untuk path content-addressed, atau path+mtime+size untuk
+  file lama) + lebar + format + versi encoder, jadi turunan tidak pernah basi.
+- Ukuran cache dibatasi max_bytes: file yang paling lama tidak dipakai (mtime,
+  di-touch setiap hit) dihapus lebih dulu.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+
+from PIL import Image, ImageOps
+
+WIDTHS = (128, 256, 480, 768, 1024)
+FORMATS = {
+    'webp': ('WEBP', '.webp', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', '.jpg', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+# Naikkan jika parameter encode/resize berubah (turunan lama tidak terpakai lagi)
+ENCODER_VERSION = 1
+
+
+def snap_width(width):
+    """Lebar diminta -> lebar varian terdekat ke atas (maksimal WIDTHS[-1])"""
+    for candidate in WIDTHS:
+        if width <= candidate:
+            return candidate
+    return WIDTHS[-1]
+
+
+class DerivativeCache:
+    def __init__(self, root, max_bytes=512 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._total_bytes = None
+        self.generated = 0
+        self.hits = 0
+        self.evicted = 0
+        os.makedirs(root, exist_ok=True)
+
+    # --- Key & path ---
+    def key(self, source_path, source_digest, width, fmt):
+        if source_digest is None:
+            stat = os.stat(source_path)
+            source_digest = f"{source_path}:{stat.st_mtime_ns}:{stat.st_size}"
+        raw = f"{source_digest}|{width}|{fmt}|{ENCODER_VERSION}".encode('utf-8')
+        return hashlib.sha1(raw).hexdigest()
+
+    def path_for(self, key, fmt):
+        return os.path.join(self.root, key[:2], key + FORMATS[fmt][1])
+
+    # --- API ---
+    def get_or_create(self, source_path, source_digest, width, fmt):
+        """Return (path turunan, key). Dibuat dari source_path jika belum ada di cache."""
+        key = self.key(source_path, source_digest, width, fmt)
+        path = self.path_for(key, fmt)
+        if self._touch(path):
+            with self._lock:
+                self.hits += 1
+            return path, key
+
+        # Satu thread per key yang membuat turunan; thread lain menunggu hasilnya
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if not self._touch(path):
+                size = self._render(source_path, path, width, fmt)
+                with self._lock:
+                    self.generated += 1
+                    if self._total_bytes is not None:
+                        self._total_bytes += size
+                self._evict()
+            else:
+                with self._lock:
+                    self.hits += 1
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return path, key
+
+    def stats(self):
+        with self._lock:
+            return {
+                "root": self.root,
+                "max_bytes": self.max_bytes,
+                "total_bytes": self._total_bytes,
+                "generated": self.generated,
+                "hits": self.hits,
+                "evicted": self.evicted,
+            }
+
+    # --- Internal ---
+    @staticmethod
+    def _touch(path):
+        """Tandai dipakai (mtime = sekarang) untuk eviction; False jika file belum ada"""
+        try:
+            os.utime(path, None)
+            return True
+        except OSError:
+            return False
+
+    def _render(self, source_path, path, width, fmt):
+        pil_format, _, _, options = FORMATS[fmt]
+        with Image.open(source_path) as img:
+            # JPEG: decode langsung di skala kecil (jauh lebih cepat untuk foto besar)
+            img.draft('RGB', (width, width))
+            img = ImageOps.exif_transpose(img)
+            if img.width > width:
+                height = max(1, round(img.height * width / img.width))
+                img = img.resize((width, height), Image.Resampling.LANCZOS)
+            if pil_format == 'JPEG' or img.mode not in ('RGB', 'RGBA'):
+                img = img.convert('RGBA' if pil_format == 'WEBP' and 'A' in img.getbands() else 'RGB')
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.part')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    img.save(f, format=pil_format, **options)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return os.path.getsize(path)
+
+    def _scan(self):
+        files = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith('.part'):
+                    continue
+                full = os.path.join(directory, name)
+                try:
+                    stat = os.stat(full)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, full))
+        return files
+
+    def _evict(self):
+        """Hapus turunan yang paling lama tidak dipakai sampai total <= max_bytes"""
+        if not self.max_bytes:
+            return
+        with self._lock:
+            if self._total_bytes is not None and self._total_bytes <= self.max_bytes:
+                return
+        files = self._scan()
+        total = sum(size for _, size, _ in files)
+        evicted = 0
+        if total > self.max_bytes:
+            # Turunkan sampai 90% batas supaya scan tidak terjadi di setiap request
+            target = self.max_bytes * 0.9
+            for _, size, full in sorted(files):
+                if total <= target:
+                    break
+                try:
+                    os.remove(full)
+                    total -= size
+                    evicted += 1
+                except OSError:
+                    pass
+        with self._lock:
+            self._total_bytes = total
+            self.evicted += evicted
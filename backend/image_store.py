@@ -0,0 +1,82 @@
+"""
+Content-addressed image store untuk folder uploads
+File disimpan dengan nama sha256 isinya dan dipecah ke subfolder
+(ab/cd/abcd...ef.jpg) supaya upload yang identik cukup disimpan sekali
+dan tidak ada satu folder berisi ratusan ribu file.
+"""
+
+import hashlib
+import io
+import os
+import tempfile
+
+from PIL import Image
+
+# Format PIL -> ekstensi file yang disimpan
+FORMAT_EXTENSIONS = {
+    'JPEG': '.jpg',
+    'PNG': '.png',
+    'WEBP': '.webp',
+    'GIF': '.gif',
+    'BMP': '.bmp',
+    'TIFF': '.tif',
+}
+EXTENSION_ALIASES = {'.jpeg': '.jpg', '.tiff': '.tif'}
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def detect_extension(data, filename=''):
+    """Ekstensi dari header gambar (hanya membaca header), fallback ke ekstensi nama file"""
+    try:
+        fmt = Image.open(io.BytesIO(data)).format
+        if fmt in FORMAT_EXTENSIONS:
+            return FORMAT_EXTENSIONS[fmt]
+    except Exception:
+        pass
+    ext = os.path.splitext(filename or '')[1].lower()
+    return EXTENSION_ALIASES.get(ext, ext)
+
+
+class ImageStore:
+    """Penyimpanan file berdasarkan hash isi di bawah root folder"""
+
+    def __init__(self, root, depth=2, width=2):
+        self.root = root
+        self.depth = depth
+        self.width = width
+        os.makedirs(root, exist_ok=True)
+
+    def relative_path(self, digest, ext=''):
+        """sha256 hex -> 'ab/cd/<digest><ext>' (selalu pakai '/' karena dipakai di URL & DB)"""
+        shards = [digest[i * self.width:(i + 1) * self.width] for i in range(self.depth)]
+        return '/'.join(shards + [f"{digest}{ext}"])
+
+    def path_for(self, relative_path):
+        return os.path.join(self.root, *relative_path.split('/'))
+
+    def exists(self, relative_path):
+        return os.path.exists(self.path_for(relative_path))
+
+    def put(self, data, relative_path):
+        """
+        Tulis bytes ke relative_path jika belum ada. Return True jika file baru ditulis.
+        Ditulis ke file sementara lalu di-rename supaya tidak pernah terbaca setengah jadi.
+        """
+        path = self.path_for(relative_path)
+        if os.path.exists(path):
+            return False
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return True
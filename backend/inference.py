@@ -0,0 +1,212 @@
+"""
+Inference helpers untuk /api/predict
+- Micro-batching: gabungkan tensor dari request yang datang bersamaan
+  menjadi satu forward pass model.
+- Serving function: tf.function dengan input signature tetap, dipanggil
+  langsung tanpa overhead MODEL.predict (data adapter + callbacks).
+- TFLiteRunner: backend alternatif untuk model TFLite (float16 / int8)
+  hasil scripts/convert_tflite.py.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from queue import Queue, Empty, Full
+
+import numpy as np
+
+
+class BatcherSaturated(Exception):
+    """Antrean MicroBatcher penuh; caller sebaiknya membalas 503 + Retry-After"""
+
+
+class MicroBatcher:
+    """
+    Scheduler batching in-process.
+
+    Request memanggil submit(img_array) dengan tensor (H, W, 3) yang sudah
+    dipreprocess. Worker thread mengumpulkan tensor sampai max_batch_size
+    tercapai atau window max_wait_ms habis (dihitung sejak item pertama),
+    menjalankan satu predict_fn(batch), lalu mengembalikan tiap baris hasil
+    ke request yang menunggu.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=16, max_wait_ms=10.0, max_queue_size=256):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_ms = max(0.0, float(max_wait_ms))
+        self.max_queue_size = max(1, int(max_queue_size))
+
+        self._queue = Queue(maxsize=self.max_queue_size)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._stats = {
+            "batches": 0,
+            "items": 0,
+            "max_batch_seen": 0,
+            "errors": 0,
+            "rejected": 0,
+        }
+
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, img_array, timeout=30.0):
+        """Antrekan satu gambar (H, W, 3) dan tunggu baris prediksinya; raise BatcherSaturated jika antrean penuh."""
+        future = Future()
+        try:
+            # Tidak menunggu slot: antrean penuh langsung ditolak supaya latency tidak membengkak
+            self._queue.put_nowait((img_array, future))
+        except Full:
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise BatcherSaturated(f"Antrean inference penuh ({self.max_queue_size})")
+        return future.result(timeout=timeout)
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["avg_batch_size"] = round(stats["items"] / stats["batches"], 2) if stats["batches"] else 0
+        stats.update({
+            "enabled": True,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "max_queue_size": self.max_queue_size,
+            "queue_depth": self.queue_depth(),
+        })
+        return stats
+
+    def stop(self):
+        self._stopped.set()
+
+    def _collect(self):
+        """Ambil item pertama (blocking), lalu isi batch sampai penuh atau window habis."""
+        try:
+            first = self._queue.get(timeout=0.5)
+        except Empty:
+            return []
+
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stopped.is_set():
+            batch = self._collect()
+            if not batch:
+                continue
+
+            futures = [future for _, future in batch]
+            try:
+                inputs = np.stack([img for img, _ in batch]).astype(np.float32, copy=False)
+                outputs = np.asarray(self.predict_fn(inputs))
+                for i, future in enumerate(futures):
+                    future.set_result(outputs[i])
+            except Exception as e:
+                with self._lock:
+                    self._stats["errors"] += 1
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            with self._lock:
+                self._stats["batches"] += 1
+                self._stats["items"] += len(batch)
+                self._stats["max_batch_seen"] = max(self._stats["max_batch_seen"], len(batch))
+
+
+def build_serving_fn(model, image_size, jit_compile=False):
+    """
+    Bungkus model dengan tf.function ber-signature [None, image_size, image_size, 3].
+    Dimensi batch dibiarkan None supaya satu graph dipakai untuk semua ukuran batch.
+    """
+    import tensorflow as tf
+
+    @tf.function(
+        input_signature=[tf.TensorSpec([None, image_size, image_size, 3], tf.float32)],
+        jit_compile=jit_compile
+    )
+    def serving_fn(batch):
+        return model(batch, training=False)
+
+    return serving_fn
+
+
+def measure_latency(fn, batch, runs=10):
+    """Rata-rata latency (ms) per panggilan fn(batch), setelah satu panggilan pemanasan."""
+    fn(batch)
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn(batch)
+    return (time.perf_counter() - start) * 1000.0 / runs
+
+
+class TFLiteRunner:
+    """
+    Inference dengan tf.lite.Interpreter (multi-thread).
+
+    Interpreter tidak thread-safe, jadi setiap panggilan predict() dikunci.
+    Tensor input di-resize hanya kalau ukuran batch berubah. Model dengan
+    input/output terkuantisasi (int8/uint8) di-(de)quantize otomatis.
+    """
+
+    def __init__(self, model_path, num_threads=None):
+        import tensorflow as tf
+
+        self.model_path = model_path
+        self.num_threads = num_threads
+        self.interpreter = tf.lite.Interpreter(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._lock = threading.Lock()
+
+        input_details = self.interpreter.get_input_details()[0]
+        self._input_index = input_details['index']
+        self._input_shape = list(input_details['shape'])
+        self._output_index = self.interpreter.get_output_details()[0]['index']
+        self._batch_size = int(self._input_shape[0])
+
+    @property
+    def input_dtype(self):
+        return self.interpreter.get_input_details()[0]['dtype']
+
+    def _resize(self, batch_size):
+        if batch_size == self._batch_size:
+            return
+        self.interpreter.resize_tensor_input(self._input_index, [batch_size] + self._input_shape[1:])
+        self.interpreter.allocate_tensors()
+        self._batch_size = batch_size
+
+    def predict(self, batch):
+        """Forward pass untuk batch float32 (N, H, W, 3) -> probabilitas float32 (N, num_classes)"""
+        batch = np.asarray(batch, dtype=np.float32)
+        with self._lock:
+            self._resize(batch.shape[0])
+
+            input_details = self.interpreter.get_input_details()[0]
+            if input_details['dtype'] in (np.int8, np.uint8):
+                scale, zero_point = input_details['quantization']
+                info = np.iinfo(input_details['dtype'])
+                batch = np.clip(np.round(batch / scale + zero_point), info.min, info.max)
+                batch = batch.astype(input_details['dtype'])
+
+            self.interpreter.set_tensor(self._input_index, batch)
+            self.interpreter.invoke()
+
+            output_details = self.interpreter.get_output_details()[0]
+            output = self.interpreter.get_tensor(self._output_index)
+            if output_details['dtype'] in (np.int8, np.uint8):
+                scale, zero_point = output_details['quantization']
+                output = (output.astype(np.float32) - zero_point) * scale
+            return np.array(output, dtype=np.float32)
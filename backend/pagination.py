@@ -0,0 +1,66 @@
+"""
+Helper keyset (cursor) pagination untuk endpoint list
+Cursor = base64url dari JSON nilai kolom urutan baris terakhir, mis.
+["2025-01-31T10:00:00", 123] untuk ORDER BY detection_date DESC, id DESC.
+Client cukup mengirim balik next_cursor apa adanya (opaque).
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+
+def encode_cursor(*values):
+    """Nilai kolom urutan (datetime -> ISO string) -> cursor string"""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Cursor string -> list nilai (panjang size); raise ValueError jika tidak valid"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw.decode('utf-8'))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError("Cursor tidak valid")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Cursor tidak valid")
+    return values
+
+
+def parse_datetime(value):
+    """Nilai datetime dari cursor (ISO string) -> datetime; raise ValueError jika tidak valid"""
+    if not isinstance(value, str):
+        raise ValueError("Cursor tidak valid")
+    return datetime.fromisoformat(value)
+
+
+def parse_limit(value, default, maximum):
+    """Query param limit -> int dalam 1..maximum; raise ValueError jika bukan angka"""
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("Parameter limit harus berupa angka")
+    return max(1, min(limit, maximum))
+
+
+def keyset_condition(order, values):
+    """
+    Fragment WHERE "baris setelah cursor" untuk ORDER BY order.
+    order: list (kolom, 'ASC'|'DESC'), values: nilai cursor dengan urutan sama.
+    Contoh [('created_at', 'DESC'), ('feedback_id', 'DESC')] ->
+      ((created_at < %s) OR (created_at = %s AND feedback_id < %s))
+    Return (sql, params)
+    """
+    clauses = []
+    params = []
+    for i, (column, direction) in enumerate(order):
+        op = '<' if direction == 'DESC' else '>'
+        parts = [f"{previous} = %s" for previous, _ in order[:i]] + [f"{column} {op} %s"]
+        clauses.append("(" + " AND ".join(parts) + ")")
+        params += list(values[:i]) + [values[i]]
+    return "(" + " OR ".join(clauses) + ")", params
@@ -0,0 +1,145 @@
+"""
+Preprocessing gambar daun untuk model (dipakai app.py dan scripts/)
+SMART RESIZE (letterbox): gambar diperkecil tanpa distorsi lalu ditaruh di
+tengah kanvas hitam persegi, hasilnya float32 0-255 (tanpa pembagian 255,
+karena model punya preprocess internal).
+
+Optimasi dibanding pipeline lama (Image.new + thumbnail + paste + np.array):
+- JPEG di-decode langsung pada skala kecil lewat Image.draft (DCT scaling),
+  dibatasi minimal 2x ukuran target supaya kualitas resize tetap terjaga.
+- Metode resampling bisa dipilih (lanczos default, bilinear/box lebih murah).
+- Hasil ditulis langsung ke buffer batch yang sudah dialokasikan, tanpa
+  kanvas PIL dan tanpa np.expand_dims / np.stack tambahan.
+
+Toleransi terhadap pipeline lama (cek dengan scripts/check_preprocessing.py):
+- Non-JPEG (PNG, dll) dengan resample 'lanczos': identik (selisih 0).
+- JPEG dengan draft aktif: selisih piksel rata-rata < 0.5 dan maksimum
+  <= 4 (skala 0-255), karena decoder JPEG sudah melakukan sebagian downscale.
+- Resample selain 'lanczos' tidak dijamin dalam toleransi di atas.
+
+PreprocessPool: thread pool terbatas untuk decode/letterbox (PIL melepas GIL),
+dengan batas antrean supaya request ditolak (503) saat penuh, bukan menunggu
+tanpa batas.
+"""
+
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+RESAMPLE_METHODS = {
+    'lanczos': Image.Resampling.LANCZOS,
+    'bicubic': Image.Resampling.BICUBIC,
+    'bilinear': Image.Resampling.BILINEAR,
+    'box': Image.Resampling.BOX,
+    'nearest': Image.Resampling.NEAREST,
+}
+
+# JPEG di-decode minimal pada DRAFT_GAP x ukuran target (sama dengan reducing_gap default PIL)
+DRAFT_GAP = 2
+
+
+def get_resample(name):
+    """Nama resample (config) -> konstanta PIL"""
+    try:
+        return RESAMPLE_METHODS[(name or 'lanczos').lower()]
+    except KeyError:
+        raise ValueError(f"Resample tidak dikenal: {name}. Pilihan: {', '.join(RESAMPLE_METHODS)}")
+
+
+def load_image(source, size, draft=True):
+    """
+    Buka gambar dari path, bytes, atau file-like dan convert ke RGB.
+    Untuk JPEG, draft membuat decoder langsung menghasilkan gambar yang lebih kecil.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    img = Image.open(source)
+    if draft and img.format == 'JPEG':
+        img.draft('RGB', (size * DRAFT_GAP, size * DRAFT_GAP))
+    return img.convert('RGB')
+
+
+def allocate_batch(batch_size, size):
+    """Buffer batch float32 (N, size, size, 3) untuk diisi letterbox(..., out=buffer[i])"""
+    return np.zeros((batch_size, size, size, 3), dtype=np.float32)
+
+
+def letterbox(source, size, resample='lanczos', draft=True, out=None):
+    """
+    Letterbox gambar ke (size, size, 3) float32.
+    Jika out diberikan (mis. satu baris dari allocate_batch), hasil ditulis ke sana.
+    """
+    img = load_image(source, size, draft=draft)
+    img.thumbnail((size, size), get_resample(resample))
+
+    if out is None:
+        out = np.zeros((size, size, 3), dtype=np.float32)
+    else:
+        out.fill(0)
+
+    # Tempel di tengah (posisi sama dengan paste pada kanvas hitam)
+    width, height = img.size
+    left = (size - width) // 2
+    top = (size - height) // 2
+    out[top:top + height, left:left + width] = np.asarray(img, dtype=np.uint8)
+    return out
+
+
+class PoolSaturated(Exception):
+    """Antrean PreprocessPool penuh; caller sebaiknya membalas 503 + Retry-After"""
+
+
+class PreprocessPool:
+    """
+    ThreadPoolExecutor dengan batas jumlah task yang antre/berjalan (max_pending).
+    submit_many mereservasi semua slot sekaligus (all-or-nothing) untuk request batch.
+    """
+
+    def __init__(self, max_workers, max_pending):
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = max(self.max_workers, int(max_pending))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='preprocess')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _reserve(self, count):
+        with self._lock:
+            if self._pending + count > self.max_pending:
+                self.rejected += 1
+                raise PoolSaturated(f"Antrean preprocessing penuh ({self._pending}/{self.max_pending})")
+            self._pending += count
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+
+    def _submit_reserved(self, fn, *args):
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    def submit(self, fn, *args):
+        """Submit satu task, raise PoolSaturated jika antrean penuh"""
+        self._reserve(1)
+        return self._submit_reserved(fn, *args)
+
+    def submit_many(self, fn, args_list):
+        """Submit banyak task sekaligus; semuanya diterima atau PoolSaturated"""
+        self._reserve(len(args_list))
+        return [self._submit_reserved(fn, *args) for args in args_list]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "completed": self.completed,
+                "rejected": self.rejected
+            }
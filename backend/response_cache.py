@@ -0,0 +1,121 @@
+"""
+Cache response JSON untuk endpoint publik (GET /api/news, /api/news/<id>, /api/feedback/public)
+Body response (bytes) disimpan per (namespace, key parameter ter-normalisasi) di
+LRU+TTL in-process (cache.TTLCache). Invalidasi per namespace memakai nomor
+generasi: invalidate() menaikkan generasi sehingga entry lama tidak pernah
+terbaca lagi (dan habis sendiri lewat LRU/TTL).
+
+Opsional shared_dir (mis. /dev/shm/plantvision-cache) untuk deployment
+multi-worker di satu host: generasi disimpan sebagai file kecil sehingga
+invalidasi dari satu worker langsung berlaku di worker lain, dan body ikut
+ditulis ke disk supaya worker lain tidak perlu query ulang.
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from cache import TTLCache
+
+
+class ResponseCache:
+    """
+    generation = cache.generation(ns)       # ambil SEBELUM query database
+    body = cache.get(ns, key, generation)
+    ...
+    cache.set(ns, key, body, generation)    # hasil query disimpan di generasi saat query dimulai
+    Jika ada write di antara keduanya, generasi sudah naik dan body lama tidak akan terbaca.
+    """
+
+    def __init__(self, maxsize=512, ttl_seconds=60, shared_dir=None):
+        self.ttl_seconds = float(ttl_seconds)
+        self.shared_dir = shared_dir or None
+        self._local = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.shared_hits = 0
+        self.invalidations = 0
+        if self.shared_dir:
+            os.makedirs(self.shared_dir, exist_ok=True)
+
+    # --- Generasi ---
+    def _generation_path(self, namespace):
+        return os.path.join(self.shared_dir, f"{namespace}.gen")
+
+    def generation(self, namespace):
+        if not self.shared_dir:
+            with self._lock:
+                return str(self._generations.get(namespace, 0))
+        try:
+            with open(self._generation_path(namespace), encoding='ascii') as f:
+                return f.read().strip() or '0'
+        except OSError:
+            return '0'
+
+    def invalidate(self, *namespaces):
+        """Naikkan generasi namespace; entry lama (lokal & shared) tidak terpakai lagi"""
+        for namespace in namespaces:
+            if not self.shared_dir:
+                with self._lock:
+                    self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            else:
+                token = uuid.uuid4().hex
+                path = self._generation_path(namespace)
+                tmp = f"{path}.{token}.tmp"
+                with open(tmp, 'w', encoding='ascii') as f:
+                    f.write(token)
+                os.replace(tmp, path)
+                # Body generasi lama di disk dihapus; generasi baru belum punya file
+                shutil.rmtree(os.path.join(self.shared_dir, namespace), ignore_errors=True)
+            with self._lock:
+                self.invalidations += 1
+
+    # --- Body ---
+    def _body_path(self, namespace, key, generation):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.shared_dir, namespace, generation, f"{digest}.json")
+
+    def get(self, namespace, key, generation):
+        body = self._local.get((namespace, generation, key))
+        if body is not None or not self.shared_dir:
+            return body
+        path = self._body_path(namespace, key, generation)
+        try:
+            if self.ttl_seconds > 0 and time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                return None
+            with open(path, 'rb') as f:
+                body = f.read()
+        except OSError:
+            return None
+        self._local.set((namespace, generation, key), body)
+        with self._lock:
+            self.shared_hits += 1
+        return body
+
+    def set(self, namespace, key, body, generation):
+        self._local.set((namespace, generation, key), body)
+        if not self.shared_dir:
+            return
+        path = self._body_path(namespace, key, generation)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(body)
+            os.replace(tmp, path)
+        except OSError as e:
+            # Direktori dihapus invalidate() di tengah jalan / disk penuh: cukup cache lokal
+            print(f"[ResponseCache] Gagal menulis shared cache: {e}")
+
+    def stats(self):
+        stats = self._local.stats()
+        with self._lock:
+            stats.update({
+                "shared_dir": self.shared_dir,
+                "shared_hits": self.shared_hits,
+                "invalidations": self.invalidations,
+            })
+        return stats
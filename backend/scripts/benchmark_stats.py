@@ -0,0 +1,185 @@
+"""
+Benchmark query statistik dashboard admin: versi lama (beberapa COUNT/GROUP BY
+terpisah) vs satu query agregasi (stats.py), pada tabel seed.
+
+Tabel bench_Feedback / bench_News / bench_User dibuat dengan CREATE TABLE ... LIKE,
+diisi data acak, lalu dihapus lagi setelah benchmark (kecuali --keep).
+Hasil kedua versi juga dibandingkan supaya angka di dashboard tidak berubah.
+
+Usage:
+  python benchmark_stats.py
+  python benchmark_stats.py --rows 200000 --runs 20 --keep
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+import mysql.connector
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from stats import (  # noqa: E402
+    FEEDBACK_STATS_SQL, NEWS_STATS_SQL, USERS_STATS_SQL,
+    summarize_feedback, summarize_news, summarize_users
+)
+
+DB_HOST = os.getenv('DB_HOST', 'localhost')
+DB_USER = os.getenv('DB_USER', 'root')
+DB_PASSWORD = os.getenv('DB_PASSWORD', 'D@ffa_2005')
+DB_NAME = os.getenv('DB_NAME', 'plantvision_db')
+DB_PORT = int(os.getenv('DB_PORT', '3306'))
+
+# Query lama per endpoint (sebelum stats.py)
+LEGACY_QUERIES = {
+    'Feedback': [
+        "SELECT COUNT(*) as total FROM {table}",
+        "SELECT COUNT(*) as pending FROM {table} WHERE status = 'pending'",
+        "SELECT status, COUNT(*) as count FROM {table} GROUP BY status",
+        "SELECT category, COUNT(*) as count FROM {table} GROUP BY category",
+        "SELECT rating, COUNT(*) as count FROM {table} GROUP BY rating ORDER BY rating",
+        "SELECT AVG(rating) as avg_rating FROM {table}",
+    ],
+    'News': [
+        "SELECT COUNT(*) as total FROM {table}",
+        "SELECT COUNT(*) as published FROM {table} WHERE is_published = 1",
+        "SELECT COUNT(*) as draft FROM {table} WHERE is_published = 0",
+        "SELECT category, COUNT(*) as count FROM {table} GROUP BY category",
+    ],
+    'User': [
+        "SELECT COUNT(*) as total FROM {table}",
+        "SELECT COUNT(*) as active FROM {table} WHERE status_akun = 'aktif'",
+        "SELECT role, COUNT(*) as count FROM {table} GROUP BY role",
+    ],
+}
+
+SINGLE_QUERY = {
+    'Feedback': (FEEDBACK_STATS_SQL, summarize_feedback),
+    'News': (NEWS_STATS_SQL, summarize_news),
+    'User': (USERS_STATS_SQL, summarize_users),
+}
+
+
+def seed_rows(entity, count, rng):
+    """Return (kolom, list of tuple) data acak untuk entity"""
+    if entity == 'Feedback':
+        columns = ('nama', 'email', 'rating', 'category', 'message', 'user_role', 'status', 'priority')
+        rows = [(
+            f"user{i}", f"user{i}@bench.test", rng.randint(1, 5),
+            rng.choice(['umum', 'fitur', 'bug', 'desain', 'saran']), "pesan benchmark",
+            rng.choice(['guest', 'user']), rng.choice(['pending', 'in_review', 'resolved', 'rejected']),
+            rng.choice(['low', 'medium', 'high', 'critical'])
+        ) for i in range(count)]
+    elif entity == 'News':
+        columns = ('title', 'category', 'is_published')
+        rows = [(
+            f"Berita {i}", rng.choice(['teknologi', 'budidaya', 'pasar', 'penelitian']), rng.choice([0, 1, 1, 1])
+        ) for i in range(count)]
+    else:
+        columns = ('nama', 'email', 'username', 'password', 'role', 'status_akun')
+        rows = [(
+            f"User {i}", f"bench{i}@bench.test", f"bench{i}", "x",
+            rng.choice(['user', 'user', 'user', 'admin', 'superadmin']), rng.choice(['aktif', 'aktif', 'nonaktif'])
+        ) for i in range(count)]
+    return columns, rows
+
+
+def legacy_summary(entity, results):
+    """Susun payload endpoint lama dari hasil LEGACY_QUERIES (untuk cek kesamaan)"""
+    if entity == 'Feedback':
+        total, pending, by_status, by_category, by_rating, avg = results
+        return {
+            "total": total[0]['total'],
+            "pending": pending[0]['pending'],
+            "by_status": {r['status']: r['count'] for r in by_status},
+            "by_category": {r['category']: r['count'] for r in by_category},
+            "by_rating": {r['rating']: r['count'] for r in by_rating},
+            "average_rating": round(float(avg[0]['avg_rating'] or 0), 2),
+        }
+    if entity == 'News':
+        total, published, draft, by_category = results
+        return {
+            "total": total[0]['total'],
+            "published": published[0]['published'],
+            "draft": draft[0]['draft'],
+            "by_category": {r['category']: r['count'] for r in by_category},
+        }
+    total, active, by_role = results
+    return {
+        "total": total[0]['total'],
+        "active": active[0]['active'],
+        "by_role": {r['role']: r['count'] for r in by_role},
+    }
+
+
+def timed(fn, runs):
+    samples = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark query statistik dashboard (lama vs satu query)")
+    parser.add_argument('--rows', type=int, default=100000, help="Jumlah baris seed per tabel")
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--keep', action='store_true', help="Jangan hapus tabel bench_* setelah selesai")
+    args = parser.parse_args()
+
+    print(f"[benchmark_stats] Using DB='{DB_NAME}' on {DB_HOST}:{DB_PORT} as {DB_USER}")
+    conn = mysql.connector.connect(
+        host=DB_HOST,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        database=DB_NAME,
+        port=DB_PORT,
+    )
+    cursor = conn.cursor(dictionary=True)
+    rng = random.Random(42)
+
+    def run(sql, table):
+        cursor.execute(sql.format(table=table))
+        return cursor.fetchall()
+
+    print("=" * 72)
+    print(f"{'tabel':10s} {'lama':>22s} {'satu query':>22s} {'speedup':>8s}  sama?")
+    print("=" * 72)
+    try:
+        for entity in ('Feedback', 'News', 'User'):
+            table = f"bench_{entity}"
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            cursor.execute(f"CREATE TABLE {table} LIKE {entity}")
+            columns, rows = seed_rows(entity, args.rows, rng)
+            sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+            for start in range(0, len(rows), 5000):
+                cursor.executemany(sql, rows[start:start + 5000])
+            conn.commit()
+            cursor.execute(f"ANALYZE TABLE {table}")
+            cursor.fetchall()
+
+            legacy = LEGACY_QUERIES[entity]
+            single_sql, summarize = SINGLE_QUERY[entity]
+            legacy_ms, legacy_results = timed(lambda: [run(q, table) for q in legacy], args.runs)
+            single_ms, single_rows = timed(lambda: run(single_sql, table), args.runs)
+
+            same = legacy_summary(entity, legacy_results) == summarize(single_rows)
+            print(f"{entity:10s} {legacy_ms:9.2f} ms ({len(legacy)} query) {single_ms:9.2f} ms ( 1 query) "
+                  f"{legacy_ms / single_ms if single_ms else 0:7.1f}x  {'ya' if same else 'TIDAK'}")
+    finally:
+        if not args.keep:
+            for entity in ('Feedback', 'News', 'User'):
+                cursor.execute(f"DROP TABLE IF EXISTS bench_{entity}")
+        cursor.close()
+        conn.close()
+    print("=" * 72)
+    print(f"{args.rows} baris per tabel, median dari {args.runs} run")
+
+
+if __name__ == "__main__":
+    main()
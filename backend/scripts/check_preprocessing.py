@@ -0,0 +1,93 @@
+"""
+Bandingkan preprocessing.letterbox dengan pipeline smart resize lama
+(Image.new + thumbnail LANCZOS + paste + np.array) secara numerik dan waktu.
+
+Gambar dataset berukuran 256x256, jadi untuk meniru foto HP setiap gambar
+juga diperbesar (default 4x) dan di-encode ulang sebagai JPEG.
+
+Usage:
+  python check_preprocessing.py
+  python check_preprocessing.py --split val --limit 100 --scale 6 --resample bilinear
+"""
+import argparse
+import glob
+import io
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(BACKEND_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from preprocessing import letterbox  # noqa: E402
+
+IMAGE_SIZE = 256
+DATASET_DIR = os.path.join(ROOT_DIR, 'data', 'plantvision_dataset')
+
+
+def legacy_letterbox(data, size):
+    """Pipeline lama dari predict_disease (referensi)"""
+    img = Image.open(io.BytesIO(data)).convert('RGB')
+    target_size = (size, size)
+    new_img = Image.new("RGB", target_size, (0, 0, 0))
+    img.thumbnail(target_size, Image.Resampling.LANCZOS)
+    left = (target_size[0] - img.size[0]) // 2
+    top = (target_size[1] - img.size[1]) // 2
+    new_img.paste(img, (left, top))
+    return np.array(new_img).astype(np.float32)
+
+
+def build_samples(split, limit, scale):
+    """Return dict {jenis: [bytes]} berisi PNG asli dan JPEG yang diperbesar"""
+    paths = sorted(glob.glob(os.path.join(DATASET_DIR, split, '*', '*.png')))[:limit]
+    samples = {'png': [], 'jpeg_upscaled': []}
+    for path in paths:
+        with open(path, 'rb') as f:
+            samples['png'].append(f.read())
+        img = Image.open(path).convert('RGB')
+        # Sedikit non-persegi supaya letterbox benar-benar menambah border
+        img = img.resize((img.width * scale, int(img.height * scale * 0.75)), Image.Resampling.BICUBIC)
+        buf = io.BytesIO()
+        img.save(buf, 'JPEG', quality=90)
+        samples['jpeg_upscaled'].append(buf.getvalue())
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cek toleransi preprocessing baru vs lama")
+    parser.add_argument('--split', default='test')
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--scale', type=int, default=4)
+    parser.add_argument('--resample', default='lanczos')
+    parser.add_argument('--no-draft', action='store_true')
+    args = parser.parse_args()
+
+    samples = build_samples(args.split, args.limit, args.scale)
+    print("=" * 72)
+    print(f"resample={args.resample}, draft={not args.no_draft}, size={IMAGE_SIZE}")
+    print("=" * 72)
+
+    for kind, items in samples.items():
+        if not items:
+            print(f"⚠️  Tidak ada sampel {kind}")
+            continue
+
+        start = time.perf_counter()
+        legacy = [legacy_letterbox(data, IMAGE_SIZE) for data in items]
+        legacy_ms = (time.perf_counter() - start) * 1000 / len(items)
+
+        start = time.perf_counter()
+        new = [letterbox(data, IMAGE_SIZE, resample=args.resample, draft=not args.no_draft) for data in items]
+        new_ms = (time.perf_counter() - start) * 1000 / len(items)
+
+        diffs = np.stack([np.abs(a - b) for a, b in zip(legacy, new)])
+        print(f"{kind:15s}: mean diff {diffs.mean():6.3f}, max diff {diffs.max():5.1f} | "
+              f"lama {legacy_ms:6.2f} ms, baru {new_ms:6.2f} ms per gambar ({len(items)} gambar)")
+
+
+if __name__ == "__main__":
+    main()
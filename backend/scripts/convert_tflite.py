@@ -0,0 +1,148 @@
+"""
+Konversi model Keras H5 ke TFLite (float16 dan int8 post-training quantization)
+lalu bandingkan akurasinya dengan model Keras pada test set.
+
+Usage:
+  python convert_tflite.py
+  python convert_tflite.py --num-calibration 300 --skip-eval
+
+Output (default di folder models/):
+  citrus_cnn_v1_float16.tflite
+  citrus_cnn_v1_int8.tflite
+
+Jalankan backend dengan INFERENCE_BACKEND=tflite (dan TFLITE_MODEL_PATH jika
+ingin memakai varian float16) setelah akurasinya dicek.
+"""
+import argparse
+import glob
+import os
+import random
+import sys
+
+import numpy as np
+import tensorflow as tf
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(BACKEND_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from inference import TFLiteRunner  # noqa: E402
+from preprocessing import letterbox, allocate_batch  # noqa: E402
+
+# Class names (HARUS SAMA dengan urutan saat training & app.py!)
+CLASS_NAMES = ['Black spot', 'Canker', 'Greening', 'Healthy', 'Melanose']
+IMAGE_SIZE = 256
+
+MODEL_PATH = os.path.join(ROOT_DIR, 'models', 'citrus_cnn_v1.h5')
+DATASET_DIR = os.path.join(ROOT_DIR, 'data', 'plantvision_dataset')
+
+
+def preprocess(image_path, out=None):
+    """Smart resize (letterbox) yang sama dengan predict_disease di app.py"""
+    return letterbox(image_path, IMAGE_SIZE, out=out)
+
+
+def list_images(split):
+    """List (path, label_index) untuk satu split dataset"""
+    items = []
+    for label, class_name in enumerate(CLASS_NAMES):
+        class_dir = os.path.join(DATASET_DIR, split, class_name)
+        for ext in ('*.png', '*.jpg', '*.jpeg'):
+            for path in glob.glob(os.path.join(class_dir, ext)):
+                items.append((path, label))
+    return items
+
+
+def representative_dataset(num_samples):
+    """Sampel dari train set untuk kalibrasi kuantisasi int8"""
+    items = list_images('train')
+    random.Random(42).shuffle(items)
+    def generator():
+        for path, _ in items[:num_samples]:
+            yield [np.expand_dims(preprocess(path), axis=0)]
+    return generator
+
+
+def convert(model, output_dir, num_calibration):
+    """Tulis varian float16 dan int8, return dict {nama: path}"""
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = {}
+
+    # Float16: bobot disimpan float16, komputasi tetap float
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.target_spec.supported_types = [tf.float16]
+    path = os.path.join(output_dir, 'citrus_cnn_v1_float16.tflite')
+    with open(path, 'wb') as f:
+        f.write(converter.convert())
+    outputs['float16'] = path
+    print(f"✅ float16 -> {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+    # Int8: full integer ops, input/output tetap float32 supaya preprocessing tidak berubah
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset(num_calibration)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    path = os.path.join(output_dir, 'citrus_cnn_v1_int8.tflite')
+    with open(path, 'wb') as f:
+        f.write(converter.convert())
+    outputs['int8'] = path
+    print(f"✅ int8    -> {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+    return outputs
+
+
+def evaluate(model, tflite_paths, batch_size=32):
+    """Akurasi Keras vs tiap model TFLite pada test set"""
+    items = list_images('test')
+    if not items:
+        print(f"⚠️  Test set kosong: {os.path.join(DATASET_DIR, 'test')}")
+        return
+
+    labels = np.array([label for _, label in items])
+    runners = {name: TFLiteRunner(path, num_threads=os.cpu_count()) for name, path in tflite_paths.items()}
+    preds = {'keras': []}
+    preds.update({name: [] for name in runners})
+
+    for start in range(0, len(items), batch_size):
+        chunk = items[start:start + batch_size]
+        batch = allocate_batch(len(chunk), IMAGE_SIZE)
+        for i, (path, _) in enumerate(chunk):
+            preprocess(path, out=batch[i])
+        preds['keras'].append(np.argmax(model.predict(batch, verbose=0), axis=1))
+        for name, runner in runners.items():
+            preds[name].append(np.argmax(runner.predict(batch), axis=1))
+
+    preds = {name: np.concatenate(p) for name, p in preds.items()}
+    keras_acc = float(np.mean(preds['keras'] == labels))
+
+    print("\n" + "=" * 60)
+    print(f"AKURASI TEST SET ({len(items)} images)")
+    print("=" * 60)
+    print(f"{'keras':10s}: {keras_acc * 100:6.2f}%")
+    for name in runners:
+        acc = float(np.mean(preds[name] == labels))
+        agreement = float(np.mean(preds[name] == preds['keras']))
+        print(f"{name:10s}: {acc * 100:6.2f}%  (delta {(acc - keras_acc) * 100:+.2f} pt, "
+              f"sama dengan keras {agreement * 100:.1f}%)")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert citrus_cnn_v1.h5 ke TFLite float16/int8")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--output-dir', default=os.path.join(ROOT_DIR, 'models'))
+    parser.add_argument('--num-calibration', type=int, default=200)
+    parser.add_argument('--skip-eval', action='store_true')
+    args = parser.parse_args()
+
+    print(f"Loading model from: {args.model}")
+    model = tf.keras.models.load_model(args.model)
+
+    outputs = convert(model, args.output_dir, args.num_calibration)
+    if not args.skip_eval:
+        evaluate(model, outputs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Migrasi DetectionHistory ke katalog DiseaseInfo (lihat disease_catalog.py):
+1. Buat tabel DiseaseInfo dan kolom DetectionHistory.disease_info_id (jika belum ada)
+2. Daftarkan versi DISEASE_INFO saat ini
+3. Baris lama: teks description/symptoms/treatment/prevention dipetakan ke versi
+   DiseaseInfo yang isinya sama (versi lama dibuat jika teksnya sudah berubah),
+   disease_info_id diisi dan kolom teks di-NULL-kan
+Diproses per batch berdasarkan id, aman dijalankan ulang.
+
+Usage:
+  python migrate_disease_info.py --dry-run
+  python migrate_disease_info.py
+  python migrate_disease_info.py --optimize   # OPTIMIZE TABLE setelahnya untuk reclaim ruang disk
+"""
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+
+import mysql.connector
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from disease_info import DISEASE_INFO, get_disease_info  # noqa: E402
+from disease_catalog import content_version, upsert_disease_info  # noqa: E402
+
+DB_HOST = os.getenv('DB_HOST', 'localhost')
+DB_USER = os.getenv('DB_USER', 'root')
+DB_PASSWORD = os.getenv('DB_PASSWORD', 'D@ffa_2005')
+DB_NAME = os.getenv('DB_NAME', 'plantvision_db')
+DB_PORT = int(os.getenv('DB_PORT', '3306'))
+
+SQL_CREATE_DISEASE_INFO = """
+    CREATE TABLE IF NOT EXISTS DiseaseInfo (
+        info_id INT AUTO_INCREMENT PRIMARY KEY,
+        class_name VARCHAR(100) NOT NULL,
+        content_version CHAR(16) NOT NULL,
+        disease VARCHAR(150),
+        severity VARCHAR(20),
+        description TEXT,
+        symptoms TEXT,
+        treatment TEXT,
+        prevention TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE KEY uq_class_version (class_name, content_version)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+
+def column_exists(cursor, table, column):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    """, (table, column))
+    return cursor.fetchone()[0] > 0
+
+
+def row_info(disease_name, description, symptoms, treatment, prevention):
+    """Rekonstruksi info dari kolom teks lama; judul & severity dari katalog saat ini"""
+    current = get_disease_info(disease_name)
+    if description is None and symptoms is None and treatment is None and prevention is None:
+        return current
+    return {
+        "disease": current.get('disease'),
+        "severity": current.get('severity'),
+        "description": description,
+        "symptoms": json.loads(symptoms) if symptoms else [],
+        "treatment": json.loads(treatment) if treatment else [],
+        "prevention": json.loads(prevention) if prevention else [],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrasi DetectionHistory ke katalog DiseaseInfo")
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--dry-run', action='store_true', help="Hitung versi & baris tanpa mengubah data")
+    parser.add_argument('--optimize', action='store_true', help="OPTIMIZE TABLE DetectionHistory setelah migrasi")
+    args = parser.parse_args()
+
+    print(f"[migrate_disease_info] Using DB='{DB_NAME}' on {DB_HOST}:{DB_PORT} as {DB_USER}")
+    conn = mysql.connector.connect(
+        host=DB_HOST,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        database=DB_NAME,
+        port=DB_PORT,
+    )
+    cursor = conn.cursor()
+
+    try:
+        # 1. Schema
+        if not args.dry_run:
+            cursor.execute(SQL_CREATE_DISEASE_INFO)
+            if not column_exists(cursor, 'DetectionHistory', 'disease_info_id'):
+                cursor.execute("""
+                    ALTER TABLE DetectionHistory
+                    ADD COLUMN disease_info_id INT NULL AFTER severity,
+                    ADD CONSTRAINT fk_history_disease_info
+                        FOREIGN KEY (disease_info_id) REFERENCES DiseaseInfo(info_id)
+                """)
+                print("✅ Added DetectionHistory.disease_info_id")
+            for name, info in DISEASE_INFO.items():
+                upsert_disease_info(cursor, name, info)
+            conn.commit()
+            print(f"✅ {len(DISEASE_INFO)} versi DiseaseInfo saat ini terdaftar")
+
+        has_column = not args.dry_run or column_exists(cursor, 'DetectionHistory', 'disease_info_id')
+        pending_filter = "disease_info_id IS NULL" if has_column else "1 = 1"
+
+        # 2. Backfill per batch (keyset by id)
+        version_ids = {}
+        versions_seen = set()
+        migrated = 0
+        last_id = 0
+        while True:
+            cursor.execute(f"""
+                SELECT id, disease_name, description, symptoms, treatment, prevention
+                FROM DetectionHistory
+                WHERE {pending_filter} AND id > %s
+                ORDER BY id
+                LIMIT %s
+            """, (last_id, args.batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            groups = defaultdict(list)
+            for row_id, disease_name, *texts in rows:
+                info = row_info(disease_name, *texts)
+                key = (disease_name, content_version(info))
+                versions_seen.add(key)
+                if args.dry_run:
+                    continue
+                if key not in version_ids:
+                    version_ids[key] = upsert_disease_info(cursor, disease_name, info)
+                groups[version_ids[key]].append(row_id)
+
+            for info_id, ids in groups.items():
+                placeholders = ', '.join(['%s'] * len(ids))
+                cursor.execute(f"""
+                    UPDATE DetectionHistory
+                    SET disease_info_id = %s, description = NULL, symptoms = NULL,
+                        treatment = NULL, prevention = NULL
+                    WHERE id IN ({placeholders})
+                """, [info_id] + ids)
+            if not args.dry_run:
+                conn.commit()
+            migrated += len(rows)
+            print(f"  ... {migrated} baris (id <= {last_id})")
+
+        label = "akan dimigrasi" if args.dry_run else "dimigrasi"
+        print(f"✅ {migrated} baris {label}, {len(versions_seen)} versi DiseaseInfo dipakai")
+
+        if args.optimize and not args.dry_run:
+            cursor.execute("OPTIMIZE TABLE DetectionHistory")
+            cursor.fetchall()
+            print("✅ OPTIMIZE TABLE DetectionHistory selesai")
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Migrasi gagal: {e}")
+        sys.exit(1)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
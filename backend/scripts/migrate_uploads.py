@@ -0,0 +1,117 @@
+"""
+Migrasi folder uploads lama (flat: {timestamp}_{filename}) ke content-addressed
+image store (ab/cd/<sha256>.<ext>) dan update referensinya di database
+(DetectionHistory.image_path dan DaunJeruk.citra).
+
+Urutan aman: file disalin ke store -> database di-update & commit -> file lama dihapus.
+Jika update database gagal, file lama tetap ada dan script bisa dijalankan ulang.
+
+Usage:
+  python migrate_uploads.py --dry-run
+  python migrate_uploads.py
+"""
+import argparse
+import os
+import sys
+
+import mysql.connector
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from image_store import ImageStore, content_hash, detect_extension  # noqa: E402
+
+UPLOAD_FOLDER = os.path.join(BACKEND_DIR, 'uploads')
+
+DB_HOST = os.getenv('DB_HOST', 'localhost')
+DB_USER = os.getenv('DB_USER', 'root')
+DB_PASSWORD = os.getenv('DB_PASSWORD', 'D@ffa_2005')
+DB_NAME = os.getenv('DB_NAME', 'plantvision_db')
+DB_PORT = int(os.getenv('DB_PORT', '3306'))
+
+
+def read_file(name):
+    with open(os.path.join(UPLOAD_FOLDER, name), 'rb') as f:
+        return f.read()
+
+
+def plan_migration(store):
+    """Return list of (old_name, new_relative_path, size) untuk semua file flat di uploads/"""
+    plan = []
+    for name in sorted(os.listdir(UPLOAD_FOLDER)):
+        path = os.path.join(UPLOAD_FOLDER, name)
+        if not os.path.isfile(path) or name.endswith('.part'):
+            continue
+        data = read_file(name)
+        new_path = store.relative_path(content_hash(data), detect_extension(data, name))
+        plan.append((name, new_path, len(data)))
+    return plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrasi uploads/ ke content-addressed store")
+    parser.add_argument('--dry-run', action='store_true', help="Tampilkan rencana tanpa mengubah apa pun")
+    args = parser.parse_args()
+
+    store = ImageStore(UPLOAD_FOLDER)
+    plan = plan_migration(store)
+    unique_targets = {new_path for _, new_path, _ in plan}
+    total_bytes = sum(size for _, _, size in plan)
+    print(f"[migrate_uploads] {len(plan)} file flat -> {len(unique_targets)} file unik "
+          f"({total_bytes / 1e6:.1f} MB sebelum dedup)")
+
+    if args.dry_run:
+        for old_name, new_path, _ in plan[:20]:
+            print(f"  {old_name} -> {new_path}")
+        if len(plan) > 20:
+            print(f"  ... dan {len(plan) - 20} file lainnya")
+        return
+
+    # 1. Salin ke store (upload identik hanya ditulis sekali)
+    written = 0
+    for old_name, new_path, _ in plan:
+        if not store.exists(new_path) and store.put(read_file(old_name), new_path):
+            written += 1
+    print(f"✅ {written} file baru ditulis ke store")
+
+    # 2. Update referensi di database
+    print(f"[migrate_uploads] Using DB='{DB_NAME}' on {DB_HOST}:{DB_PORT} as {DB_USER}")
+    conn = mysql.connector.connect(
+        host=DB_HOST,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        database=DB_NAME,
+        port=DB_PORT,
+    )
+    cursor = conn.cursor()
+    mapping = [(new_path, old_name) for old_name, new_path, _ in plan]
+    history_rows = 0
+    daun_rows = 0
+    try:
+        for new_path, old_name in mapping:
+            cursor.execute("UPDATE DetectionHistory SET image_path = %s WHERE image_path = %s", (new_path, old_name))
+            history_rows += cursor.rowcount
+            try:
+                cursor.execute("UPDATE DaunJeruk SET citra = %s WHERE citra = %s", (new_path, old_name))
+                daun_rows += cursor.rowcount
+            except mysql.connector.Error as e:
+                if e.errno != 1146:  # Tabel DaunJeruk tidak ada -> lewati
+                    raise
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Update database gagal, file lama tidak dihapus: {e}")
+        sys.exit(1)
+    finally:
+        cursor.close()
+        conn.close()
+    print(f"✅ DetectionHistory: {history_rows} baris, DaunJeruk: {daun_rows} baris diupdate")
+
+    # 3. Hapus file flat lama
+    for old_name, _, _ in plan:
+        os.remove(os.path.join(UPLOAD_FOLDER, old_name))
+    print(f"✅ {len(plan)} file lama dihapus")
+
+
+if __name__ == "__main__":
+    main()
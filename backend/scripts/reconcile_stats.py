@@ -0,0 +1,107 @@
+"""
+Bangun ulang tabel StatsCounters dari tabel sumber (lihat stats_counters.py).
+Dipakai untuk isi awal setelah db/create_stats_counters.sql, dan berkala
+(mis. cron harian) untuk mengoreksi drift, misalnya dari perubahan data
+manual di luar aplikasi. Tiap entity direbuild dalam satu transaksi dan
+ditandai 'rebuilt'; sebelum itu endpoint stats meng-agregasi tabel sumber.
+
+Usage:
+  python reconcile_stats.py
+  python reconcile_stats.py --entity feedback --entity news
+  python reconcile_stats.py --check     # bandingkan saja, tanpa menulis
+"""
+import argparse
+import os
+import sys
+
+import mysql.connector
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from stats_counters import ENTITIES, read_rebuilt_all_time, rebuild, encode_dimension  # noqa: E402
+
+DB_HOST = os.getenv('DB_HOST', 'localhost')
+DB_USER = os.getenv('DB_USER', 'root')
+DB_PASSWORD = os.getenv('DB_PASSWORD', 'D@ffa_2005')
+DB_NAME = os.getenv('DB_NAME', 'plantvision_db')
+DB_PORT = int(os.getenv('DB_PORT', '3306'))
+
+
+def source_totals(cursor, entity):
+    """dimension -> count langsung dari tabel sumber"""
+    table, _, columns = ENTITIES[entity]
+    names = ', '.join(name for name, _ in columns)
+    cursor.execute(f"SELECT {names}, COUNT(*) AS count FROM {table} GROUP BY {names}")
+    totals = {}
+    for row in cursor.fetchall():
+        row_data: dict = row  # type: ignore
+        dimension = encode_dimension(entity, row_data)
+        totals[dimension] = totals.get(dimension, 0) + int(row_data['count'])
+    return totals
+
+
+def counter_totals(cursor, entity):
+    """dimension -> count dari StatsCounters (bucket 'all'), atau None jika belum pernah di-rebuild"""
+    rows = read_rebuilt_all_time(cursor, entity)
+    if rows is None:
+        return None
+    return {encode_dimension(entity, row): row['count'] for row in rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild StatsCounters dari tabel sumber")
+    parser.add_argument('--entity', action='append', choices=sorted(ENTITIES),
+                        help="Entity yang direbuild (boleh diulang, default semua)")
+    parser.add_argument('--check', action='store_true', help="Hanya laporkan selisih counter vs tabel sumber")
+    args = parser.parse_args()
+
+    print(f"[reconcile_stats] Using DB='{DB_NAME}' on {DB_HOST}:{DB_PORT} as {DB_USER}")
+    conn = mysql.connector.connect(
+        host=DB_HOST,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        database=DB_NAME,
+        port=DB_PORT,
+    )
+    cursor = conn.cursor(dictionary=True)
+    failed = False
+
+    try:
+        for entity in args.entity or list(ENTITIES):
+            try:
+                if args.check:
+                    source = source_totals(cursor, entity)
+                    counters = counter_totals(cursor, entity)
+                    if counters is None:
+                        failed = True
+                        print(f"❌ {entity}: counter belum pernah di-rebuild (stats memakai tabel sumber)")
+                        continue
+                    drift = {
+                        dimension: (counters.get(dimension, 0), source.get(dimension, 0))
+                        for dimension in set(source) | set(counters)
+                        if counters.get(dimension, 0) != source.get(dimension, 0)
+                    }
+                    if drift:
+                        failed = True
+                        print(f"❌ {entity}: {len(drift)} dimensi berbeda")
+                        for dimension, (counted, actual) in sorted(drift.items()):
+                            print(f"   {dimension}: counter={counted} sumber={actual}")
+                    else:
+                        print(f"✅ {entity}: counter sesuai ({sum(source.values())} baris)")
+                else:
+                    written = rebuild(conn, entity)
+                    print(f"✅ {entity}: {written} baris counter ditulis ulang")
+            except mysql.connector.Error as e:
+                failed = True
+                print(f"❌ {entity}: {e}")
+    finally:
+        cursor.close()
+        conn.close()
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
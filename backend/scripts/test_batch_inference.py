@@ -4,11 +4,16 @@ untuk cek accuracy dan confusion matrix
 """
 import tensorflow as tf
 import numpy as np
-from PIL import Image
 import os
+import sys
 import glob
 from collections import defaultdict
 
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from preprocessing import letterbox  # noqa: E402
+
 # Class names (HARUS SAMA dengan urutan saat training!)
 CLASS_NAMES = ['Black spot', 'Canker', 'Greening', 'Healthy', 'Melanose']
 
@@ -48,9 +53,8 @@ def test_batch():
         for img_path in image_files:
             try:
                 # Load & preprocess
-                img = Image.open(img_path).convert('RGB')
-                img = img.resize((224, 224))
-                img_array = np.array(img) / 255.0
+                # Letterbox yang sama dengan app.py (model SavedModel ini butuh 224 dan skala 0-1)
+                img_array = letterbox(img_path, 224) / 255.0
                 img_array = np.expand_dims(img_array, axis=0)
                 
                 # Inference
@@ -3,10 +3,14 @@ Test inference untuk debug: cek apakah model bisa prediksi dengan benar
 """
 import tensorflow as tf
 import numpy as np
-from PIL import Image
 import os
 import sys
 
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from preprocessing import letterbox  # noqa: E402
+
 # Class names (PENTING: harus sama urutan dengan saat training!)
 CLASS_NAMES = ['Black spot', 'Canker', 'Greening', 'Healthy', 'Melanose']
 
@@ -21,9 +25,8 @@ def test_model(image_path):
     
     # Load & preprocess image
     print(f"\nTesting image: {image_path}")
-    img = Image.open(image_path).convert('RGB')
-    img = img.resize((224, 224))
-    img_array = np.array(img) / 255.0
+    # Letterbox yang sama dengan app.py (model SavedModel ini butuh 224 dan skala 0-1)
+    img_array = letterbox(image_path, 224) / 255.0
     img_array = np.expand_dims(img_array, axis=0)
     
     # Inference
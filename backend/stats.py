@@ -0,0 +1,148 @@
+"""
+Statistik dashboard admin dalam satu query agregasi per endpoint
+Setiap endpoint stats menjalankan satu GROUP BY atas kombinasi kolom yang
+dibutuhkan (satu table scan, satu round trip), lalu hasilnya diringkas di
+Python menjadi total / per status / per kategori / dst.
+
+SQL memakai placeholder {table} supaya scripts/benchmark_stats.py bisa
+menjalankannya pada tabel seed. Normalnya endpoint membaca baris yang sama dari
+StatsCounters (stats_counters.py); query di sini dipakai jika counter belum ada.
+"""
+
+from datetime import timedelta
+
+FEEDBACK_STATS_SQL = """
+    SELECT status, category, rating, COUNT(*) AS count
+    FROM {table}
+    GROUP BY status, category, rating
+"""
+
+NEWS_STATS_SQL = """
+    SELECT is_published, category, COUNT(*) AS count
+    FROM {table}
+    GROUP BY is_published, category
+"""
+
+USERS_STATS_SQL = """
+    SELECT role, status_akun, COUNT(*) AS count
+    FROM {table}
+    GROUP BY role, status_akun
+"""
+
+DETECTION_TOTALS_SQL = """
+    SELECT disease_name, severity, COUNT(*) AS count
+    FROM {table}
+    GROUP BY disease_name, severity
+"""
+
+# Range [start, end) memakai idx_date_disease (detection_date, disease_name, severity)
+DETECTION_DAYS_SQL = """
+    SELECT disease_name, severity, DATE(detection_date) AS day, COUNT(*) AS count
+    FROM {table}
+    WHERE detection_date >= %s AND detection_date < %s
+    GROUP BY disease_name, severity, DATE(detection_date)
+"""
+
+
+def _add(bucket, key, count):
+    bucket[key] = bucket.get(key, 0) + count
+
+
+def summarize_feedback(rows):
+    """rows: dict {status, category, rating, count} -> payload /api/admin/feedbacks/stats"""
+    total = 0
+    rating_sum = 0
+    by_status = {}
+    by_category = {}
+    by_rating = {}
+    for row in rows:
+        count = int(row['count'])
+        total += count
+        rating_sum += int(row['rating']) * count
+        _add(by_status, row['status'], count)
+        _add(by_category, row['category'], count)
+        _add(by_rating, int(row['rating']), count)
+    return {
+        "total": total,
+        "pending": by_status.get('pending', 0),
+        "by_status": by_status,
+        "by_category": by_category,
+        "by_rating": dict(sorted(by_rating.items())),
+        "average_rating": round(rating_sum / total, 2) if total else 0
+    }
+
+
+def summarize_news(rows):
+    """rows: dict {is_published, category, count} -> payload /api/admin/news/stats"""
+    total = 0
+    published = 0
+    draft = 0
+    by_category = {}
+    for row in rows:
+        count = int(row['count'])
+        total += count
+        if row['is_published'] == 1:
+            published += count
+        elif row['is_published'] == 0:
+            draft += count
+        _add(by_category, row['category'], count)
+    return {
+        "total": total,
+        "published": published,
+        "draft": draft,
+        "by_category": by_category
+    }
+
+
+def summarize_users(rows):
+    """rows: dict {role, status_akun, count} -> payload /api/admin/users/stats"""
+    total = 0
+    active = 0
+    by_role = {}
+    for row in rows:
+        count = int(row['count'])
+        total += count
+        if row['status_akun'] == 'aktif':
+            active += count
+        _add(by_role, row['role'], count)
+    return {
+        "total": total,
+        "active": active,
+        "by_role": by_role
+    }
+
+
+def summarize_detections(rows):
+    """rows: dict {disease_name, severity, count} -> {total, by_disease, by_severity}"""
+    total = 0
+    by_disease = {}
+    by_severity = {}
+    for row in rows:
+        count = int(row['count'])
+        total += count
+        _add(by_disease, row['disease_name'], count)
+        _add(by_severity, row['severity'], count)
+    return {
+        "total": total,
+        "by_disease": dict(sorted(by_disease.items(), key=lambda item: -item[1])),
+        "by_severity": by_severity
+    }
+
+
+def daily_trend(rows, start_day, end_day):
+    """rows: dict {disease_name, day, count} -> list per hari start..end (hari kosong = 0)"""
+    days = {}
+    for row in rows:
+        day = str(row['day'])[:10]
+        entry = days.setdefault(day, {"total": 0, "by_disease": {}})
+        count = int(row['count'])
+        entry["total"] += count
+        _add(entry["by_disease"], row['disease_name'], count)
+
+    trend = []
+    day = start_day
+    while day <= end_day:
+        entry = days.get(day.isoformat(), {"total": 0, "by_disease": {}})
+        trend.append({"date": day.isoformat(), **entry})
+        day += timedelta(days=1)
+    return trend
@@ -0,0 +1,205 @@
+"""
+Counter statistik yang dijaga inkremental (tabel StatsCounters)
+Endpoint stats dashboard membaca beberapa baris counter, bukan meng-agregasi
+seluruh tabel sumber. Setiap write path menaikkan/menurunkan counter di
+transaksi yang sama dengan perubahan datanya (lihat app.py), dan
+scripts/reconcile_stats.py membangun ulang counter dari tabel sumber.
+
+Satu baris = (entity, dimension, bucket):
+- dimension: kombinasi kolom yang dipakai stats.py, mis. "status=pending&category=bug&rating=5"
+- bucket: 'all' (sepanjang waktu) atau tanggal 'YYYY-MM-DD' (hari baris sumber dibuat)
+Perubahan status/kategori memindahkan count di bucket 'all' dan bucket hari pembuatan.
+
+Baris penanda (entity, '', 'rebuilt') ditulis rebuild(). Tanpa penanda, counter
+entity belum pernah dibangun dari tabel sumber (hanya berisi increment sejak
+tabel dibuat) sehingga pembaca harus meng-agregasi tabel sumber.
+
+Counter tulis (bump_writes/read_writes) memakai tabel yang sama dengan entity di luar
+ENTITIES, mis. 'history_writes' = jumlah baris DetectionHistory per user (validator ETag).
+Counter ini hanya naik dan tidak disentuh rebuild().
+"""
+
+from datetime import date, datetime
+from urllib.parse import urlencode, parse_qsl
+
+ALL_TIME = 'all'
+REBUILT = 'rebuilt'
+
+# entity -> (tabel sumber, kolom tanggal, [(kolom dimensi, tipe)])
+ENTITIES = {
+    'feedback': ('Feedback', 'created_at', [('status', str), ('category', str), ('rating', int)]),
+    'news': ('News', 'created_at', [('is_published', int), ('category', str)]),
+    'user': ('User', 'tanggal_daftar', [('role', str), ('status_akun', str)]),
+    'detection': ('DetectionHistory', 'detection_date', [('disease_name', str), ('severity', str)]),
+}
+
+SQL_BUMP = """
+    INSERT INTO StatsCounters (entity, dimension, bucket, count)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE count = count + VALUES(count)
+"""
+
+
+def day_bucket(value=None):
+    """datetime/date/ISO string (default hari ini) -> bucket 'YYYY-MM-DD'"""
+    value = value or date.today()
+    if isinstance(value, str):
+        return value[:10]
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.isoformat()
+
+
+def encode_dimension(entity, values):
+    """dict nilai kolom -> string dimension (urutan kolom tetap, nilai dinormalisasi ke tipenya, None -> '')"""
+    _, _, columns = ENTITIES[entity]
+    return urlencode([(name, '' if values.get(name) is None else kind(values[name])) for name, kind in columns])
+
+
+def decode_dimension(entity, dimension):
+    """String dimension -> dict nilai kolom dengan tipe aslinya"""
+    _, _, columns = ENTITIES[entity]
+    types = dict(columns)
+    return {
+        name: (types[name](value) if value != '' else None)
+        for name, value in parse_qsl(dimension, keep_blank_values=True)
+        if name in types
+    }
+
+
+def bump_many(cursor, entity, changes):
+    """
+    changes: iterable (values, delta, created). Delta dijumlahkan per (dimension, bucket)
+    dulu, lalu ditulis dalam satu multi-row upsert (bucket 'all' + bucket hari created).
+    """
+    deltas = {}
+    for values, delta, created in changes:
+        dimension = encode_dimension(entity, values)
+        for bucket in (ALL_TIME, day_bucket(created)):
+            deltas[(dimension, bucket)] = deltas.get((dimension, bucket), 0) + delta
+    rows = [(entity, dimension, bucket, delta) for (dimension, bucket), delta in deltas.items() if delta]
+    if rows:
+        cursor.executemany(SQL_BUMP, rows)
+
+
+def bump(cursor, entity, values, delta=1, created=None):
+    """Tambah delta ke counter bucket 'all' dan bucket hari created (default hari ini)"""
+    bump_many(cursor, entity, [(values, delta, created)])
+
+
+def move(cursor, entity, old_values, new_values, created=None):
+    """Pindahkan satu baris dari dimensi lama ke baru (mis. status berubah)"""
+    bump_many(cursor, entity, [(old_values, -1, created), (new_values, 1, created)])
+
+
+def bump_writes(cursor, entity, counts):
+    """counts: dict key -> jumlah baris baru; dinaikkan di bucket 'all' dalam satu multi-row upsert"""
+    rows = [(entity, str(key), ALL_TIME, count) for key, count in counts.items() if count]
+    if rows:
+        cursor.executemany(SQL_BUMP, rows)
+
+
+def read_writes(cursor, entity, key):
+    """Nilai counter tulis untuk key, 0 jika belum pernah dinaikkan (cursor dictionary)"""
+    cursor.execute("""
+        SELECT count FROM StatsCounters WHERE entity = %s AND dimension = %s AND bucket = %s
+    """, (entity, str(key), ALL_TIME))
+    row_data: dict = cursor.fetchone() or {}  # type: ignore
+    return int(row_data.get('count') or 0)
+
+
+def _rows(cursor, sql, params, entity):
+    cursor.execute(sql, params)
+    rows = []
+    for row in cursor.fetchall():
+        row_data: dict = row  # type: ignore
+        values = decode_dimension(entity, row_data['dimension'])
+        values['count'] = int(row_data['count'])
+        rows.append(values)
+    return rows
+
+
+def read_all_time(cursor, entity):
+    """Rows {kolom dimensi..., count} sepanjang waktu, siap untuk stats.summarize_* (cursor dictionary)"""
+    return _rows(cursor, """
+        SELECT dimension, count FROM StatsCounters
+        WHERE entity = %s AND bucket = %s AND count <> 0
+    """, (entity, ALL_TIME), entity)
+
+
+def read_rebuilt_all_time(cursor, entity):
+    """Seperti read_all_time, tetapi None jika counter entity belum pernah dibangun oleh rebuild()"""
+    cursor.execute("""
+        SELECT dimension, bucket, count FROM StatsCounters
+        WHERE entity = %s AND bucket IN (%s, %s)
+    """, (entity, ALL_TIME, REBUILT))
+    rebuilt = False
+    rows = []
+    for row in cursor.fetchall():
+        row_data: dict = row  # type: ignore
+        if row_data['bucket'] == REBUILT:
+            rebuilt = True
+        elif int(row_data['count']):
+            values = decode_dimension(entity, row_data['dimension'])
+            values['count'] = int(row_data['count'])
+            rows.append(values)
+    return rows if rebuilt else None
+
+
+def read_days(cursor, entity, start_day, end_day):
+    """Rows {kolom dimensi..., day, count} per hari untuk rentang tanggal (inklusif)"""
+    cursor.execute("""
+        SELECT dimension, bucket, count FROM StatsCounters
+        WHERE entity = %s AND bucket BETWEEN %s AND %s AND bucket <> %s AND count <> 0
+    """, (entity, day_bucket(start_day), day_bucket(end_day), ALL_TIME))
+    rows = []
+    for row in cursor.fetchall():
+        row_data: dict = row  # type: ignore
+        values = decode_dimension(entity, row_data['dimension'])
+        values['day'] = row_data['bucket']
+        values['count'] = int(row_data['count'])
+        rows.append(values)
+    return rows
+
+
+def rebuild(conn, entity):
+    """
+    Bangun ulang counter entity dari tabel sumbernya dalam satu transaksi.
+    Baris counter entity dikunci dulu (FOR UPDATE) sehingga write path yang
+    berjalan bersamaan menunggu dan tidak ada perubahan yang terlewat.
+    Baris penanda REBUILT ditulis di transaksi yang sama.
+    Return jumlah baris counter yang ditulis.
+    """
+    table, date_column, columns = ENTITIES[entity]
+    names = [name for name, _ in columns]
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT bucket FROM StatsCounters WHERE entity = %s FOR UPDATE", (entity,))
+        cursor.fetchall()
+        cursor.execute(f"""
+            SELECT {', '.join(names)}, DATE({date_column}) AS day, COUNT(*) AS count
+            FROM {table}
+            GROUP BY {', '.join(names)}, DATE({date_column})
+        """)
+        totals = {}
+        counters = []
+        for row in cursor.fetchall():
+            row_data: dict = row  # type: ignore
+            dimension = encode_dimension(entity, row_data)
+            count = int(row_data['count'])
+            totals[dimension] = totals.get(dimension, 0) + count
+            if row_data['day'] is not None:
+                counters.append((entity, dimension, day_bucket(row_data['day']), count))
+        counters += [(entity, dimension, ALL_TIME, count) for dimension, count in totals.items()]
+
+        cursor.execute("DELETE FROM StatsCounters WHERE entity = %s", (entity,))
+        for start in range(0, len(counters), 1000):
+            cursor.executemany(SQL_BUMP, counters[start:start + 1000])
+        cursor.execute(SQL_BUMP, (entity, '', REBUILT, 1))
+        conn.commit()
+        return len(counters)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
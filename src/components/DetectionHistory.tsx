@@ -17,6 +17,7 @@ const fetchHeaders = {
 interface DetectionRecord {
   id: number;
   image_url: string;
+  image_original_url?: string;
   disease_name: string;
   confidence: number;
   severity: string;
@@ -33,6 +34,8 @@ const DetectionHistory: React.FC = () => {
   const [loading, setLoading] = useState(true);
   const [selectedRecord, setSelectedRecord] = useState<DetectionRecord | null>(null);
   const [filterSeverity, setFilterSeverity] = useState<string>("all");
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const userData = JSON.parse(localStorage.getItem("user") || "{}");
   const userId = userData.user_id;
@@ -47,16 +50,25 @@ const DetectionHistory: React.FC = () => {
     loadHistory();
   }, [userId]);
 
-  const loadHistory = async () => {
+  // Riwayat dimuat per halaman (keyset pagination), halaman berikutnya lewat next_cursor
+  const loadHistory = async (cursor: string | null = null) => {
     try {
-      setLoading(true);
-      const response = await fetch(`${API_URL}/api/detection-history/${userId}`, {
+      if (cursor) {
+        setLoadingMore(true);
+      } else {
+        setLoading(true);
+      }
+      const params = new URLSearchParams({ limit: "30" });
+      if (cursor) params.set("cursor", cursor);
+      const response = await fetch(`${API_URL}/api/detection-history/${userId}?${params}`, {
         headers: fetchHeaders
       });
       const data = await response.json();
 
       if (response.ok) {
-        setHistory(data.history || []);
+        const page: DetectionRecord[] = data.history || [];
+        setHistory((prev) => (cursor ? [...prev, ...page] : page));
+        setNextCursor(data.next_cursor || null);
       } else {
         toast.error(data.error || "Gagal memuat riwayat deteksi");
       }
@@ -65,6 +77,7 @@ const DetectionHistory: React.FC = () => {
       toast.error("Terjadi kesalahan saat memuat riwayat");
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -191,6 +204,7 @@ const DetectionHistory: React.FC = () => {
                   <img
                     src={`${API_URL}${record.image_url}`}
                     alt={record.disease_name}
+                    loading="lazy"
                     className="w-full h-full object-cover"
                   />
                   <div className="absolute top-2 right-2">
@@ -224,6 +238,19 @@ const DetectionHistory: React.FC = () => {
             ))}
           </div>
         )}
+
+        {!loading && nextCursor && (
+          <div className="mt-8 flex justify-center">
+            <button
+              onClick={() => loadHistory(nextCursor)}
+              disabled={loadingMore}
+              className="px-6 py-3 bg-white border border-green-200 text-green-700 rounded-xl hover:bg-green-50 
+                transition-all duration-200 shadow-sm hover:shadow-md disabled:opacity-50"
+            >
+              {loadingMore ? "Memuat..." : "Muat lebih banyak"}
+            </button>
+          </div>
+        )}
       </div>
 
       {/* Detail Modal */}
@@ -255,7 +282,7 @@ const DetectionHistory: React.FC = () => {
               <div className="grid md:grid-cols-2 gap-6">
                 <div className="relative rounded-xl overflow-hidden shadow-lg">
                   <img
-                    src={`${API_URL}${selectedRecord.image_url}`}
+                    src={`${API_URL}${selectedRecord.image_original_url ?? selectedRecord.image_url}`}
                     alt={selectedRecord.disease_name}
                     className="w-full h-64 object-cover"
                   />
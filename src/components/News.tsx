@@ -68,9 +68,10 @@ export default function News({ onLogout, onNavigateToDashboard }: NewsProps) {
     
     try {
       const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000';
-      const categoryParam = selectedCategory !== 'semua' ? `?category=${selectedCategory}` : '';
+      const categoryParam = selectedCategory !== 'semua' ? `&category=${selectedCategory}` : '';
       
-      const response = await fetch(`${API_URL}/api/news${categoryParam}`, {
+      // List hanya butuh ringkasan; isi lengkap diambil saat artikel dibuka (loadArticleContent)
+      const response = await fetch(`${API_URL}/api/news?fields=summary${categoryParam}`, {
         method: 'GET',
         headers: {
           'Accept': 'application/json',
@@ -115,6 +116,40 @@ export default function News({ onLogout, onNavigateToDashboard }: NewsProps) {
     }
   };
 
+  // Ambil isi lengkap artikel backend (list memakai fields=summary tanpa content)
+  const loadArticleContent = async (article: NewsArticle): Promise<NewsArticle> => {
+    if (article.content !== undefined || article.isRealNews) {
+      return article;
+    }
+    try {
+      const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000';
+      const response = await fetch(`${API_URL}/api/news/${article.id}`, {
+        headers: {
+          'Accept': 'application/json',
+          'ngrok-skip-browser-warning': 'true',
+        },
+      });
+      if (!response.ok) {
+        return article;
+      }
+      const data = await response.json();
+      const fullArticle = { ...article, content: data.content ?? '' };
+      setNewsList(prev => prev.map(item => item.id === article.id ? fullArticle : item));
+      return fullArticle;
+    } catch (error) {
+      console.error('Error fetching news detail:', error);
+      return article;
+    }
+  };
+
+  const openArticle = (article: NewsArticle) => {
+    setSelectedArticle(article);
+    setShowDetailDialog(true);
+    loadArticleContent(article).then(fullArticle => {
+      setSelectedArticle(current => current && current.id === fullArticle.id ? fullArticle : current);
+    });
+  };
+
   // Fetch real news from external sources (optional, can be triggered manually)
   const fetchRealNews = async () => {
     setIsLoadingNews(true);
@@ -361,7 +396,8 @@ export default function News({ onLogout, onNavigateToDashboard }: NewsProps) {
     setImagePreview(null);
   };
 
-  const handleEditArticle = (article: NewsArticle) => {
+  const handleEditArticle = async (summaryArticle: NewsArticle) => {
+    const article = await loadArticleContent(summaryArticle);
     setEditingArticleId(article.id);
     setNewArticle({
       title: article.title,
@@ -686,10 +722,7 @@ export default function News({ onLogout, onNavigateToDashboard }: NewsProps) {
                             </Button>
                           ) : (
                             <Button 
-                              onClick={() => {
-                                setSelectedArticle(filteredNews[0]);
-                                setShowDetailDialog(true);
-                              }}
+                              onClick={() => openArticle(filteredNews[0])}
                               className="bg-gradient-to-r from-[#2ECC71] to-[#27AE60] hover:from-[#27AE60] hover:to-[#229954] text-white"
                             >
                               Baca Selengkapnya
@@ -771,10 +804,7 @@ export default function News({ onLogout, onNavigateToDashboard }: NewsProps) {
                               variant="ghost" 
                               size="sm" 
                               className="text-[#2ECC71] hover:text-[#27AE60]"
-                              onClick={() => {
-                                setSelectedArticle(article);
-                                setShowDetailDialog(true);
-                              }}
+                              onClick={() => openArticle(article)}
                             >
                               Baca <ExternalLink className="w-3 h-3 ml-1" />
                             </Button>